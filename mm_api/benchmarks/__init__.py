@@ -0,0 +1 @@
+"""Benchmarks for mm_api."""
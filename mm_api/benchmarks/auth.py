@@ -0,0 +1,88 @@
+"""
+Authentication overhead per request.
+
+Times what `is_authenticated` spends on one bearer token:
+
+* verify - full RS256 verification, what every request used to do;
+* cached - `verify_token` with the token in the worker's LRU;
+* shared - `verify_token` with an empty LRU and the token in Redis,
+  a request served by another worker (only with `--redis`).
+
+The signing key is generated locally, no JWKS is fetched.
+
+    python -m mm_api.benchmarks.auth --calls 5000 --redis
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+import click
+import jwt
+from redis.asyncio import ConnectionPool
+
+from mm_api.services.jwks import key_store
+from mm_api.services.token_cache import token_cache
+from mm_api.settings import settings
+from mm_api.tests.utils.tokens import create_rsa_key
+from mm_api.web.utils.token import decode_token, verify_token
+
+
+async def _measure(
+    name: str,
+    calls: int,
+    run: Callable[[], Awaitable[Any]],
+) -> None:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await run()
+    elapsed = (time.perf_counter() - start) / calls
+    click.echo(f"{name:<12}{elapsed * 1e6:>10.1f}us")
+
+
+async def run(calls: int, redis: bool) -> None:
+    private_key, jwk = create_rsa_key("benchmark")
+    key_store.load({"keys": [jwk]})
+    token = jwt.encode(
+        {"sub": "benchmark_falconer", "exp": int(time.time()) + 3600},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "benchmark"},
+    )
+    assert await verify_token(token)
+
+    async def verify() -> None:  # noqa: WPS430
+        await decode_token(token)
+
+    async def cached() -> None:  # noqa: WPS430
+        await verify_token(token)
+
+    await _measure("verify", calls, verify)
+    await _measure("cached", calls, cached)
+
+    if redis:
+        settings.token_cache_shared = True
+        redis_pool = ConnectionPool.from_url(
+            str(settings.redis_url),
+            socket_timeout=settings.redis_timeout,
+            socket_connect_timeout=settings.redis_timeout,
+        )
+        await verify_token(token, redis_pool)
+
+        async def shared() -> None:  # noqa: WPS430
+            token_cache.clear()
+            await verify_token(token, redis_pool)
+
+        await _measure("shared", calls, shared)
+        await redis_pool.disconnect()
+
+
+@click.command()
+@click.option("--calls", default=2000, show_default=True)
+@click.option("--redis", is_flag=True, help="Also time the Redis-shared cache.")
+def main(calls: int, redis: bool) -> None:
+    """Benchmark authentication with and without the token cache."""
+    asyncio.run(run(calls, redis))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Rows/second of the bulk weight ingestion paths.
+
+Compares the ORM unit of work (`session.add_all` + flush) with
+multi-row INSERT and COPY from `mm_api.db.bulk`. Everything runs
+in one transaction that is rolled back at the end.
+
+    python -m mm_api.benchmarks.bulk_insert --rows 10000
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+import click
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from mm_api.db.bulk import bulk_insert
+from mm_api.db.models import BirdModel, FalconerModel, WeightModel
+from mm_api.schema.weight import WeightCreate
+from mm_api.settings import settings
+
+
+def _payload(bird_id: uuid.UUID, rows: int) -> List[WeightCreate]:
+    start = datetime.now() - timedelta(days=rows)
+    return [
+        WeightCreate(
+            bird_id=bird_id,
+            weight=900 + day % 100,
+            w_time=start + timedelta(days=day),
+        )
+        for day in range(rows)
+    ]
+
+
+async def _measure(
+    name: str,
+    payload: List[WeightCreate],
+    insert: Callable[[List[WeightCreate]], Awaitable[None]],
+) -> None:
+    rows = len(payload)
+    start = time.perf_counter()
+    await insert(payload)
+    elapsed = time.perf_counter() - start
+    click.echo(f"{name:>10}: {rows / elapsed:>12,.0f} rows/s ({elapsed:.3f}s)")
+
+
+async def run(rows: int, chunk_size: int) -> None:
+    engine = create_async_engine(str(settings.db_url))
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(connection, expire_on_commit=False)
+        falconer_id = f"bench_{uuid.uuid4().hex}"
+        bird_id = uuid.uuid4()
+        session.add(
+            FalconerModel(
+                id=falconer_id,
+                name="bench",
+                permit_class="general",
+                permit_number="0",
+            ),
+        )
+        session.add(
+            BirdModel(
+                id=bird_id,
+                falconer_id=falconer_id,
+                name="bench",
+                gender="female",
+                species="goshawk",
+            ),
+        )
+        await session.flush()
+
+        async def orm(payload: List[WeightCreate]) -> None:  # noqa: WPS430
+            session.add_all([WeightModel(**weight.dict()) for weight in payload])
+            await session.flush()
+            session.expunge_all()
+
+        async def multirow(payload: List[WeightCreate]) -> None:  # noqa: WPS430
+            settings.bulk_copy_threshold = rows + 1
+            await bulk_insert(
+                session,
+                WeightModel,
+                [weight.dict() for weight in payload],
+                chunk_size,
+            )
+
+        async def copy(payload: List[WeightCreate]) -> None:  # noqa: WPS430
+            settings.bulk_copy_threshold = 1
+            await bulk_insert(
+                session, WeightModel, [weight.dict() for weight in payload]
+            )
+
+        click.echo(f"Inserting {rows:,} weights, chunk size {chunk_size}")
+        await _measure("orm", _payload(bird_id, rows), orm)
+        await _measure("multi-row", _payload(bird_id, rows), multirow)
+        await _measure("copy", _payload(bird_id, rows), copy)
+
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+@click.command()
+@click.option("--rows", default=10000, show_default=True)
+@click.option("--chunk-size", default=settings.bulk_chunk_size, show_default=True)
+def main(rows: int, chunk_size: int) -> None:
+    """Benchmark bulk weight ingestion."""
+    asyncio.run(run(rows, chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+CPU cost of response compression against bytes saved.
+
+Builds, without a database, the JSON of a filter-date page of weights
+and one of feedings with both weights included, from `--days` of
+`mm_api.seed` sessions, the size of a multi-month history. Every
+page is compressed with gzip and Brotli at several levels, and the
+time of a `compression_cache` hit is shown for comparison.
+
+    python -m mm_api.benchmarks.compression --days 180
+"""
+import functools
+import gzip
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import brotli
+import click
+from pydantic import BaseModel
+
+from mm_api.db.serialize import page_adapter
+from mm_api.schema.feeding import FeedingNestedWeight
+from mm_api.schema.weight import WeightRead
+from mm_api.seed import generate_owners, generate_series
+from mm_api.services.compression import CompressionCache
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 9)
+
+
+def _rows(columns: Dict[str, List[Any]], updated_at: datetime) -> List[Dict[str, Any]]:
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    for row in rows:
+        row.update(created_at=updated_at, updated_at=updated_at)
+    return rows
+
+
+def _page(schema: Type[BaseModel], items: List[Dict[str, Any]]) -> bytes:
+    adapter = page_adapter(schema)
+    return adapter.dump_json(
+        adapter.validate_python({"items": items, "next_cursor": None}),
+    )
+
+
+def _measure(calls: int, run: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - start) / calls
+
+
+def _cache_hit(cache: CompressionCache, body: bytes) -> Optional[bytes]:
+    return cache.get(cache.key(body, "gzip"))
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors: Dict[str, Callable[[bytes], bytes]] = {}
+    for level in GZIP_LEVELS:
+        compressors[f"gzip {level}"] = lambda body, level=level: gzip.compress(
+            body,
+            compresslevel=level,
+            mtime=0,
+        )
+    for quality in BROTLI_QUALITIES:
+        compressors[f"br {quality}"] = lambda body, quality=quality: (
+            brotli.compress(body, mode=brotli.MODE_TEXT, quality=quality)
+        )
+    return compressors
+
+
+def run(days: int, calls: int) -> None:  # noqa: WPS210
+    updated_at = datetime.now()
+    owners = generate_owners(0, 1, 1)
+    series = generate_series(
+        0,
+        0,
+        owners.birds["id"],
+        owners.birds["gender"],
+        days,
+        updated_at - timedelta(days=days),
+    )
+    weights = _rows(series.weights, updated_at)
+    by_id = {weight["id"]: weight for weight in weights}
+    feedings = _rows(series.feedings, updated_at)
+    for feeding in feedings:
+        feeding["start_weight"] = by_id[feeding["start_weight_id"]]
+        feeding["end_weight"] = by_id[feeding["end_weight_id"]]
+    pages = {
+        "weights": (len(weights), _page(WeightRead, weights)),
+        "feedings": (len(feedings), _page(FeedingNestedWeight, feedings)),
+    }
+
+    cache = CompressionCache(1024 * 1024 * 1024)
+    for name, (rows, body) in pages.items():
+        click.echo(f"\n{name}: {rows:,} rows, {len(body) / 1024:,.1f}KiB\n")
+        click.echo(f"{'coding':<10}{'KiB':>10}{'ratio':>8}{'ms':>10}{'KiB/ms':>10}")
+        for coding, compress in _compressors().items():
+            compressed = compress(body)
+            elapsed = _measure(calls, functools.partial(compress, body))
+            saved = (len(body) - len(compressed)) / 1024
+            click.echo(
+                f"{coding:<10}{len(compressed) / 1024:>10.1f}"
+                f"{len(body) / len(compressed):>8.1f}"
+                f"{elapsed * 1000:>10.2f}{saved / (elapsed * 1000):>10.0f}",
+            )
+        cache.put(cache.key(body, "gzip"), gzip.compress(body, mtime=0))
+        hit = functools.partial(_cache_hit, cache, body)
+        elapsed = _measure(calls, hit)
+        click.echo(f"{'cache hit':<10}{'':>18}{elapsed * 1000:>10.2f}")
+
+
+@click.command()
+@click.option("--days", default=180, show_default=True)
+@click.option("--calls", default=20, show_default=True)
+def main(days: int, calls: int) -> None:
+    """Benchmark compression of filter-date pages."""
+    run(days, calls)
+
+
+if __name__ == "__main__":
+    main()
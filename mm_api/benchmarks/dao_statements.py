@@ -0,0 +1,243 @@
+"""
+Per-call overhead of DAO statements.
+
+For every DAO query compares building the statement on each call
+(how DAOs used to work) with the prebuilt statements of the DAO
+modules. Two numbers are reported per query:
+
+* build - constructing the statement and its cache key in Python,
+  the part SQLAlchemy has to do before it can look up compiled SQL;
+* call - the whole round trip against the database.
+
+Data is generated with `mm_api.seed` inside a transaction that is
+rolled back at the end.
+
+    python -m mm_api.benchmarks.dao_statements --calls 2000
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+import click
+from sqlalchemy import Executable, and_, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dao.bird_dao import FALCONER_BIRDS, GET_BIRD
+from mm_api.db.dao.falconer_dao import GET_FALCONER
+from mm_api.db.dao.feeding_dao import BIRD_FEEDINGS_SINCE, GET_FEEDING
+from mm_api.db.dao.hunt_dao import BIRD_HUNTS_SINCE
+from mm_api.db.dao.training_dao import BIRD_TRAININGS_SINCE
+from mm_api.db.dao.weight_dao import BIRD_WEIGHTS_WINDOW, CREATE_WEIGHT, GET_WEIGHT
+from mm_api.db.engine import create_engine
+from mm_api.db.models import (
+    BirdModel,
+    FalconerModel,
+    FeedingModel,
+    HuntModel,
+    TrainingModel,
+    WeightModel,
+)
+from mm_api.db.pagination import Cursor, PageParams
+from mm_api.seed import generate_owners, generate_series, load_owners, load_series
+from mm_api.settings import settings
+
+Statement = Tuple[Executable, Dict[str, Any]]
+
+
+class Case(NamedTuple):
+    """One DAO query in both styles."""
+
+    name: str
+    legacy: Callable[[], Statement]
+    cached: Callable[[], Statement]
+
+
+def _legacy_page(query: Any, time_column: Any, id_column: Any, page: PageParams) -> Any:
+    if page.cursor is not None:
+        after = tuple_(
+            page.cursor.time,
+            page.cursor.id,
+            types=[time_column.type, id_column.type],
+        )
+        query = query.where(tuple_(time_column, id_column) < after)
+    return query.order_by(time_column.desc(), id_column.desc()).limit(page.limit + 1)
+
+
+def _cases(
+    falconer_id: str, bird_id: Any, weight_id: Any, feeding_id: Any
+) -> List[Case]:
+    page = PageParams(limit=50, cursor=Cursor(time=datetime.now(), id=bird_id))
+    since = datetime.now() - timedelta(days=30)
+
+    def since_filter(model: Any, column: Any, prebuilt: Any) -> Case:
+        name = f"{model.__tablename__}.filter_by_bird_id_and_time"
+
+        def legacy() -> Statement:  # noqa: WPS430
+            query = select(model).where(
+                and_(model.bird_id == bird_id, column >= since),
+            )
+            return _legacy_page(query, column, model.id, page), {}
+
+        def cached() -> Statement:  # noqa: WPS430
+            query, params = prebuilt.for_page(page)
+            return query, {"bird_id": bird_id, "since": since, **params}
+
+        return Case(name, legacy, cached)
+
+    def weight_window() -> Statement:
+        latest = (
+            select(WeightModel.w_time)
+            .where(WeightModel.bird_id == bird_id)
+            .order_by(WeightModel.w_time.desc())
+            .limit(1)
+            .cte("latest_entry")
+        )
+        query = select(WeightModel).where(
+            WeightModel.bird_id == bird_id,
+            WeightModel.w_time >= latest.c.w_time - timedelta(days=30),
+        )
+        return _legacy_page(query, WeightModel.w_time, WeightModel.id, page), {}
+
+    def weight_window_cached() -> Statement:
+        query, params = BIRD_WEIGHTS_WINDOW.for_page(page)
+        return query, {"bird_id": bird_id, "window": timedelta(days=30), **params}
+
+    def new_weight() -> Dict[str, Any]:
+        return {"bird_id": bird_id, "weight": 1000, "w_time": datetime.now()}
+
+    return [
+        Case(
+            "weights.get_by_id",
+            lambda: (select(WeightModel).where(WeightModel.id == weight_id), {}),
+            lambda: (GET_WEIGHT, {"uid": weight_id}),
+        ),
+        Case(
+            "weights.create",
+            lambda: (
+                insert(WeightModel).values(**new_weight()).returning(WeightModel),
+                {},
+            ),
+            lambda: (CREATE_WEIGHT, new_weight()),
+        ),
+        Case("weights.filter_by_bird_id_and_time", weight_window, weight_window_cached),
+        Case(
+            "feedings.get_by_id",
+            lambda: (select(FeedingModel).where(FeedingModel.id == feeding_id), {}),
+            lambda: (GET_FEEDING, {"uid": feeding_id}),
+        ),
+        since_filter(FeedingModel, FeedingModel.f_time, BIRD_FEEDINGS_SINCE),
+        since_filter(HuntModel, HuntModel.start_time, BIRD_HUNTS_SINCE),
+        since_filter(TrainingModel, TrainingModel.start_time, BIRD_TRAININGS_SINCE),
+        Case(
+            "birds.get_by_id",
+            lambda: (select(BirdModel).where(BirdModel.id == bird_id), {}),
+            lambda: (GET_BIRD, {"uid": bird_id}),
+        ),
+        Case(
+            "birds.get_by_falconer_id",
+            lambda: (
+                _legacy_page(
+                    select(BirdModel).where(BirdModel.falconer_id == falconer_id),
+                    BirdModel.created_at,
+                    BirdModel.id,
+                    page,
+                ),
+                {},
+            ),
+            lambda: (
+                FALCONER_BIRDS.for_page(page)[0],
+                {"falconer_id": falconer_id, **FALCONER_BIRDS.for_page(page)[1]},
+            ),
+        ),
+        Case(
+            "falconers.get_by_id",
+            lambda: (
+                select(FalconerModel).where(FalconerModel.id == falconer_id),
+                {},
+            ),
+            lambda: (GET_FALCONER, {"uid": falconer_id}),
+        ),
+    ]
+
+
+def _build_time(build: Callable[[], Statement], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        statement, _params = build()
+        statement._generate_cache_key()  # noqa: WPS437
+    return (time.perf_counter() - start) / calls
+
+
+async def _call_time(
+    session: AsyncSession,
+    build: Callable[[], Statement],
+    calls: int,
+) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        statement, params = build()
+        result = await session.execute(statement, params)
+        result.scalars().all()
+    return (time.perf_counter() - start) / calls
+
+
+async def run(calls: int) -> None:
+    engine = create_engine(str(settings.db_url), "benchmark")
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(connection, expire_on_commit=False)
+
+        owners = generate_owners(0, 1, 1)
+        owners.falconers["id"][0] = "benchmark_falconer"
+        owners.birds["falconer_id"][0] = "benchmark_falconer"
+        series = generate_series(
+            0,
+            0,
+            owners.birds["id"],
+            owners.birds["gender"],
+            365,
+            datetime.now() - timedelta(days=365),
+        )
+        await load_owners(session, owners)
+        await load_series(session, series)
+
+        cases = _cases(
+            owners.falconers["id"][0],
+            owners.birds["id"][0],
+            series.weights["id"][0],
+            series.feedings["id"][0],
+        )
+        click.echo(
+            f"{'query':<40}{'build before':>14}{'build after':>14}"
+            f"{'call before':>14}{'call after':>14}",
+        )
+        for case in cases:
+            # Warm up compiled and prepared statement caches.
+            await _call_time(session, case.legacy, 10)
+            await _call_time(session, case.cached, 10)
+            timings = [
+                _build_time(case.legacy, calls),
+                _build_time(case.cached, calls),
+                await _call_time(session, case.legacy, calls),
+                await _call_time(session, case.cached, calls),
+            ]
+            click.echo(
+                f"{case.name:<40}"
+                + "".join(f"{timing * 1e6:>12.1f}us" for timing in timings),
+            )
+
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+@click.command()
+@click.option("--calls", default=1000, show_default=True)
+def main(calls: int) -> None:
+    """Benchmark DAO statement overhead."""
+    asyncio.run(run(calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Serialization of large filter-date pages.
+
+Compares, for one page of weights and one of feedings:
+
+* models - what the routes used to do: ORM instances, `*Read`
+  models, then FastAPI's response validation and `UJSONResponse`;
+* json - `filter_json_by_bird_id_and_time`: Core rows validated
+  once by a `TypeAdapter` and dumped to JSON bytes.
+
+Pages are `--rows` long, far above `MAX_PAGE_SIZE`, to make the
+per-row cost visible. One session a day is generated with
+`mm_api.seed` inside a transaction that is rolled back at the end.
+
+    python -m mm_api.benchmarks.serialization --rows 10000
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+import click
+from fastapi.responses import UJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dao.feeding_dao import FeedingDAO
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.engine import create_engine
+from mm_api.db.pagination import PageParams
+from mm_api.schema.feeding import FeedingNestedWeight
+from mm_api.schema.page import Page
+from mm_api.schema.weight import WeightRead
+from mm_api.seed import generate_owners, generate_series, load_owners, load_series
+from mm_api.settings import settings
+
+
+async def _measure(
+    name: str,
+    calls: int,
+    run: Callable[[], Awaitable[bytes]],
+) -> None:
+    size = len(await run())
+    start = time.perf_counter()
+    for _ in range(calls):
+        await run()
+    elapsed = (time.perf_counter() - start) / calls
+    click.echo(f"{name:<20}{elapsed * 1000:>10.2f}ms{size / 1e6:>10.2f}MB")
+
+
+def _fastapi_render(schema: Any) -> Callable[[Any], Awaitable[bytes]]:
+    field = create_response_field(name="benchmark", type_=schema)
+
+    async def render(content: Any) -> bytes:  # noqa: WPS430
+        validated = await serialize_response(
+            field=field,
+            response_content=content,
+            is_coroutine=True,
+        )
+        return UJSONResponse(validated).body
+
+    return render
+
+
+async def run(rows: int, calls: int) -> None:  # noqa: WPS210
+    engine = create_engine(str(settings.db_url), "benchmark")
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(connection, expire_on_commit=False)
+
+        owners = generate_owners(0, 1, 1)
+        owners.falconers["id"][0] = "benchmark_falconer"
+        owners.birds["falconer_id"][0] = "benchmark_falconer"
+        series = generate_series(
+            0,
+            0,
+            owners.birds["id"],
+            owners.birds["gender"],
+            rows,
+            datetime.now() - timedelta(days=rows),
+        )
+        await load_owners(session, owners)
+        await load_series(session, series)
+        bird_id = str(owners.birds["id"][0])
+        page = PageParams(limit=rows)
+        weight_dao, feeding_dao = WeightDAO(session), FeedingDAO(session)
+        render_weights = _fastapi_render(Page[WeightRead])
+        render_feedings = _fastapi_render(Page[FeedingNestedWeight])
+
+        async def weight_models() -> bytes:  # noqa: WPS430
+            weights = await weight_dao.filter_by_bird_id_and_time(bird_id, rows, page)
+            return await render_weights(weights)
+
+        async def weight_json() -> bytes:  # noqa: WPS430
+            return await weight_dao.filter_json_by_bird_id_and_time(
+                bird_id,
+                rows,
+                page,
+            )
+
+        async def feeding_models() -> bytes:  # noqa: WPS430
+            feedings = await feeding_dao.filter_by_bird_id_and_time(
+                bird_id,
+                rows + 1,
+                page,
+            )
+            return await render_feedings(feedings)
+
+        async def feeding_json() -> bytes:  # noqa: WPS430
+            return await feeding_dao.filter_json_by_bird_id_and_time(
+                bird_id,
+                rows + 1,
+                page,
+            )
+
+        click.echo(f"pages of {rows:,} rows\n")
+        await _measure("weights models", calls, weight_models)
+        await _measure("weights json", calls, weight_json)
+        await _measure("feedings models", calls, feeding_models)
+        await _measure("feedings json", calls, feeding_json)
+
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+@click.command()
+@click.option("--rows", default=10000, show_default=True)
+@click.option("--calls", default=10, show_default=True)
+def main(rows: int, calls: int) -> None:
+    """Benchmark serialization of filter-date pages."""
+    asyncio.run(run(rows, calls))
+
+
+if __name__ == "__main__":
+    main()
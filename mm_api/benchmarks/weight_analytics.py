@@ -0,0 +1,174 @@
+"""
+Weight analytics on a long series.
+
+Compares what clients do today, pulling `WeightRead` rows and
+computing trends with Python loops, with `/weight/{bird_id}/analytics`,
+which fetches the series as arrays and computes them with Polars
+and NumPy. Both fetching and computing are timed.
+
+The series is generated with `mm_api.seed`, two weigh-ins a day,
+inside a transaction that is rolled back at the end.
+
+    python -m mm_api.benchmarks.weight_analytics --years 5
+"""
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import click
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.engine import create_engine
+from mm_api.db.models import WeightModel
+from mm_api.schema.weight import WeightRead
+from mm_api.seed import generate_owners, generate_series, load_owners, load_series
+from mm_api.services.weight_analytics import WeightSeries, analyze
+from mm_api.settings import settings
+
+
+async def _fetch_rows(session: AsyncSession, bird_id: Any) -> List[Dict[str, Any]]:
+    rows = await session.execute(
+        select(WeightModel)
+        .where(WeightModel.bird_id == bird_id)
+        .order_by(WeightModel.w_time),
+    )
+    # What a client gets from the filter-date endpoint, plus post_feeding.
+    return [
+        {**WeightRead.from_orm(row).dict(), "post_feeding": row.post_feeding}
+        for row in rows.scalars().all()
+    ]
+
+
+def _slope(points: List[Any]) -> Optional[float]:
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return covariance / variance if variance else None
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def _analyze_rows(weights: List[Dict[str, Any]], window: int) -> Dict[str, Any]:
+    days: Dict[Any, Dict[str, List[float]]] = defaultdict(
+        lambda: {"all": [], "pre": [], "post": []},
+    )
+    for weight in weights:
+        day = days[weight["w_time"].date()]
+        day["all"].append(weight["weight"])
+        day["post" if weight["post_feeding"] else "pre"].append(weight["weight"])
+
+    daily = [
+        {
+            "day": day,
+            "weight_mean": _mean(values["all"]),
+            "pre_feeding": _mean(values["pre"]),
+            "post_feeding": _mean(values["post"]),
+        }
+        for day, values in sorted(days.items())
+    ]
+    for index, stats in enumerate(daily):
+        recent = [
+            other["weight_mean"]
+            for other in daily[max(0, index - window + 1) : index + 1]
+            if (stats["day"] - other["day"]).days < window
+        ]
+        stats["rolling_mean"] = _mean(recent)
+        stats["delta"] = None
+        previous = daily[index - 1] if index else None
+        if previous and (stats["day"] - previous["day"]).days == 1:
+            stats["delta"] = stats["weight_mean"] - previous["weight_mean"]
+
+    pre = [weight for weight in weights if not weight["post_feeding"]]
+    trends = {}
+    if pre:
+        last = pre[-1]["w_time"]
+        ages = [
+            ((weight["w_time"] - last).total_seconds() / 86400, weight["weight"])
+            for weight in pre
+        ]
+        for days_back in (7, 30, -ages[0][0]):
+            trends[days_back] = _slope([age for age in ages if age[0] >= -days_back])
+    return {"days": daily, "trends": trends}
+
+
+async def _measure(
+    name: str,
+    calls: int,
+    run: Callable[[], Awaitable[Any]],
+) -> None:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await run()
+    elapsed = (time.perf_counter() - start) / calls
+    click.echo(f"{name:<28}{elapsed * 1000:>10.2f}ms")
+
+
+async def run(years: int, calls: int, window: int) -> None:  # noqa: WPS210
+    engine = create_engine(str(settings.db_url), "benchmark")
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(connection, expire_on_commit=False)
+
+        owners = generate_owners(0, 1, 1)
+        owners.falconers["id"][0] = "benchmark_falconer"
+        owners.birds["falconer_id"][0] = "benchmark_falconer"
+        days = 365 * years
+        series = generate_series(
+            0,
+            0,
+            owners.birds["id"],
+            owners.birds["gender"],
+            days,
+            datetime.now() - timedelta(days=days),
+        )
+        await load_owners(session, owners)
+        await load_series(session, series)
+        bird_id = owners.birds["id"][0]
+        dao = WeightDAO(session)
+
+        rows = await _fetch_rows(session, bird_id)
+        columns = await dao.get_series(str(bird_id), None)
+        click.echo(f"{len(rows):,} weigh-ins over {days:,} days\n")
+
+        async def compute_rows() -> None:  # noqa: WPS430
+            _analyze_rows(rows, window)
+
+        async def compute_columns() -> None:  # noqa: WPS430
+            analyze(bird_id, columns, window)
+
+        async def fetch_columns() -> WeightSeries:  # noqa: WPS430
+            return await dao.get_series(str(bird_id), None)
+
+        async def fetch_rows() -> List[Dict[str, Any]]:  # noqa: WPS430
+            return await _fetch_rows(session, bird_id)
+
+        await _measure("fetch WeightRead rows", calls, fetch_rows)
+        await _measure("fetch columnar series", calls, fetch_columns)
+        await _measure("compute with loops", calls, compute_rows)
+        await _measure("compute vectorized", calls, compute_columns)
+
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+@click.command()
+@click.option("--years", default=5, show_default=True)
+@click.option("--calls", default=20, show_default=True)
+@click.option("--window", default=7, show_default=True, help="Rolling mean days.")
+def main(years: int, calls: int, window: int) -> None:
+    """Benchmark weight analytics."""
+    asyncio.run(run(years, calls, window))
+
+
+if __name__ == "__main__":
+    main()
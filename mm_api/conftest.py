@@ -17,7 +17,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from mm_api.db.dependencies import get_db_session
+from mm_api.db.dependencies import get_db_read_session, get_db_session
 from mm_api.db.models import *  # noqa: WPS433
 from mm_api.db.utils import create_database, drop_database
 from mm_api.schema.bird import BirdNestedChildren, BirdRead
@@ -131,6 +131,7 @@ def fastapi_app(
     """
     application = get_app()
     application.dependency_overrides[get_db_session] = lambda: dbsession
+    application.dependency_overrides[get_db_read_session] = lambda: dbsession
     application.dependency_overrides[get_redis_pool] = lambda: fake_redis_pool
     return application  # noqa: WPS331
 
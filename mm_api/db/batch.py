@@ -0,0 +1,43 @@
+from typing import Any, Callable, List, Sequence, Type, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, Uuid, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from mm_api.db.base import Base
+from mm_api.schema.bulk import BatchGetResult
+
+T = TypeVar("T")
+
+
+def by_ids(model: Type[Base]) -> Select[Any]:
+    """
+    Select rows of a model by a list of ids.
+
+    The ids are sent as one array parameter, so the statement is the
+    same whatever their number.
+
+    :param model: queried model.
+    :return: statement with an `ids` parameter.
+    """
+    ids = bindparam("ids", type_=ARRAY(Uuid()))
+    return select(model).where(model.id == any_(ids))  # type: ignore
+
+
+def batch_result(
+    items: Sequence[T],
+    ids: Sequence[UUID],
+    key: Callable[[T], UUID] = lambda item: item.id,  # type: ignore
+) -> BatchGetResult[T]:
+    """
+    Order found items as requested and list the ids that weren't found.
+
+    :param items: found items, in any order.
+    :param ids: requested ids, without duplicates.
+    :param key: returns the id of an item.
+    :return: items in the order of `ids`, and missing ids.
+    """
+    found = {key(item): item for item in items}
+    ordered: List[T] = [found[uid] for uid in ids if uid in found]
+    missing = [uid for uid in ids if uid not in found]
+    return BatchGetResult(items=ordered, missing=missing)
@@ -0,0 +1,141 @@
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from asyncpg import Connection
+from sqlalchemy import Table, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.base import Base
+from mm_api.settings import settings
+
+# asyncpg can't send more bind parameters than this in one statement.
+MAX_BIND_PARAMS = 32767
+
+
+def _with_python_defaults(table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill columns that have python-side defaults.
+
+    COPY bypasses SQLAlchemy, so defaults like `uuid.uuid4`
+    have to be applied before rows are sent.
+
+    :param table: target table.
+    :param row: row values.
+    :return: row with defaults applied.
+    """
+    filled = dict(row)
+    for column in table.columns:
+        if filled.get(column.key) is not None or column.default is None:
+            continue
+        if column.default.is_scalar:
+            filled[column.key] = column.default.arg  # type: ignore
+        elif column.default.is_callable:
+            filled[column.key] = column.default.arg(None)  # type: ignore
+    return filled
+
+
+async def get_driver_connection(session: AsyncSession) -> Connection:
+    """
+    Get asyncpg connection that backs the session's transaction.
+
+    :param session: current session.
+    :return: asyncpg connection.
+    """
+    # SQLAlchemy sends BEGIN lazily, with the first statement, so
+    # send one to make driver-level calls part of the transaction.
+    await session.execute(text("SELECT 1"))
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection  # type: ignore
+
+
+async def copy_records(
+    connection: Connection,
+    table: Table,
+    rows: Sequence[Dict[str, Any]],
+) -> int:
+    """
+    Stream rows into a table with COPY.
+
+    :param connection: asyncpg connection.
+    :param table: target table.
+    :param rows: rows with the same set of keys.
+    :return: number of copied rows.
+    """
+    if not rows:
+        return 0
+    columns = list(rows[0].keys())
+    await connection.copy_records_to_table(
+        table.name,
+        records=(tuple(row[column] for column in columns) for row in rows),
+        columns=columns,
+    )
+    return len(rows)
+
+
+async def copy_columns(
+    connection: Connection,
+    table: Table,
+    columns: Dict[str, Sequence[Any]],
+) -> int:
+    """
+    Stream column-oriented data into a table with COPY.
+
+    Avoids building a dict per row when data is generated
+    column by column.
+
+    :param connection: asyncpg connection.
+    :param table: target table.
+    :param columns: values of every column, all of the same length.
+    :return: number of copied rows.
+    """
+    rows = len(next(iter(columns.values()), ()))
+    if not rows:
+        return 0
+    await connection.copy_records_to_table(
+        table.name,
+        records=zip(*columns.values()),
+        columns=list(columns.keys()),
+    )
+    return rows
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: Type[Base],
+    rows: Sequence[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+) -> List[uuid.UUID]:
+    """
+    Insert many rows of a model without the unit of work.
+
+    Small payloads are sent as multi-row `INSERT ... RETURNING id`
+    statements of `chunk_size` rows. Payloads of at least
+    `settings.bulk_copy_threshold` rows are streamed with COPY.
+
+    :param session: current session.
+    :param model: model to insert.
+    :param rows: column values of every row.
+    :param chunk_size: rows per INSERT statement.
+    :return: ids of inserted rows.
+    """
+    table: Table = model.__table__  # type: ignore
+    rows = [_with_python_defaults(table, row) for row in rows]
+    if not rows:
+        return []
+
+    if len(rows) >= settings.bulk_copy_threshold:
+        await copy_records(await get_driver_connection(session), table, rows)
+        return [row["id"] for row in rows]
+
+    chunk_size = chunk_size or settings.bulk_chunk_size
+    chunk_size = max(1, min(chunk_size, MAX_BIND_PARAMS // len(rows[0])))
+    # executemany with RETURNING is sent by SQLAlchemy as multi-row
+    # INSERT statements of `insertmanyvalues_page_size` rows each,
+    # compiled once instead of once per chunk.
+    stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    result = await session.execute(
+        stmt.execution_options(insertmanyvalues_page_size=chunk_size),
+        list(rows),
+    )
+    return list(result.scalars().all())
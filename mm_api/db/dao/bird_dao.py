@@ -1,12 +1,26 @@
-from typing import List, Optional
+from typing import Sequence
 
 from fastapi import Depends
-from sqlalchemy import insert, select
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from mm_api.db.dependencies import get_db_session
+from mm_api.db.freshness import Freshness, freshness_statement, get_freshness
+from mm_api.db.includes import to_nested, with_includes
 from mm_api.db.models.bird_model import BirdModel
-from mm_api.schema.bird import BirdCreate, BirdRead
+from mm_api.db.pagination import PageParams, build_page, keyset
+from mm_api.schema.bird import BirdCreate, BirdNestedChildren, BirdRead
+from mm_api.schema.page import Page
+
+# Statements are built once, values are passed as bound parameters.
+CREATE_BIRD = insert(BirdModel).returning(BirdModel)
+GET_BIRD = select(BirdModel).where(BirdModel.id == bindparam("uid"))
+ALL_BIRDS = keyset(select(BirdModel), BirdModel.created_at, BirdModel.id)
+FALCONER_BIRDS = keyset(
+    select(BirdModel).where(BirdModel.falconer_id == bindparam("falconer_id")),
+    BirdModel.created_at,
+    BirdModel.id,
+)
 
 
 class BirdDAO:
@@ -16,32 +30,57 @@ class BirdDAO:
         self.session = session
 
     async def create(self, bird: BirdCreate) -> BirdRead:
-        stmt = insert(BirdModel).values(**bird.dict()).returning(BirdModel)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(CREATE_BIRD, bird.dict())
         return BirdRead.from_orm(result.scalar())
 
-    async def get_all(self, limit: int, offset: int) -> List[BirdRead]:
-        raw_birds = await self.session.execute(
-            select(BirdModel).limit(limit).offset(offset),
-        )
-
-        return [BirdRead.from_orm(bird) for bird in raw_birds.scalars().fetchall()]
+    async def get_all(self, page: PageParams = PageParams()) -> Page[BirdRead]:
+        query, params = ALL_BIRDS.for_page(page)
+        raw_birds = await self.session.execute(query, params)
+        birds = [BirdRead.from_orm(bird) for bird in raw_birds.scalars().fetchall()]
+        return build_page(birds, page, lambda bird: (bird.created_at, bird.id))
 
     async def get_by_id(
         self,
-        uid: Optional[str] = None,
-    ) -> BirdRead:
-        query = select(BirdModel)
-        if uid:
-            query = query.where(BirdModel.id == uid)
-        row = await self.session.execute(query)
-        return BirdRead.from_orm(row.scalar())
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> BirdNestedChildren:
+        row = await self.session.execute(
+            with_includes(GET_BIRD, BirdModel, include),
+            {"uid": uid},
+        )
+        return to_nested(BirdNestedChildren, row.scalar(), include)
+
+    async def freshness_by_id(
+        self,
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of `get_by_id`, without loading the bird.
+
+        :param uid: bird id.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        return await get_freshness(
+            self.session,
+            freshness_statement(GET_BIRD, BirdModel, tuple(include)),
+            {"uid": uid},
+        )
 
     async def get_by_falconer_id(
         self,
         falconer_id: str,
-    ) -> List[BirdRead]:
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Page[BirdNestedChildren]:
+        query, params = FALCONER_BIRDS.for_page(page)
         raw_birds = await self.session.execute(
-            select(BirdModel).where(BirdModel.falconer_id == falconer_id),
+            with_includes(query, BirdModel, include),
+            {"falconer_id": falconer_id, **params},
         )
-        return [BirdRead.from_orm(bird) for bird in raw_birds.scalars().fetchall()]
+        birds = [
+            to_nested(BirdNestedChildren, bird, include)
+            for bird in raw_birds.scalars().fetchall()
+        ]
+        return build_page(birds, page, lambda bird: (bird.created_at, bird.id))
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+from typing import List
+
+from fastapi import Depends
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dependencies import get_db_session
+from mm_api.db.models import BirdDailyStatsModel
+from mm_api.db.rollup import period_start, rollup_periods
+from mm_api.schema.bird_stats import BirdStatsRead, Granularity
+
+# Statements are built once, values are passed as bound parameters.
+BIRD_DAILY_STATS = (
+    select(BirdDailyStatsModel)
+    .where(
+        BirdDailyStatsModel.bird_id == bindparam("bird_id"),
+        BirdDailyStatsModel.day >= bindparam("since"),
+    )
+    .order_by(BirdDailyStatsModel.day)
+)
+
+
+class BirdStatsDAO:
+    """Class for reading the bird_daily_stats rollup."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def get_stats(
+        self,
+        b_id: str,
+        granularity: Granularity = "day",
+        days: int = 90,
+    ) -> List[BirdStatsRead]:
+        """
+        Stats of a bird per day, week or month.
+
+        Reads one row per day with data, however many
+        weights, feedings, hunts and trainings it had.
+
+        :param b_id: bird id.
+        :param granularity: period length.
+        :param days: days to look back, the first period is complete.
+        :return: stats of every period with data, oldest first.
+        """
+        since = period_start(date.today() - timedelta(days=days), granularity)
+        rows = await self.session.execute(
+            BIRD_DAILY_STATS,
+            {"bird_id": b_id, "since": since},
+        )
+        return rollup_periods(rows.scalars().all(), granularity)
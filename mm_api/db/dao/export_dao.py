@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Type
+
+import polars as pl
+from fastapi import Depends
+from sqlalchemy import Select, String, bindparam, cast, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.base import Base
+from mm_api.db.dependencies import get_db_session
+from mm_api.db.models import (
+    BirdModel,
+    FeedingModel,
+    HuntModel,
+    TrainingModel,
+    WeightModel,
+)
+from mm_api.schema.export import ExportTable
+
+# Polars types of the Python types of model columns, UUIDs are exported as text.
+POLARS_TYPES: Dict[type, Any] = {
+    str: pl.String,
+    int: pl.Int64,
+    float: pl.Float64,
+    bool: pl.Boolean,
+    datetime: pl.Datetime("us"),
+}
+
+
+def _columns(model: Type[Base]) -> Dict[str, Any]:
+    return {column.name: column for column in model.__table__.columns}
+
+
+def _polars_type(column: Any) -> Any:
+    return POLARS_TYPES.get(column.type.python_type, pl.String)
+
+
+def _statement(model: Type[Base], time_column: Any) -> Select[Any]:
+    columns = [
+        column
+        if column.type.python_type in POLARS_TYPES
+        else cast(column, String).label(column.name)
+        for column in _columns(model).values()
+    ]
+    owned = BirdModel.falconer_id == bindparam("falconer_id")
+    if model is BirdModel:
+        return select(*columns).where(owned).order_by(time_column)
+    falconer_birds = select(BirdModel.id).where(owned)
+    return (
+        select(*columns)
+        .where(model.bird_id.in_(falconer_birds))  # type: ignore
+        .order_by(model.bird_id, time_column)  # type: ignore
+    )
+
+
+# Statements are built once, values are passed as bound parameters.
+EXPORT_MODELS: Dict[str, Any] = {
+    "birds": (BirdModel, BirdModel.created_at),
+    "weights": (WeightModel, WeightModel.w_time),
+    "feedings": (FeedingModel, FeedingModel.f_time),
+    "hunts": (HuntModel, HuntModel.start_time),
+    "trainings": (TrainingModel, TrainingModel.start_time),
+}
+EXPORTS = {
+    table: _statement(model, time_column)
+    for table, (model, time_column) in EXPORT_MODELS.items()
+}
+EXPORT_SCHEMAS = {
+    table: {name: _polars_type(column) for name, column in _columns(model).items()}
+    for table, (model, _) in EXPORT_MODELS.items()
+}
+
+
+class ExportDAO:
+    """Class for exporting a falconer's records in chunks."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def frames(
+        self,
+        table: ExportTable,
+        falconer_id: str,
+        chunk_size: int,
+    ) -> AsyncIterator[pl.DataFrame]:
+        """
+        Rows of a falconer's table as data frames.
+
+        Rows come from a server-side cursor `chunk_size` at a time,
+        only one chunk is held in memory.
+
+        :param table: exported table.
+        :param falconer_id: falconer id.
+        :param chunk_size: rows per frame.
+        :yield: frames with the columns of `EXPORT_SCHEMAS[table]`.
+        """
+        schema = EXPORT_SCHEMAS[table]
+        result = await self.session.stream(
+            EXPORTS[table],
+            {"falconer_id": falconer_id},
+            execution_options={"yield_per": chunk_size},
+        )
+        async for rows in result.partitions():
+            yield pl.DataFrame(dict(zip(schema, zip(*rows))), schema=schema)
@@ -1,12 +1,24 @@
-from typing import List, Optional
+from typing import Sequence
 
 from fastapi import Depends
-from sqlalchemy import insert, select
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from mm_api.db.dependencies import get_db_session
+from mm_api.db.includes import to_nested, with_includes
 from mm_api.db.models import FalconerModel
-from mm_api.schema.falconer import FalconerCreate, FalconerRead
+from mm_api.db.pagination import PageParams, build_page, keyset
+from mm_api.schema.falconer import FalconerCreate, FalconerNestedBirds, FalconerRead
+from mm_api.schema.page import Page
+
+# Statements are built once, values are passed as bound parameters.
+CREATE_FALCONER = insert(FalconerModel).returning(FalconerModel)
+GET_FALCONER = select(FalconerModel).where(FalconerModel.id == bindparam("uid"))
+ALL_FALCONERS = keyset(
+    select(FalconerModel),
+    FalconerModel.created_at,
+    FalconerModel.id,
+)
 
 
 class FalconerDAO:
@@ -16,32 +28,29 @@ class FalconerDAO:
         self.session = session
 
     async def create(self, falconer: FalconerCreate) -> FalconerRead:
-        stmt = (
-            insert(FalconerModel)
-            .values(**falconer.dict())
-            .returning(
-                FalconerModel,
-            )
-        )
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(CREATE_FALCONER, falconer.dict())
         return FalconerRead.from_orm(result.scalar())
 
-    async def get_all(self, limit: int, offset: int) -> List[FalconerRead]:
-        raw_falconers = await self.session.execute(
-            select(FalconerModel).limit(limit).offset(offset),
-        )
-
-        return [
+    async def get_all(self, page: PageParams = PageParams()) -> Page[FalconerRead]:
+        query, params = ALL_FALCONERS.for_page(page)
+        raw_falconers = await self.session.execute(query, params)
+        falconers = [
             FalconerRead.from_orm(falconer)
             for falconer in raw_falconers.scalars().fetchall()
         ]
+        return build_page(
+            falconers,
+            page,
+            lambda falconer: (falconer.created_at, falconer.id),
+        )
 
     async def get_by_id(
         self,
-        uid: Optional[str] = None,
-    ) -> FalconerRead:
-        query = select(FalconerModel)
-        if uid:
-            query = query.where(FalconerModel.id == uid)
-        row = await self.session.execute(query)
-        return FalconerRead.from_orm(row.scalars().first())
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> FalconerNestedBirds:
+        row = await self.session.execute(
+            with_includes(GET_FALCONER, FalconerModel, include),
+            {"uid": uid},
+        )
+        return to_nested(FalconerNestedBirds, row.scalars().first(), include)
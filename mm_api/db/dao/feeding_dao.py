@@ -1,14 +1,45 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import and_, select
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Insert
 
+from mm_api.db.batch import batch_result, by_ids
+from mm_api.db.bulk import bulk_insert
 from mm_api.db.dependencies import get_db_session
+from mm_api.db.freshness import (
+    Freshness,
+    freshness_keyset,
+    freshness_statement,
+    get_freshness,
+)
+from mm_api.db.includes import to_nested, with_includes
 from mm_api.db.models.feeding_model import FeedingModel
-from mm_api.schema.feeding import FeedingBase, FeedingRead
+from mm_api.db.pagination import PageParams, build_page, keyset
+from mm_api.db.rollup import record_stats
+from mm_api.db.serialize import page_adapter, page_json, read_columns
+from mm_api.schema.bulk import BatchGetResult, BulkCreateResult
+from mm_api.schema.feeding import FeedingBase, FeedingNestedWeight, FeedingRead
+from mm_api.schema.page import Page
+
+# Statements are built once, values are passed as bound parameters.
+CREATE_FEEDING = insert(FeedingModel).returning(FeedingModel)
+GET_FEEDING = select(FeedingModel).where(FeedingModel.id == bindparam("uid"))
+GET_FEEDINGS = by_ids(FeedingModel)
+ALL_FEEDINGS = keyset(select(FeedingModel), FeedingModel.f_time, FeedingModel.id)
+BIRD_FEEDINGS = select(FeedingModel).where(
+    FeedingModel.bird_id == bindparam("bird_id"),
+)
+BIRD_FEEDINGS_SINCE = keyset(
+    BIRD_FEEDINGS.where(FeedingModel.f_time >= bindparam("since")),
+    FeedingModel.f_time,
+    FeedingModel.id,
+)
+BIRD_FEEDINGS_SINCE_ROWS = BIRD_FEEDINGS_SINCE.with_only_columns(
+    *read_columns(FeedingModel, FeedingNestedWeight),
+)
 
 
 class FeedingDAO:
@@ -18,59 +49,174 @@ class FeedingDAO:
         self.session = session
 
     async def create(self, bird: FeedingBase) -> FeedingRead:
-        stmt = Insert(FeedingModel).values(**bird.dict()).returning(FeedingModel)
-        result = await self.session.execute(stmt)
-        return FeedingRead.from_orm(result.scalar())
-
-    async def get_all_feedings(self, limit: int, offset: int) -> List[FeedingModel]:
-        raw_feedings = await self.session.execute(
-            select(FeedingModel).limit(limit).offset(offset),
-        )
-
-        return list(raw_feedings.scalars().fetchall())
+        result = await self.session.execute(CREATE_FEEDING, bird.dict())
+        created = FeedingRead.from_orm(result.scalar())
+        await record_stats(self.session, FeedingModel, [created.dict()])
+        return created
+
+    async def get_all_feedings(
+        self, page: PageParams = PageParams()
+    ) -> Page[FeedingRead]:
+        query, params = ALL_FEEDINGS.for_page(page)
+        raw_feedings = await self.session.execute(query, params)
+        feedings = [
+            FeedingRead.from_orm(row) for row in raw_feedings.scalars().fetchall()
+        ]
+        return build_page(feedings, page, lambda row: (row.f_time, row.id))
 
     async def filter_by_bird_id_and_time(
         self,
-        b_id: Optional[str] = None,
+        b_id: str,
         days: Optional[int] = None,
-    ) -> List[FeedingRead]:
-        query = select(FeedingModel)
-
-        conditions = []
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Page[FeedingNestedWeight]:
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
 
-        if b_id:
-            conditions.append(FeedingModel.bird_id == b_id)
+        query, params = BIRD_FEEDINGS_SINCE.for_page(page)
+        rows = await self.session.execute(
+            with_includes(query, FeedingModel, include),
+            {"bird_id": b_id, "since": since, **params},
+        )
+        items = [
+            to_nested(FeedingNestedWeight, row, include)
+            for row in rows.scalars().fetchall()
+        ]
+        return build_page(items, page, lambda row: (row.f_time, row.id))
 
+    async def filter_json_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = None,
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> bytes:
+        """
+        Same page as `filter_by_bird_id_and_time`, serialized to JSON.
+
+        Without includes only the columns are selected, no model
+        instance is built.
+
+        :param b_id: bird id.
+        :param days: days back from now, all feedings if None.
+        :param page: requested page.
+        :param include: relationships to load.
+        :return: JSON of the page.
+        """
+        if include:
+            nested = await self.filter_by_bird_id_and_time(b_id, days, page, include)
+            return page_adapter(FeedingNestedWeight).dump_json(nested)
+        since = datetime.min
         if days:
-            start_date = datetime.now() - timedelta(days=days)
-            conditions.append(FeedingModel.f_time >= start_date)
+            since = datetime.now() - timedelta(days=days)
 
-        if conditions:
-            query = query.where(and_(*conditions))
-
-        rows = await self.session.execute(query)
-        return [FeedingRead.from_orm(row) for row in rows.scalars().fetchall()]
+        query, params = BIRD_FEEDINGS_SINCE_ROWS.for_page(page)
+        rows = await self.session.execute(
+            query,
+            {"bird_id": b_id, "since": since, **params},
+        )
+        return page_json(
+            FeedingNestedWeight,
+            rows.mappings().all(),
+            page,
+            lambda row: (row["f_time"], row["id"]),
+        )
 
     async def filter_by_bird_id(
         self,
-        b_id: Optional[str] = None,
+        b_id: str,
     ) -> List[FeedingRead]:
-        query = select(FeedingModel)
-        if b_id:
-            query = query.where(FeedingModel.bird_id == b_id)
-        rows = await self.session.execute(query)
+        rows = await self.session.execute(BIRD_FEEDINGS, {"bird_id": b_id})
         return [FeedingRead.from_orm(row) for row in rows.scalars().fetchall()]
 
     async def get_by_id(
         self,
         id: str,
-    ) -> FeedingRead:
-        query = select(FeedingModel)
-        if id:
-            query = query.where(FeedingModel.id == id)
-        rows = await self.session.execute(query)
-        return FeedingRead.from_orm(rows.scalar())
-
-    async def bulk_create(self, feeding: List[FeedingBase]) -> None:
-        self.session.add_all([FeedingModel(**f.dict()) for f in feeding])
+        include: Sequence[str] = (),
+    ) -> FeedingNestedWeight:
+        rows = await self.session.execute(
+            with_includes(GET_FEEDING, FeedingModel, include),
+            {"uid": id},
+        )
+        return to_nested(FeedingNestedWeight, rows.scalar(), include)
+
+    async def get_by_ids(
+        self,
+        ids: Sequence[UUID],
+        include: Sequence[str] = (),
+    ) -> BatchGetResult[FeedingNestedWeight]:
+        """
+        Get feedings by id with one query.
+
+        :param ids: feeding ids.
+        :param include: relationships to load.
+        :return: found feedings in the order of `ids`, and missing ids.
+        """
+        unique = list(dict.fromkeys(ids))
+        rows = await self.session.execute(
+            with_includes(GET_FEEDINGS, FeedingModel, include),
+            {"ids": unique},
+        )
+        feedings = [
+            to_nested(FeedingNestedWeight, row, include)
+            for row in rows.scalars().fetchall()
+        ]
+        return batch_result(feedings, unique)
+
+    async def freshness_by_id(
+        self,
+        id: str,
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of `get_by_id`, without loading the feeding.
+
+        :param id: feeding id.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        return await get_freshness(
+            self.session,
+            freshness_statement(GET_FEEDING, FeedingModel, tuple(include)),
+            {"uid": id},
+        )
+
+    async def freshness_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = None,
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of a page of `filter_by_bird_id_and_time`, without loading it.
+
+        :param b_id: bird id.
+        :param days: days back from now, all feedings if None.
+        :param page: requested page.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
+
+        query, params = freshness_keyset(
+            BIRD_FEEDINGS_SINCE,
+            FeedingModel,
+            tuple(include),
+        ).for_page(page)
+        return await get_freshness(
+            self.session,
+            query,
+            {"bird_id": b_id, "since": since, **params},
+        )
+
+    async def bulk_create(self, feeding: List[FeedingBase]) -> BulkCreateResult:
+        rows = [row.dict() for row in feeding]
+        ids = await bulk_insert(self.session, FeedingModel, rows)
+        await record_stats(self.session, FeedingModel, rows)
         await self.session.commit()
+        return BulkCreateResult(ids=ids, count=len(ids))
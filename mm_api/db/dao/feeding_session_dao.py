@@ -0,0 +1,102 @@
+import uuid
+from typing import Any, Dict, Type, TypeVar
+
+from fastapi import Depends
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.base import Base
+from mm_api.db.dependencies import get_db_session
+from mm_api.db.models.feeding_model import FeedingModel
+from mm_api.db.models.hunt_model import HuntModel
+from mm_api.db.models.training_model import TrainingModel
+from mm_api.db.models.weight_model import WeightModel
+from mm_api.db.rollup import record_stats
+from mm_api.schema.feeding import FeedingRead
+from mm_api.schema.feeding_session import FeedingSessionCreate, FeedingSessionRead
+from mm_api.schema.hunt import HuntRead
+from mm_api.schema.training import TrainingRead
+from mm_api.schema.weight import WeightRead
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+class FeedingSessionDAO:
+    """Class for writing a whole feeding session at once."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def _insert(self, model: Type[ModelT], values: Dict[str, Any]) -> ModelT:
+        stmt = insert(model).values(**values).returning(model)
+        result = await self.session.execute(stmt)
+        await record_stats(self.session, model, [values])
+        return result.scalar_one()
+
+    async def create(self, feeding_session: FeedingSessionCreate) -> FeedingSessionRead:
+        """
+        Insert weights, feeding and the optional training/hunt of one session.
+
+        Ids are generated up front, so rows can reference each other
+        without reading anything back. Both weights go in one
+        multi-row INSERT, every other table gets a single INSERT.
+
+        :param feeding_session: session document.
+        :return: created rows.
+        """
+        bird_id = feeding_session.bird_id
+        start_weight_id, end_weight_id = uuid.uuid4(), uuid.uuid4()
+        links = {
+            "bird_id": bird_id,
+            "start_weight_id": start_weight_id,
+            "end_weight_id": end_weight_id,
+        }
+
+        weights = await self.session.scalars(
+            insert(WeightModel).returning(WeightModel, sort_by_parameter_order=True),
+            [
+                {
+                    "id": start_weight_id,
+                    "bird_id": bird_id,
+                    "post_feeding": False,
+                    **feeding_session.start_weight.dict(),
+                },
+                {
+                    "id": end_weight_id,
+                    "bird_id": bird_id,
+                    "post_feeding": True,
+                    **feeding_session.end_weight.dict(),
+                },
+            ],
+        )
+        start_weight, end_weight = weights.all()
+        await record_stats(
+            self.session,
+            WeightModel,
+            [
+                WeightRead.from_orm(weight).dict()
+                for weight in (start_weight, end_weight)
+            ],
+        )
+        feeding = await self._insert(
+            FeedingModel,
+            {**links, **feeding_session.feeding.dict()},
+        )
+
+        created = FeedingSessionRead(
+            start_weight=WeightRead.from_orm(start_weight),
+            end_weight=WeightRead.from_orm(end_weight),
+            feeding=FeedingRead.from_orm(feeding),
+        )
+        if feeding_session.training is not None:
+            training = await self._insert(
+                TrainingModel,
+                {**links, **feeding_session.training.dict()},
+            )
+            created.training = TrainingRead.from_orm(training)
+        if feeding_session.hunt is not None:
+            hunt = await self._insert(
+                HuntModel, {**links, **feeding_session.hunt.dict()}
+            )
+            created.hunt = HuntRead.from_orm(hunt)
+        return created
@@ -1,14 +1,45 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import and_, select
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Insert
 
+from mm_api.db.batch import batch_result, by_ids
+from mm_api.db.bulk import bulk_insert
 from mm_api.db.dependencies import get_db_session
+from mm_api.db.freshness import (
+    Freshness,
+    freshness_keyset,
+    freshness_statement,
+    get_freshness,
+)
+from mm_api.db.includes import to_nested, with_includes
 from mm_api.db.models.hunt_model import HuntModel
-from mm_api.schema.hunt import HuntBase, HuntRead
+from mm_api.db.pagination import PageParams, build_page, keyset
+from mm_api.db.rollup import record_stats
+from mm_api.db.serialize import page_adapter, page_json, read_columns
+from mm_api.schema.bulk import BatchGetResult, BulkCreateResult
+from mm_api.schema.hunt import HuntBase, HuntNestedWeight, HuntRead
+from mm_api.schema.page import Page
+
+# Statements are built once, values are passed as bound parameters.
+CREATE_HUNT = insert(HuntModel).returning(HuntModel)
+GET_HUNT = select(HuntModel).where(HuntModel.id == bindparam("uid"))
+GET_HUNTS = by_ids(HuntModel)
+ALL_HUNTS = keyset(select(HuntModel), HuntModel.start_time, HuntModel.id)
+BIRD_HUNTS_SINCE = keyset(
+    select(HuntModel).where(
+        HuntModel.bird_id == bindparam("bird_id"),
+        HuntModel.start_time >= bindparam("since"),
+    ),
+    HuntModel.start_time,
+    HuntModel.id,
+)
+BIRD_HUNTS_SINCE_ROWS = BIRD_HUNTS_SINCE.with_only_columns(
+    *read_columns(HuntModel, HuntNestedWeight),
+)
 
 
 class HuntDAO:
@@ -18,49 +49,163 @@ class HuntDAO:
         self.session = session
 
     async def create(self, bird: HuntBase) -> HuntRead:
-        stmt = Insert(HuntModel).values(**bird.dict()).returning(HuntModel)
-        result = await self.session.execute(stmt)
-        return HuntRead.from_orm(result.scalar())
+        result = await self.session.execute(CREATE_HUNT, bird.dict())
+        created = HuntRead.from_orm(result.scalar())
+        await record_stats(self.session, HuntModel, [created.dict()])
+        return created
 
-    async def get_all_hunts(self, limit: int, offset: int) -> List[HuntModel]:
-        raw_hunts = await self.session.execute(
-            select(HuntModel).limit(limit).offset(offset),
-        )
-
-        return list(raw_hunts.scalars().fetchall())
+    async def get_all_hunts(self, page: PageParams = PageParams()) -> Page[HuntRead]:
+        query, params = ALL_HUNTS.for_page(page)
+        raw_hunts = await self.session.execute(query, params)
+        hunts = [HuntRead.from_orm(row) for row in raw_hunts.scalars().fetchall()]
+        return build_page(hunts, page, lambda row: (row.start_time, row.id))
 
     async def get_by_id(
         self,
-        uid: Optional[str] = None,
-    ) -> HuntRead:
-        query = select(HuntModel)
-        if uid:
-            query = query.where(HuntModel.id == uid)
-        rows = await self.session.execute(query)
-        return HuntRead.from_orm(rows.scalar())
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> HuntNestedWeight:
+        rows = await self.session.execute(
+            with_includes(GET_HUNT, HuntModel, include),
+            {"uid": uid},
+        )
+        return to_nested(HuntNestedWeight, rows.scalar(), include)
 
     async def filter_by_bird_id_and_time(
         self,
-        b_id: Optional[str] = None,
+        b_id: str,
         days: Optional[int] = None,
-    ) -> List[HuntRead]:
-        query = select(HuntModel)
-
-        conditions = []
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Page[HuntNestedWeight]:
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
 
-        if b_id:
-            conditions.append(HuntModel.bird_id == b_id)
+        query, params = BIRD_HUNTS_SINCE.for_page(page)
+        rows = await self.session.execute(
+            with_includes(query, HuntModel, include),
+            {"bird_id": b_id, "since": since, **params},
+        )
+        items = [
+            to_nested(HuntNestedWeight, row, include)
+            for row in rows.scalars().fetchall()
+        ]
+        return build_page(items, page, lambda row: (row.start_time, row.id))
 
+    async def filter_json_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = None,
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> bytes:
+        """
+        Same page as `filter_by_bird_id_and_time`, serialized to JSON.
+
+        Without includes only the columns are selected, no model
+        instance is built.
+
+        :param b_id: bird id.
+        :param days: days back from now, all hunts if None.
+        :param page: requested page.
+        :param include: relationships to load.
+        :return: JSON of the page.
+        """
+        if include:
+            nested = await self.filter_by_bird_id_and_time(b_id, days, page, include)
+            return page_adapter(HuntNestedWeight).dump_json(nested)
+        since = datetime.min
         if days:
-            start_date = datetime.now() - timedelta(days=days)
-            conditions.append(HuntModel.start_time >= start_date)
+            since = datetime.now() - timedelta(days=days)
+
+        query, params = BIRD_HUNTS_SINCE_ROWS.for_page(page)
+        rows = await self.session.execute(
+            query,
+            {"bird_id": b_id, "since": since, **params},
+        )
+        return page_json(
+            HuntNestedWeight,
+            rows.mappings().all(),
+            page,
+            lambda row: (row["start_time"], row["id"]),
+        )
 
-        if conditions:
-            query = query.where(and_(*conditions))
+    async def get_by_ids(
+        self,
+        ids: Sequence[UUID],
+        include: Sequence[str] = (),
+    ) -> BatchGetResult[HuntNestedWeight]:
+        """
+        Get hunts by id with one query.
+
+        :param ids: hunt ids.
+        :param include: relationships to load.
+        :return: found hunts in the order of `ids`, and missing ids.
+        """
+        unique = list(dict.fromkeys(ids))
+        rows = await self.session.execute(
+            with_includes(GET_HUNTS, HuntModel, include),
+            {"ids": unique},
+        )
+        hunts = [
+            to_nested(HuntNestedWeight, row, include)
+            for row in rows.scalars().fetchall()
+        ]
+        return batch_result(hunts, unique)
+
+    async def freshness_by_id(
+        self,
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of `get_by_id`, without loading the hunt.
+
+        :param uid: hunt id.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        return await get_freshness(
+            self.session,
+            freshness_statement(GET_HUNT, HuntModel, tuple(include)),
+            {"uid": uid},
+        )
 
-        rows = await self.session.execute(query)
-        return [HuntRead.from_orm(row) for row in rows.scalars().fetchall()]
+    async def freshness_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = None,
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of a page of `filter_by_bird_id_and_time`, without loading it.
+
+        :param b_id: bird id.
+        :param days: days back from now, all hunts if None.
+        :param page: requested page.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
+
+        query, params = freshness_keyset(
+            BIRD_HUNTS_SINCE,
+            HuntModel,
+            tuple(include),
+        ).for_page(page)
+        return await get_freshness(
+            self.session,
+            query,
+            {"bird_id": b_id, "since": since, **params},
+        )
 
-    async def bulk_create(self, hunts: List[HuntBase]) -> None:
-        self.session.add_all([HuntModel(**f.dict()) for f in hunts])
+    async def bulk_create(self, hunts: List[HuntBase]) -> BulkCreateResult:
+        rows = [row.dict() for row in hunts]
+        ids = await bulk_insert(self.session, HuntModel, rows)
+        await record_stats(self.session, HuntModel, rows)
         await self.session.commit()
+        return BulkCreateResult(ids=ids, count=len(ids))
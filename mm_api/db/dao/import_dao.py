@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Sequence, Tuple, Type
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.base import Base
+from mm_api.db.bulk import bulk_insert
+from mm_api.db.dependencies import get_db_session
+from mm_api.db.models import (
+    BirdModel,
+    FeedingModel,
+    HuntModel,
+    TrainingModel,
+    WeightModel,
+)
+from mm_api.db.rollup import record_stats
+from mm_api.schema.imports import ImportTable
+
+IMPORT_MODELS: Dict[str, Type[Base]] = {
+    "weights": WeightModel,
+    "feedings": FeedingModel,
+    "hunts": HuntModel,
+    "trainings": TrainingModel,
+}
+
+# Statements are built once, values are passed as bound parameters.
+FALCONER_BIRD_NAMES = select(BirdModel.id, BirdModel.name).where(
+    BirdModel.falconer_id == bindparam("falconer_id"),
+)
+
+
+class ImportDAO:
+    """Class for importing a falconer's records in chunks."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def bird_names(self, falconer_id: str) -> List[Tuple[UUID, str]]:
+        """
+        Ids and names of a falconer's birds.
+
+        :param falconer_id: falconer id.
+        :return: `(id, name)` of every bird.
+        """
+        result = await self.session.execute(
+            FALCONER_BIRD_NAMES,
+            {"falconer_id": falconer_id},
+        )
+        return [(bird_id, name) for bird_id, name in result.all()]
+
+    async def insert(self, table: ImportTable, rows: Sequence[Dict[str, Any]]) -> int:
+        """
+        Insert and commit one chunk of rows.
+
+        The chunk is written in a savepoint, a chunk rejected by the
+        database is rolled back alone and earlier chunks stay committed.
+
+        :param table: imported table.
+        :param rows: validated column values.
+        :return: number of inserted rows.
+        """
+        model = IMPORT_MODELS[table]
+        async with self.session.begin_nested():
+            ids = await bulk_insert(self.session, model, rows)
+            await record_stats(self.session, model, rows)
+        await self.session.commit()
+        return len(ids)
@@ -1,14 +1,49 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import and_, select
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Insert
 
+from mm_api.db.batch import batch_result, by_ids
+from mm_api.db.bulk import bulk_insert
 from mm_api.db.dependencies import get_db_session
+from mm_api.db.freshness import (
+    Freshness,
+    freshness_keyset,
+    freshness_statement,
+    get_freshness,
+)
+from mm_api.db.includes import to_nested, with_includes
 from mm_api.db.models.training_model import TrainingModel
-from mm_api.schema.training import TrainingBase, TrainingRead
+from mm_api.db.pagination import PageParams, build_page, keyset
+from mm_api.db.rollup import record_stats
+from mm_api.db.serialize import page_adapter, page_json, read_columns
+from mm_api.schema.bulk import BatchGetResult, BulkCreateResult
+from mm_api.schema.page import Page
+from mm_api.schema.training import TrainingBase, TrainingNestedWeight, TrainingRead
+
+# Statements are built once, values are passed as bound parameters.
+CREATE_TRAINING = insert(TrainingModel).returning(TrainingModel)
+GET_TRAINING = select(TrainingModel).where(TrainingModel.id == bindparam("uid"))
+GET_TRAININGS = by_ids(TrainingModel)
+ALL_TRAININGS = keyset(
+    select(TrainingModel),
+    TrainingModel.start_time,
+    TrainingModel.id,
+)
+BIRD_TRAININGS_SINCE = keyset(
+    select(TrainingModel).where(
+        TrainingModel.bird_id == bindparam("bird_id"),
+        TrainingModel.start_time >= bindparam("since"),
+    ),
+    TrainingModel.start_time,
+    TrainingModel.id,
+)
+BIRD_TRAININGS_SINCE_ROWS = BIRD_TRAININGS_SINCE.with_only_columns(
+    *read_columns(TrainingModel, TrainingNestedWeight),
+)
 
 
 class TrainingDAO:
@@ -18,48 +53,167 @@ class TrainingDAO:
         self.session = session
 
     async def create(self, bird: TrainingBase) -> TrainingRead:
-        stmt = Insert(TrainingModel).values(**bird.dict()).returning(TrainingModel)
-        result = await self.session.execute(stmt)
-        return TrainingRead.from_orm(result.scalar())
-
-    async def get_all_trainings(self, limit: int, offset: int) -> List[TrainingModel]:
-        raw_trainings = await self.session.execute(
-            select(TrainingModel).limit(limit).offset(offset),
-        )
+        result = await self.session.execute(CREATE_TRAINING, bird.dict())
+        created = TrainingRead.from_orm(result.scalar())
+        await record_stats(self.session, TrainingModel, [created.dict()])
+        return created
 
-        return list(raw_trainings.scalars().fetchall())
+    async def get_all_trainings(
+        self, page: PageParams = PageParams()
+    ) -> Page[TrainingRead]:
+        query, params = ALL_TRAININGS.for_page(page)
+        raw_trainings = await self.session.execute(query, params)
+        trainings = [
+            TrainingRead.from_orm(row) for row in raw_trainings.scalars().fetchall()
+        ]
+        return build_page(trainings, page, lambda row: (row.start_time, row.id))
 
     async def get_by_id(
         self,
-        uid: Optional[str] = None,
-    ) -> TrainingRead:
-        query = select(TrainingModel)
-        if uid:
-            query = query.where(TrainingModel.id == uid)
-        rows = await self.session.execute(query)
-        return TrainingRead.from_orm(rows.scalar())
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> TrainingNestedWeight:
+        rows = await self.session.execute(
+            with_includes(GET_TRAINING, TrainingModel, include),
+            {"uid": uid},
+        )
+        return to_nested(TrainingNestedWeight, rows.scalar(), include)
 
     async def filter_by_bird_id_and_time(
         self,
-        b_id: Optional[str] = None,
+        b_id: str,
         days: Optional[int] = None,
-    ) -> List[TrainingRead]:
-        query = select(TrainingModel)
-        conditions = []
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Page[TrainingNestedWeight]:
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
 
-        if b_id:
-            conditions.append(TrainingModel.bird_id == b_id)
+        query, params = BIRD_TRAININGS_SINCE.for_page(page)
+        rows = await self.session.execute(
+            with_includes(query, TrainingModel, include),
+            {"bird_id": b_id, "since": since, **params},
+        )
+        items = [
+            to_nested(TrainingNestedWeight, row, include)
+            for row in rows.scalars().fetchall()
+        ]
+        return build_page(items, page, lambda row: (row.start_time, row.id))
 
+    async def filter_json_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = None,
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> bytes:
+        """
+        Same page as `filter_by_bird_id_and_time`, serialized to JSON.
+
+        Without includes only the columns are selected, no model
+        instance is built.
+
+        :param b_id: bird id.
+        :param days: days back from now, all trainings if None.
+        :param page: requested page.
+        :param include: relationships to load.
+        :return: JSON of the page.
+        """
+        if include:
+            nested = await self.filter_by_bird_id_and_time(b_id, days, page, include)
+            return page_adapter(TrainingNestedWeight).dump_json(nested)
+        since = datetime.min
         if days:
-            start_date = datetime.now() - timedelta(days=days)
-            conditions.append(TrainingModel.start_time >= start_date)
+            since = datetime.now() - timedelta(days=days)
+
+        query, params = BIRD_TRAININGS_SINCE_ROWS.for_page(page)
+        rows = await self.session.execute(
+            query,
+            {"bird_id": b_id, "since": since, **params},
+        )
+        return page_json(
+            TrainingNestedWeight,
+            rows.mappings().all(),
+            page,
+            lambda row: (row["start_time"], row["id"]),
+        )
 
-        if conditions:
-            query = query.where(and_(*conditions))
+    async def get_by_ids(
+        self,
+        ids: Sequence[UUID],
+        include: Sequence[str] = (),
+    ) -> BatchGetResult[TrainingNestedWeight]:
+        """
+        Get trainings by id with one query.
+
+        :param ids: training ids.
+        :param include: relationships to load.
+        :return: found trainings in the order of `ids`, and missing ids.
+        """
+        unique = list(dict.fromkeys(ids))
+        rows = await self.session.execute(
+            with_includes(GET_TRAININGS, TrainingModel, include),
+            {"ids": unique},
+        )
+        trainings = [
+            to_nested(TrainingNestedWeight, row, include)
+            for row in rows.scalars().fetchall()
+        ]
+        return batch_result(trainings, unique)
+
+    async def freshness_by_id(
+        self,
+        uid: str,
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of `get_by_id`, without loading the training.
+
+        :param uid: training id.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        return await get_freshness(
+            self.session,
+            freshness_statement(GET_TRAINING, TrainingModel, tuple(include)),
+            {"uid": uid},
+        )
 
-        rows = await self.session.execute(query)
-        return [TrainingRead.from_orm(row) for row in rows.scalars().fetchall()]
+    async def freshness_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = None,
+        page: PageParams = PageParams(),
+        include: Sequence[str] = (),
+    ) -> Freshness:
+        """
+        Freshness of a page of `filter_by_bird_id_and_time`, without loading it.
+
+        :param b_id: bird id.
+        :param days: days back from now, all trainings if None.
+        :param page: requested page.
+        :param include: relationships to load.
+        :return: latest `updated_at` and number of rows.
+        """
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
+
+        query, params = freshness_keyset(
+            BIRD_TRAININGS_SINCE,
+            TrainingModel,
+            tuple(include),
+        ).for_page(page)
+        return await get_freshness(
+            self.session,
+            query,
+            {"bird_id": b_id, "since": since, **params},
+        )
 
-    async def bulk_create(self, trainings: List[TrainingBase]) -> None:
-        self.session.add_all([TrainingModel(**f.dict()) for f in trainings])
+    async def bulk_create(self, trainings: List[TrainingBase]) -> BulkCreateResult:
+        rows = [row.dict() for row in trainings]
+        ids = await bulk_insert(self.session, TrainingModel, rows)
+        await record_stats(self.session, TrainingModel, rows)
         await self.session.commit()
+        return BulkCreateResult(ids=ids, count=len(ids))
@@ -1,15 +1,67 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import and_, select, desc, func, text
+from sqlalchemy import Interval, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Insert
 
+from mm_api.db.batch import batch_result, by_ids
+from mm_api.db.bulk import bulk_insert
 from mm_api.db.dependencies import get_db_session
+from mm_api.db.freshness import (
+    Freshness,
+    freshness_keyset,
+    freshness_statement,
+    get_freshness,
+)
 from mm_api.db.models.weight_model import WeightModel
+from mm_api.db.pagination import PageParams, build_page, keyset
+from mm_api.db.rollup import record_stats
+from mm_api.db.serialize import page_json, read_columns
+from mm_api.schema.bulk import BatchGetResult, BulkCreateResult
+from mm_api.schema.page import Page
 from mm_api.schema.weight import WeightCreate, WeightRead
-from loguru import logger
+from mm_api.services.weight_analytics import WeightSeries
+
+# Statements are built once, values are passed as bound parameters.
+CREATE_WEIGHT = insert(WeightModel).returning(WeightModel)
+GET_WEIGHT = select(WeightModel).where(WeightModel.id == bindparam("uid"))
+GET_WEIGHTS = by_ids(WeightModel)
+ALL_WEIGHTS = keyset(select(WeightModel), WeightModel.w_time, WeightModel.id)
+# The window is anchored on the bird's latest weigh-in, not on now().
+# As a scalar subquery it runs first as an InitPlan, so Postgres prunes
+# the monthly partitions older than the window at execution time.
+_latest_w_time = (
+    select(WeightModel.w_time)
+    .where(WeightModel.bird_id == bindparam("bird_id"))
+    .order_by(WeightModel.w_time.desc())
+    .limit(1)
+    .scalar_subquery()
+)
+BIRD_WEIGHTS_WINDOW = keyset(
+    select(WeightModel).where(
+        WeightModel.bird_id == bindparam("bird_id"),
+        WeightModel.w_time >= _latest_w_time - bindparam("window", type_=Interval()),
+    ),
+    WeightModel.w_time,
+    WeightModel.id,
+)
+BIRD_WEIGHTS_WINDOW_ROWS = BIRD_WEIGHTS_WINDOW.with_only_columns(
+    *read_columns(WeightModel, WeightRead),
+)
+
+# The whole series as one row of arrays, one per column.
+BIRD_WEIGHT_SERIES = select(
+    *(
+        array_agg(aggregate_order_by(column, WeightModel.w_time))
+        for column in (WeightModel.w_time, WeightModel.weight, WeightModel.post_feeding)
+    ),
+).where(
+    WeightModel.bird_id == bindparam("bird_id"),
+    WeightModel.w_time >= bindparam("since"),
+)
 
 
 class WeightDAO:
@@ -19,53 +71,141 @@ class WeightDAO:
         self.session = session
 
     async def create(self, bird: WeightCreate) -> WeightRead:
-        stmt = Insert(WeightModel).values(**bird.dict()).returning(WeightModel)
-        result = await self.session.execute(stmt)
-        return WeightRead.from_orm(result.scalar())
-
-    async def get_all_weights_by_id(self, limit: int, offset: int) -> List[WeightModel]:
-        raw_weights = await self.session.execute(
-            select(WeightModel).limit(limit).offset(offset),
-        )
+        result = await self.session.execute(CREATE_WEIGHT, bird.dict())
+        created = WeightRead.from_orm(result.scalar())
+        await record_stats(self.session, WeightModel, [created.dict()])
+        return created
 
-        return list(raw_weights.scalars().fetchall())
+    async def get_all_weights_by_id(
+        self,
+        page: PageParams = PageParams(),
+    ) -> Page[WeightRead]:
+        query, params = ALL_WEIGHTS.for_page(page)
+        raw_weights = await self.session.execute(query, params)
+        weights = [WeightRead.from_orm(row) for row in raw_weights.scalars().fetchall()]
+        return build_page(weights, page, lambda row: (row.w_time, row.id))
 
     async def get_by_id(
         self,
-        uid: Optional[str] = None,
+        uid: str,
     ) -> WeightRead:
-        query = select(WeightModel)
-        if uid:
-            query = query.where(WeightModel.id == uid)
-        rows = await self.session.execute(query)
+        rows = await self.session.execute(GET_WEIGHT, {"uid": uid})
         return WeightRead.from_orm(rows.scalar())
 
     async def filter_by_bird_id_and_time(
         self,
-        b_id: Optional[str] = None,
+        b_id: str,
+        days: Optional[int] = 30,
+        page: PageParams = PageParams(),
+    ) -> Page[WeightRead]:
+        query, params = BIRD_WEIGHTS_WINDOW.for_page(page)
+        result = await self.session.execute(
+            query,
+            {"bird_id": b_id, "window": timedelta(days=days or 0), **params},
+        )
+        weights = [WeightRead.from_orm(row) for row in result.scalars().fetchall()]
+        return build_page(weights, page, lambda row: (row.w_time, row.id))
+
+    async def filter_json_by_bird_id_and_time(
+        self,
+        b_id: str,
+        days: Optional[int] = 30,
+        page: PageParams = PageParams(),
+    ) -> bytes:
+        """
+        Same page as `filter_by_bird_id_and_time`, serialized to JSON.
+
+        Only the columns are selected, no model instance is built.
+
+        :param b_id: bird id.
+        :param days: days back from the latest weigh-in.
+        :param page: requested page.
+        :return: JSON of the page.
+        """
+        query, params = BIRD_WEIGHTS_WINDOW_ROWS.for_page(page)
+        result = await self.session.execute(
+            query,
+            {"bird_id": b_id, "window": timedelta(days=days or 0), **params},
+        )
+        return page_json(
+            WeightRead,
+            result.mappings().all(),
+            page,
+            lambda row: (row["w_time"], row["id"]),
+        )
+
+    async def get_by_ids(self, ids: Sequence[UUID]) -> BatchGetResult[WeightRead]:
+        """
+        Get weights by id with one query.
+
+        :param ids: weight ids.
+        :return: found weights in the order of `ids`, and missing ids.
+        """
+        unique = list(dict.fromkeys(ids))
+        rows = await self.session.execute(GET_WEIGHTS, {"ids": unique})
+        weights = [WeightRead.from_orm(row) for row in rows.scalars().fetchall()]
+        return batch_result(weights, unique)
+
+    async def freshness_by_id(self, uid: str) -> Freshness:
+        """
+        Freshness of `get_by_id`, without loading the weight.
+
+        :param uid: weight id.
+        :return: latest `updated_at` and number of rows.
+        """
+        return await get_freshness(
+            self.session,
+            freshness_statement(GET_WEIGHT, WeightModel),
+            {"uid": uid},
+        )
+
+    async def freshness_by_bird_id_and_time(
+        self,
+        b_id: str,
         days: Optional[int] = 30,
-    ) -> List[WeightRead]:
-
-        query = text(
-            """
-            WITH latest_entry AS (
-                SELECT w_time
-                FROM weights
-                WHERE bird_id = :bird_id
-                ORDER BY w_time DESC
-                LIMIT 1
-            )
-            SELECT w.*
-            FROM weights w, latest_entry
-            WHERE w.bird_id = :bird_id
-              AND w.w_time >= (latest_entry.w_time - make_interval(days := :days))
-            ORDER BY w.w_time DESC
-            """,
+        page: PageParams = PageParams(),
+    ) -> Freshness:
+        """
+        Freshness of a page of `filter_by_bird_id_and_time`, without loading it.
+
+        :param b_id: bird id.
+        :param days: days back from the latest weigh-in.
+        :param page: requested page.
+        :return: latest `updated_at` and number of rows.
+        """
+        query, params = freshness_keyset(BIRD_WEIGHTS_WINDOW, WeightModel).for_page(
+            page
+        )
+        return await get_freshness(
+            self.session,
+            query,
+            {"bird_id": b_id, "window": timedelta(days=days or 0), **params},
         )
-        result = await self.session.execute(query, {"days": days, "bird_id": str(b_id)})
 
-        return [WeightRead.from_orm(row) for row in result.fetchall()]
+    async def get_series(
+        self,
+        b_id: str,
+        days: Optional[int] = 365,
+    ) -> WeightSeries:
+        """
+        Weigh-ins of a bird in columnar form.
+
+        :param b_id: bird id.
+        :param days: days to look back, the whole history if empty.
+        :return: weight series ordered by time.
+        """
+        since = datetime.min
+        if days:
+            since = datetime.now() - timedelta(days=days)
+        result = await self.session.execute(
+            BIRD_WEIGHT_SERIES,
+            {"bird_id": b_id, "since": since},
+        )
+        return WeightSeries.from_lists(*result.one())
 
-    async def bulk_create(self, weight: List[WeightCreate]) -> None:
-        self.session.add_all([WeightModel(**w.dict()) for w in weight])
+    async def bulk_create(self, weight: List[WeightCreate]) -> BulkCreateResult:
+        rows = [row.dict() for row in weight]
+        ids = await bulk_insert(self.session, WeightModel, rows)
+        await record_stats(self.session, WeightModel, rows)
         await self.session.commit()
+        return BulkCreateResult(ids=ids, count=len(ids))
@@ -0,0 +1,89 @@
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import and_, bindparam, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dependencies import get_db_session
+from mm_api.db.models import BirdModel, WeightGainModel, WeightModel
+from mm_api.schema.weight_gain import WeightPrediction
+from mm_api.services.weight_gain import predict
+
+# Statements are built once, values are passed as bound parameters.
+_latest_weight = (
+    select(WeightModel.weight)
+    .where(
+        WeightModel.bird_id == bindparam("bird_id"),
+        WeightModel.post_feeding.is_(False),
+    )
+    .order_by(WeightModel.w_time.desc())
+    .limit(1)
+    .scalar_subquery()
+)
+_species = select(BirdModel.species).where(BirdModel.id == bindparam("bird_id"))
+# Primary key lookups of the bird's model and of its species' model,
+# the bird's own wins.
+BIRD_WEIGHT_GAIN = (
+    select(WeightGainModel, _latest_weight.label("weight"))
+    .where(
+        or_(
+            and_(
+                WeightGainModel.scope == "bird",
+                WeightGainModel.key == bindparam("bird_key"),
+            ),
+            and_(
+                WeightGainModel.scope == "species",
+                WeightGainModel.key == _species.scalar_subquery(),
+            ),
+        ),
+    )
+    .order_by(WeightGainModel.scope)
+    .limit(1)
+)
+
+
+class WeightGainDAO:
+    """Class for reading fitted food-to-weight-gain models."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)):
+        self.session = session
+
+    async def get_prediction(
+        self,
+        b_id: str,
+        amount: float,
+        weight: Optional[float] = None,
+    ) -> Optional[WeightPrediction]:
+        """
+        Predict a bird's weight the day after a feeding.
+
+        :param b_id: bird id.
+        :param amount: grams to feed.
+        :param weight: weight before feeding, the latest
+            pre-feeding weigh-in by default.
+        :return: prediction, None without a model or a weight.
+        """
+        result = await self.session.execute(
+            BIRD_WEIGHT_GAIN,
+            {"bird_id": b_id, "bird_key": b_id},
+        )
+        row = result.first()
+        if row is None:
+            return None
+        model, latest_weight = row
+        weight = latest_weight if weight is None else weight
+        if weight is None:
+            return None
+        predicted_weight, gain, overnight_loss = predict(model, weight, amount)
+        return WeightPrediction(
+            bird_id=b_id,
+            scope=model.scope,
+            samples=model.samples,
+            fitted_at=model.fitted_at,
+            gain_per_gram=model.gain_per_gram,
+            amount=amount,
+            weight=weight,
+            gain=gain,
+            overnight_loss=overnight_loss,
+            predicted_weight=predicted_weight,
+        )
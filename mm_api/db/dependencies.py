@@ -1,20 +1,84 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, Type, TypeVar
 
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 
+DAOT = TypeVar("DAOT")
+
 
 async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Create and get database session.
 
+    GET requests get a read replica session unless the client
+    wrote recently, everything else goes to the primary.
+
     :param request: current request.
     :yield: database session.
     """
-    session: AsyncSession = request.app.state.db_session_factory()
+    session = await request.app.state.db_router.session_for(request)
 
     try:  # noqa: WPS501
         yield session
     finally:
         await session.commit()
         await session.close()
+        for callback in session.info.pop("after_commit", ()):
+            await callback()
+
+
+def after_commit(
+    session: AsyncSession, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """
+    Run a callback once the request's session is committed.
+
+    :param session: session of `get_db_session`.
+    :param callback: coroutine function to await.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def get_db_read_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create and get a read-only database session.
+
+    The transaction is opened as `BEGIN READ ONLY` and never committed,
+    closing the session only gives the connection back to the pool.
+    It may read from a replica whatever the method, and never pins
+    the client to the primary.
+
+    :param request: current request.
+    :yield: database session.
+    """
+    session = await request.app.state.db_router.session_for(
+        request,
+        read_only=True,
+    )
+    await session.connection(execution_options={"postgresql_readonly": True})
+
+    try:  # noqa: WPS501
+        yield session
+    finally:
+        await session.close()
+
+
+def read_only(dao: Type[DAOT]) -> Callable[[AsyncSession], DAOT]:
+    """
+    Dependency that builds a DAO on a read-only session.
+
+    >>> bird_dao: BirdDAO = Depends(read_only(BirdDAO))
+
+    :param dao: DAO class.
+    :return: dependency.
+    """
+
+    def dependency(  # noqa: WPS430
+        session: AsyncSession = Depends(get_db_read_session),
+    ) -> DAOT:
+        return dao(session)  # type: ignore
+
+    return dependency
@@ -0,0 +1,91 @@
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool.base import PoolProxiedConnection
+
+from mm_api.services.metrics import Counter, Gauge
+from mm_api.settings import settings
+
+POOL_SIZE = Gauge("mm_api_db_pool_size", "Configured connections of a pool.")
+POOL_CHECKED_OUT = Gauge(
+    "mm_api_db_pool_checked_out",
+    "Connections currently in use.",
+)
+POOL_CHECKOUTS = Counter(
+    "mm_api_db_pool_checkouts_total",
+    "Connections handed out by a pool.",
+)
+POOL_WAIT = Counter(
+    "mm_api_db_pool_wait_seconds_total",
+    "Time spent waiting for a connection, including opening it.",
+)
+POOL_TIMEOUTS = Counter(
+    "mm_api_db_pool_timeouts_total",
+    "Checkouts that failed after waiting `pool_timeout` seconds.",
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports usage to `mm_api.services.metrics`."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        POOL_SIZE.set(self.size() + self._max_overflow, pool=self.name)
+
+    @property
+    def name(self) -> str:
+        """
+        Pool label of the metrics.
+
+        :return: `pool_logging_name` of the engine.
+        """
+        return self.logging_name or "default"
+
+    def connect(self) -> PoolProxiedConnection:
+        """
+        Check out a connection, measuring how long it took.
+
+        :raises PoolTimeoutError: if no connection got free in time.
+        :return: connection.
+        """
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(pool=self.name)
+            raise
+        finally:
+            POOL_WAIT.inc(time.perf_counter() - start, pool=self.name)
+        POOL_CHECKOUTS.inc(pool=self.name)
+        POOL_CHECKED_OUT.set(self.checkedout(), pool=self.name)
+        return connection
+
+    def _do_return_conn(self, record: Any) -> None:
+        super()._do_return_conn(record)
+        POOL_CHECKED_OUT.set(self.checkedout(), pool=self.name)
+
+
+def create_engine(url: str, name: str) -> AsyncEngine:
+    """
+    Create an engine with the pool configured in settings.
+
+    :param url: database URL.
+    :param name: pool label of the metrics.
+    :return: new engine.
+    """
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        query_cache_size=settings.db_query_cache_size,
+        connect_args={
+            "prepared_statement_cache_size": (
+                settings.db_prepared_statement_cache_size
+            ),
+        },
+        **settings.db_pool_options,
+    )
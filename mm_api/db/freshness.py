@@ -0,0 +1,153 @@
+"""
+Freshness of responses, for conditional requests.
+
+A response changes when one of its rows changes or when rows appear
+in it or leave it. The latest `updated_at` and the number of rows of
+a response, included relationships counted, are enough to tell.
+
+`freshness_statement` computes both with one aggregate over the rows a
+query would return, so a request whose copy is still fresh is answered
+without loading them. `freshness_of` gets the same values from a
+loaded item.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel
+from sqlalchemy import Select, func, inspect, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.base import Base
+from mm_api.db.pagination import Keyset
+
+T = TypeVar("T")
+
+
+class Freshness(NamedTuple):
+    """Latest `updated_at` of the rows of a response and their number."""
+
+    last_modified: Optional[datetime]
+    count: int
+
+
+@lru_cache
+def freshness_statement(
+    rows: Select[Any],
+    model: Type[Base],
+    include: Tuple[str, ...] = (),
+) -> Select[Any]:
+    """
+    Aggregate computing the freshness of a query's rows.
+
+    Built once per query and includes, the query keeps its parameters.
+
+    :param rows: query returning rows of `model`.
+    :param model: queried model.
+    :param include: relationships included in the response.
+    :return: statement returning `(last_modified, count)`.
+    """
+    relationships = [inspect(model).relationships[name] for name in include]
+    columns: Dict[str, Any] = {"updated_at": model.updated_at}  # type: ignore
+    for relationship in relationships:
+        ((local, _),) = relationship.local_remote_pairs
+        columns[local.key] = getattr(model, local.key)
+    page = rows.with_only_columns(*columns.values()).cte("page")
+    parts = [select(page.c.updated_at)]
+    for relationship in relationships:
+        ((local, remote),) = relationship.local_remote_pairs
+        related = remote.table
+        parts.append(
+            select(related.c.updated_at).select_from(
+                page.join(related, remote == page.c[local.key]),
+            ),
+        )
+    updates = union_all(*parts).subquery()
+    return select(func.max(updates.c.updated_at), func.count())
+
+
+def freshness_keyset(
+    keyset: Keyset,
+    model: Type[Base],
+    include: Tuple[str, ...] = (),
+) -> Keyset:
+    """
+    Aggregates computing the freshness of the pages of a keyset query.
+
+    :param keyset: paginated query.
+    :param model: queried model.
+    :param include: relationships included in the response.
+    :return: paginated aggregates.
+    """
+    return Keyset(
+        first=freshness_statement(keyset.first, model, include),
+        after=freshness_statement(keyset.after, model, include),
+    )
+
+
+async def get_freshness(
+    session: AsyncSession,
+    statement: Select[Any],
+    params: Dict[str, Any],
+) -> Freshness:
+    """
+    Run a freshness aggregate.
+
+    :param session: current session.
+    :param statement: statement of `freshness_statement`.
+    :param params: parameters of the aggregated query.
+    :return: freshness of the rows.
+    """
+    result = await session.execute(statement, params)
+    return Freshness(*result.one())
+
+
+def freshness_of(item: Optional[BaseModel], include: Sequence[str] = ()) -> Freshness:
+    """
+    Freshness of a loaded item, as `freshness_statement` computes it.
+
+    :param item: item with `updated_at`, loaded with `include`.
+    :param include: included relationships.
+    :return: freshness of the item.
+    """
+    if item is None:
+        return Freshness(None, 0)
+    updates = [item.updated_at]  # type: ignore
+    for name in include:
+        related = getattr(item, name)
+        if related is None:
+            continue
+        if not isinstance(related, list):
+            related = [related]
+        updates.extend(row.updated_at for row in related)
+    return Freshness(max(updates), len(updates))
+
+
+async def with_freshness(
+    freshness: Callable[[], Awaitable[Freshness]],
+    load: Callable[[], Awaitable[T]],
+) -> Tuple[Freshness, T]:
+    """
+    Load rows along with their freshness.
+
+    The freshness is computed first. A write committed in between
+    makes it older than the rows, which only costs the client a 200
+    on its next conditional request, never a stale 304.
+
+    :param freshness: computes the freshness of the rows.
+    :param load: loads the rows.
+    :return: freshness and rows.
+    """
+    computed = await freshness()
+    return computed, await load()
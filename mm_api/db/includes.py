@@ -0,0 +1,69 @@
+from typing import Any, List, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import Select, inspect
+from sqlalchemy.orm import Load, selectinload
+
+from mm_api.db.base import Base
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def include_options(
+    model: Type[Base],
+    include: Sequence[str],
+) -> List[Load]:
+    """
+    Build loader options for requested relationships.
+
+    `selectinload` fetches a relationship of all parent rows with
+    one `SELECT ... WHERE parent_id IN (...)`, so every included
+    relationship costs one query no matter how many rows a page has.
+
+    :param model: queried model.
+    :param include: relationship names.
+    :return: loader options.
+    """
+    return [selectinload(getattr(model, name)) for name in include]
+
+
+def with_includes(
+    query: Select[Any],
+    model: Type[Base],
+    include: Sequence[str],
+) -> Select[Any]:
+    """
+    Add loader options of requested relationships to a query.
+
+    Without includes the query is returned as is, so prebuilt
+    statements keep their memoized cache key.
+
+    :param query: query to extend.
+    :param model: queried model.
+    :param include: relationship names.
+    :return: query with loader options.
+    """
+    if not include:
+        return query
+    return query.options(*include_options(model, include))
+
+
+def to_nested(schema: Type[SchemaT], row: Any, include: Sequence[str]) -> SchemaT:
+    """
+    Convert a row to a nested schema.
+
+    Relationships that were not requested are left as `None`
+    instead of being lazy loaded.
+
+    :param schema: nested schema.
+    :param row: model instance loaded with `include_options`.
+    :param include: loaded relationship names.
+    :return: schema instance.
+    """
+    relationships = inspect(type(row)).relationships.keys()
+    values = {
+        name: getattr(row, name)
+        for name in schema.model_fields
+        if name not in relationships or name in include
+    }
+    return schema.model_validate(values)
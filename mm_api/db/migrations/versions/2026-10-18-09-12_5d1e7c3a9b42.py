@@ -0,0 +1,53 @@
+"""adding time-series and foreign key indexes
+
+Revision ID: 5d1e7c3a9b42
+Revises: ac3e9575be91
+Create Date: 2026-10-18 09:12:41.302118
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d1e7c3a9b42"
+down_revision = "ac3e9575be91"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = (
+    ("ix_weights_bird_id_w_time", "weights", ["bird_id", "w_time"]),
+    ("ix_feedings_bird_id_f_time", "feedings", ["bird_id", "f_time"]),
+    ("ix_hunts_bird_id_start_time", "hunts", ["bird_id", "start_time"]),
+    ("ix_trainings_bird_id_start_time", "trainings", ["bird_id", "start_time"]),
+    ("ix_birds_falconer_id", "birds", ["falconer_id"]),
+    ("ix_feedings_start_weight_id", "feedings", ["start_weight_id"]),
+    ("ix_feedings_end_weight_id", "feedings", ["end_weight_id"]),
+    ("ix_hunts_start_weight_id", "hunts", ["start_weight_id"]),
+    ("ix_hunts_end_weight_id", "hunts", ["end_weight_id"]),
+    ("ix_trainings_start_weight_id", "trainings", ["start_weight_id"]),
+    ("ix_trainings_end_weight_id", "trainings", ["end_weight_id"]),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,31 @@
+"""adding weights.post_feeding
+
+Revision ID: 8f2a6b0d4c17
+Revises: 5d1e7c3a9b42
+Create Date: 2026-10-18 10:03:12.518377
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8f2a6b0d4c17"
+down_revision = "5d1e7c3a9b42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "weights",
+        sa.Column(
+            "post_feeding",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("weights", "post_feeding")
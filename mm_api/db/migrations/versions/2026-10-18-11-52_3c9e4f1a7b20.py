@@ -0,0 +1,192 @@
+"""partition weights by month
+
+Revision ID: 3c9e4f1a7b20
+Revises: 8f2a6b0d4c17
+Create Date: 2026-10-18 11:52:40.117205
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c9e4f1a7b20"
+down_revision = "8f2a6b0d4c17"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, bird_id, weight, w_time, created_at, updated_at, post_feeding"
+# Foreign keys to weights.id, they can't reference a partitioned table
+# and reference weight_ids instead.
+WEIGHT_REFERENCES = [
+    (table, f"{end}_weight_id")
+    for table in ("feedings", "hunts", "trainings")
+    for end in ("start", "end")
+]
+
+
+# Keeps weight_ids in sync with weights, as `mm_api.db.partitions` did
+# at this revision.
+WEIGHT_IDS_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION weight_ids_sync() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO weight_ids (id) SELECT id FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            DELETE FROM weight_ids WHERE id IN (SELECT id FROM old_rows);
+        ELSE
+            DELETE FROM weight_ids WHERE id IN (
+                SELECT id FROM old_rows EXCEPT SELECT id FROM new_rows
+            );
+            INSERT INTO weight_ids (id)
+            SELECT id FROM new_rows EXCEPT SELECT id FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "CREATE TRIGGER weight_ids_insert AFTER INSERT ON weights "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION weight_ids_sync()",
+    "CREATE TRIGGER weight_ids_update AFTER UPDATE ON weights "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION weight_ids_sync()",
+    "CREATE TRIGGER weight_ids_delete AFTER DELETE ON weights "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION weight_ids_sync()",
+)
+MONTHS_WITH_ROWS = sa.text(
+    "SELECT DISTINCT date_trunc('month', w_time), "
+    "date_trunc('month', w_time) + interval '1 month' "
+    "FROM weights_unpartitioned",
+)
+
+
+def _create_weights(**kwargs: str) -> None:
+    primary_key = ["id", "w_time"] if kwargs else ["id"]
+    op.create_table(
+        "weights",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("bird_id", sa.Uuid(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column(
+            "w_time",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "post_feeding",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["bird_id"],
+            ["birds.id"],
+        ),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **kwargs,
+    )
+    op.create_index("ix_weights_bird_id_w_time", "weights", ["bird_id", "w_time"])
+
+
+def upgrade() -> None:
+    for table, column in WEIGHT_REFERENCES:
+        op.drop_constraint(f"{table}_{column}_fkey", table, type_="foreignkey")
+
+    op.rename_table("weights", "weights_unpartitioned")
+    op.execute(
+        "ALTER TABLE weights_unpartitioned "
+        "RENAME CONSTRAINT weights_pkey TO weights_unpartitioned_pkey",
+    )
+    op.execute(
+        "ALTER INDEX ix_weights_bird_id_w_time "
+        "RENAME TO ix_weights_unpartitioned_bird_id_w_time",
+    )
+
+    _create_weights(postgresql_partition_by="RANGE (w_time)")
+    op.create_index(
+        "ix_weights_w_time_brin",
+        "weights",
+        ["w_time"],
+        postgresql_using="brin",
+    )
+    op.create_table(
+        "weight_ids",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    for statement in WEIGHT_IDS_DDL:
+        op.execute(statement)
+
+    # Months with rows only, the application creates the upcoming
+    # ones on startup.
+    for start, end in op.get_bind().execute(MONTHS_WITH_ROWS):
+        op.execute(
+            f"CREATE TABLE weights_{start:%Y_%m} PARTITION OF weights "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')",
+        )
+    op.execute("CREATE TABLE weights_default PARTITION OF weights DEFAULT")
+
+    op.execute(
+        f"INSERT INTO weights ({COLUMNS}) "  # noqa: S608
+        f"SELECT {COLUMNS} FROM weights_unpartitioned",
+    )
+    op.drop_table("weights_unpartitioned")
+
+    for table, column in WEIGHT_REFERENCES:
+        op.create_foreign_key(
+            f"{table}_{column}_fkey",
+            table,
+            "weight_ids",
+            [column],
+            ["id"],
+        )
+
+
+def downgrade() -> None:
+    for table, column in WEIGHT_REFERENCES:
+        op.drop_constraint(f"{table}_{column}_fkey", table, type_="foreignkey")
+
+    op.rename_table("weights", "weights_partitioned")
+    op.execute(
+        "ALTER TABLE weights_partitioned "
+        "RENAME CONSTRAINT weights_pkey TO weights_partitioned_pkey",
+    )
+    op.execute(
+        "ALTER INDEX ix_weights_bird_id_w_time "
+        "RENAME TO ix_weights_partitioned_bird_id_w_time",
+    )
+
+    _create_weights()
+    op.execute(
+        f"INSERT INTO weights ({COLUMNS}) "  # noqa: S608
+        f"SELECT {COLUMNS} FROM weights_partitioned",
+    )
+    # Drops every partition and the weight_ids triggers too.
+    op.drop_table("weights_partitioned")
+    op.drop_table("weight_ids")
+    op.execute("DROP FUNCTION weight_ids_sync()")
+
+    for table, column in WEIGHT_REFERENCES:
+        op.create_foreign_key(
+            f"{table}_{column}_fkey",
+            table,
+            "weights",
+            [column],
+            ["id"],
+        )
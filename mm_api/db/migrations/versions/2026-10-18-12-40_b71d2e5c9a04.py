@@ -0,0 +1,114 @@
+"""adding bird_daily_stats
+
+Revision ID: b71d2e5c9a04
+Revises: 3c9e4f1a7b20
+Create Date: 2026-10-18 12:40:21.630518
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "b71d2e5c9a04"
+down_revision = "3c9e4f1a7b20"
+branch_labels = None
+depends_on = None
+
+# Fills the new table from raw rows, like `mm_api.db.rollup.backfill`
+# at this revision. Every statement sets only its own columns of a day.
+BACKFILL = (
+    """
+    INSERT INTO bird_daily_stats (
+        bird_id, day, weight_count, weight_sum, weight_min, weight_max,
+        weight_last, weight_last_time
+    )
+    SELECT
+        bird_id, CAST(w_time AS DATE), count(*), sum(weight), min(weight),
+        max(weight), (array_agg(weight ORDER BY w_time DESC))[1], max(w_time)
+    FROM weights
+    GROUP BY bird_id, CAST(w_time AS DATE)
+    """,
+    """
+    INSERT INTO bird_daily_stats (
+        bird_id, day, feeding_count, food_amount, food_amounts
+    )
+    SELECT
+        bird_id, day, sum(feedings), sum(amount),
+        jsonb_object_agg(food_type, amount)
+    FROM (
+        SELECT
+            bird_id, CAST(f_time AS DATE) AS day, food_type,
+            count(*) AS feedings, sum(amount) AS amount
+        FROM feedings
+        GROUP BY bird_id, CAST(f_time AS DATE), food_type
+    ) AS per_food
+    GROUP BY bird_id, day
+    ON CONFLICT (bird_id, day) DO UPDATE SET
+        feeding_count = excluded.feeding_count,
+        food_amount = excluded.food_amount,
+        food_amounts = excluded.food_amounts
+    """,
+    """
+    INSERT INTO bird_daily_stats (bird_id, day, hunt_count, prey_count)
+    SELECT bird_id, CAST(start_time AS DATE), count(*), sum(prey_count)
+    FROM hunts
+    GROUP BY bird_id, CAST(start_time AS DATE)
+    ON CONFLICT (bird_id, day) DO UPDATE SET
+        hunt_count = excluded.hunt_count,
+        prey_count = excluded.prey_count
+    """,
+    """
+    INSERT INTO bird_daily_stats (bird_id, day, training_count, performance_sum)
+    SELECT bird_id, CAST(start_time AS DATE), count(*), sum(performance)
+    FROM trainings
+    GROUP BY bird_id, CAST(start_time AS DATE)
+    ON CONFLICT (bird_id, day) DO UPDATE SET
+        training_count = excluded.training_count,
+        performance_sum = excluded.performance_sum
+    """,
+)
+
+
+def upgrade() -> None:
+    zero = sa.text("0")
+    op.create_table(
+        "bird_daily_stats",
+        sa.Column("bird_id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("weight_count", sa.Integer(), server_default=zero, nullable=False),
+        sa.Column("weight_sum", sa.Float(), server_default=zero, nullable=False),
+        sa.Column("weight_min", sa.Float(), nullable=True),
+        sa.Column("weight_max", sa.Float(), nullable=True),
+        sa.Column("weight_last", sa.Float(), nullable=True),
+        sa.Column("weight_last_time", sa.DateTime(), nullable=True),
+        sa.Column("feeding_count", sa.Integer(), server_default=zero, nullable=False),
+        sa.Column("food_amount", sa.Float(), server_default=zero, nullable=False),
+        sa.Column(
+            "food_amounts",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("hunt_count", sa.Integer(), server_default=zero, nullable=False),
+        sa.Column("prey_count", sa.Integer(), server_default=zero, nullable=False),
+        sa.Column("training_count", sa.Integer(), server_default=zero, nullable=False),
+        sa.Column("performance_sum", sa.Integer(), server_default=zero, nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["bird_id"],
+            ["birds.id"],
+        ),
+        sa.PrimaryKeyConstraint("bird_id", "day"),
+    )
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.drop_table("bird_daily_stats")
@@ -0,0 +1,39 @@
+"""adding weight_gain_models
+
+Revision ID: e4a9c3f05d18
+Revises: b71d2e5c9a04
+Create Date: 2026-10-18 13:25:07.902144
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4a9c3f05d18"
+down_revision = "b71d2e5c9a04"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weight_gain_models",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("species", sa.String(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("gain_intercept", sa.Float(), nullable=False),
+        sa.Column("gain_per_gram", sa.Float(), nullable=False),
+        sa.Column("overnight_loss", sa.Float(), nullable=True),
+        sa.Column(
+            "fitted_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("scope", "key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("weight_gain_models")
@@ -2,8 +2,10 @@
 
 """mm_api models."""
 from mm_api.db.models.bird_model import BirdModel
+from mm_api.db.models.bird_stats_model import BirdDailyStatsModel
 from mm_api.db.models.falconer_model import FalconerModel
 from mm_api.db.models.feeding_model import FeedingModel
 from mm_api.db.models.hunt_model import HuntModel
 from mm_api.db.models.training_model import TrainingModel
-from mm_api.db.models.weight_model import WeightModel
+from mm_api.db.models.weight_gain_model import WeightGainModel
+from mm_api.db.models.weight_model import WeightIdModel, WeightModel
@@ -13,7 +13,7 @@ from mm_api.db.base import Base
 class BirdModel(Base):
     __tablename__ = "birds"
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4())
-    falconer_id: Mapped[str] = mapped_column(ForeignKey("falconers.id"))
+    falconer_id: Mapped[str] = mapped_column(ForeignKey("falconers.id"), index=True)
     name: Mapped[str]
     gender: Mapped[str]
     species: Mapped[str]
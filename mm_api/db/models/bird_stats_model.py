@@ -0,0 +1,45 @@
+import uuid
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import ForeignKey, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from mm_api.db.base import Base
+
+
+class BirdDailyStatsModel(Base):
+    """
+    Per-bird daily rollup of weights, feedings, hunts and trainings.
+
+    Rows are maintained by `mm_api.db.rollup`. Means are stored
+    as sums, so the rows of a day, week or month can be added up.
+    """
+
+    __tablename__ = "bird_daily_stats"
+    bird_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("birds.id"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+    weight_count: Mapped[int] = mapped_column(server_default=text("0"))
+    weight_sum: Mapped[float] = mapped_column(server_default=text("0"))
+    weight_min: Mapped[Optional[float]]
+    weight_max: Mapped[Optional[float]]
+    weight_last: Mapped[Optional[float]]
+    weight_last_time: Mapped[Optional[datetime]]
+    feeding_count: Mapped[int] = mapped_column(server_default=text("0"))
+    food_amount: Mapped[float] = mapped_column(server_default=text("0"))
+    food_amounts: Mapped[Dict[str, float]] = mapped_column(
+        JSONB,
+        server_default=text("'{}'::jsonb"),
+    )
+    hunt_count: Mapped[int] = mapped_column(server_default=text("0"))
+    prey_count: Mapped[int] = mapped_column(server_default=text("0"))
+    training_count: Mapped[int] = mapped_column(server_default=text("0"))
+    performance_sum: Mapped[int] = mapped_column(server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from mm_api.db.base import Base
@@ -12,6 +12,7 @@ from mm_api.db.base import Base
 
 class FeedingModel(Base):
     __tablename__ = "feedings"
+    __table_args__ = (Index("ix_feedings_bird_id_f_time", "bird_id", "f_time"),)
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     bird_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("birds.id"))
     f_time: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -24,16 +25,20 @@ class FeedingModel(Base):
     )
     bird: Mapped["BirdModel"] = relationship(back_populates="feedings")  # type: ignore
     start_weight_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        ForeignKey("weights.id"),
+        ForeignKey("weight_ids.id"),
+        index=True,
+    )
+    end_weight_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("weight_ids.id"),
+        index=True,
     )
-    end_weight_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("weights.id"))
     start_weight: Mapped[Optional["WeightModel"]] = relationship(  # type: ignore
         back_populates="start_feeding",
         cascade="all, delete",
-        foreign_keys=[start_weight_id],
+        primaryjoin="foreign(FeedingModel.start_weight_id) == WeightModel.id",
     )
     end_weight: Mapped[Optional["WeightModel"]] = relationship(  # type: ignore
         back_populates="end_feeding",
         cascade="all, delete",
-        foreign_keys=[end_weight_id],
+        primaryjoin="foreign(FeedingModel.end_weight_id) == WeightModel.id",
     )
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from mm_api.db.base import Base
@@ -12,6 +12,9 @@ from mm_api.db.base import Base
 
 class TrainingModel(Base):
     __tablename__ = "trainings"
+    __table_args__ = (
+        Index("ix_trainings_bird_id_start_time", "bird_id", "start_time"),
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     bird_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("birds.id"))
     start_time: Mapped[datetime]
@@ -25,18 +28,22 @@ class TrainingModel(Base):
         onupdate=func.now(),
     )
     start_weight_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        ForeignKey("weights.id"),
+        ForeignKey("weight_ids.id"),
+        index=True,
+    )
+    end_weight_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("weight_ids.id"),
+        index=True,
     )
-    end_weight_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("weights.id"))
     start_weight: Mapped[Optional["WeightModel"]] = relationship(  # type: ignore
         back_populates="start_training",
         cascade="all, delete",
-        foreign_keys=[start_weight_id],
+        primaryjoin="foreign(TrainingModel.start_weight_id) == WeightModel.id",
     )
     end_weight: Mapped[Optional["WeightModel"]] = relationship(  # type: ignore
         back_populates="end_training",
         cascade="all, delete",
-        foreign_keys=[end_weight_id],
+        primaryjoin="foreign(TrainingModel.end_weight_id) == WeightModel.id",
     )
     bird: Mapped[Optional["BirdModel"]] = relationship(  # type: ignore
         back_populates="trainings",
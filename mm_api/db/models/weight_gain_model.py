@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from mm_api.db.base import Base
+
+
+class WeightGainModel(Base):
+    """
+    Fitted food-to-weight-gain coefficients.
+
+    One row per bird with enough feedings and one per species,
+    rewritten by `mm_api.services.weight_gain`.
+    """
+
+    __tablename__ = "weight_gain_models"
+    # "bird" or "species".
+    scope: Mapped[str] = mapped_column(primary_key=True)
+    # Bird id or species name.
+    key: Mapped[str] = mapped_column(primary_key=True)
+    species: Mapped[str]
+    samples: Mapped[int]
+    gain_intercept: Mapped[float]
+    gain_per_gram: Mapped[float]
+    overnight_loss: Mapped[Optional[float]]
+    fitted_at: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -4,18 +4,30 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, ForeignKey, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from mm_api.db.base import Base
+from mm_api.db.partitions import WEIGHT_IDS_DDL
 
 
 class WeightModel(Base):
     __tablename__ = "weights"
+    # Monthly range partitions on w_time, see `mm_api.db.partitions`.
+    # The partition key has to be part of the primary key, ids are
+    # unique in `weight_ids` instead, which other tables reference.
+    __table_args__ = (
+        Index("ix_weights_bird_id_w_time", "bird_id", "w_time"),
+        Index("ix_weights_w_time_brin", "w_time", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (w_time)"},
+    )
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     bird_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("birds.id"))
     weight: Mapped[float]
-    w_time: Mapped[datetime] = mapped_column(server_default=func.now())
+    w_time: Mapped[datetime] = mapped_column(
+        primary_key=True,
+        server_default=func.now(),
+    )
     post_feeding: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -25,25 +37,42 @@ class WeightModel(Base):
     bird: Mapped["BirdModel"] = relationship(back_populates="weights")  # type: ignore
     start_hunt: Mapped["HuntModel"] = relationship(  # type: ignore
         back_populates="start_weight",
-        foreign_keys="HuntModel.start_weight_id",
+        primaryjoin="WeightModel.id == foreign(HuntModel.start_weight_id)",
     )
     end_hunt: Mapped["HuntModel"] = relationship(  # type: ignore
         back_populates="end_weight",
-        foreign_keys="HuntModel.end_weight_id",
+        primaryjoin="WeightModel.id == foreign(HuntModel.end_weight_id)",
     )
     start_training: Mapped[Optional["TrainingModel"]] = relationship(  # type: ignore
         back_populates="start_weight",
-        foreign_keys="TrainingModel.start_weight_id",
+        primaryjoin="WeightModel.id == foreign(TrainingModel.start_weight_id)",
     )
     end_training: Mapped[Optional["TrainingModel"]] = relationship(  # type: ignore
         back_populates="end_weight",
-        foreign_keys="TrainingModel.end_weight_id",
+        primaryjoin="WeightModel.id == foreign(TrainingModel.end_weight_id)",
     )
     start_feeding: Mapped[Optional["FeedingModel"]] = relationship(  # type: ignore
         back_populates="start_weight",
-        foreign_keys="FeedingModel.start_weight_id",
+        primaryjoin="WeightModel.id == foreign(FeedingModel.start_weight_id)",
     )
     end_feeding: Mapped[Optional["FeedingModel"]] = relationship(  # type: ignore
         back_populates="end_weight",
-        foreign_keys="FeedingModel.end_weight_id",
+        primaryjoin="WeightModel.id == foreign(FeedingModel.end_weight_id)",
     )
+
+
+class WeightIdModel(Base):
+    """Ids of every weight, kept in sync by triggers on `weights`."""
+
+    __tablename__ = "weight_ids"
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+
+
+# Catches rows outside of the monthly partitions.
+event.listen(
+    WeightModel.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS weights_default PARTITION OF weights DEFAULT"),
+)
+for statement in WEIGHT_IDS_DDL:
+    event.listen(WeightModel.__table__, "after_create", DDL(statement))
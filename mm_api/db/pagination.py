@@ -0,0 +1,165 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy import Select, bindparam, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from mm_api.schema.page import Page
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+T = TypeVar("T")
+
+
+class Cursor(NamedTuple):
+    """Position of the last row of a page in `(time, id)` order."""
+
+    time: datetime
+    id: Any
+
+
+class PageParams(NamedTuple):
+    """Requested page."""
+
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[Cursor] = None
+
+
+def encode_cursor(time: datetime, uid: Any) -> str:
+    """
+    Build an opaque cursor token.
+
+    :param time: time column value of the last row.
+    :param uid: id of the last row.
+    :return: url-safe token.
+    """
+    raw = json.dumps([time.isoformat(), str(uid)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, id_type: Callable[[str], Any] = str) -> Cursor:
+    """
+    Parse a token produced by `encode_cursor`.
+
+    Times are stored without a time zone, so a cursor with one is
+    rejected like any other malformed token.
+
+    :param token: cursor token.
+    :param id_type: python type of the paginated id column, e.g. `UUID`.
+    :raises ValueError: if token is malformed.
+    :return: decoded cursor.
+    """
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        time, uid = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(uid, str):
+            raise TypeError(f"Cursor id is a {type(uid).__name__}")
+        cursor = Cursor(time=datetime.fromisoformat(time), id=id_type(uid))
+    except (AttributeError, binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if cursor.time.tzinfo is not None:
+        raise ValueError("Invalid cursor")
+    return cursor
+
+
+class Keyset(NamedTuple):
+    """
+    Statements of a keyset paginated query, built once.
+
+    `first` returns the first page, `after` the page following a
+    cursor. Page size and cursor are bound parameters, so every
+    page of every query reuses the same compiled statement.
+    """
+
+    first: Select[Any]
+    after: Select[Any]
+
+    def with_only_columns(self, *columns: Any) -> "Keyset":
+        """
+        Same pages, selecting only some columns instead of entities.
+
+        :param columns: columns to select.
+        :return: paginated statements.
+        """
+        return Keyset(
+            first=self.first.with_only_columns(*columns),
+            after=self.after.with_only_columns(*columns),
+        )
+
+    def for_page(self, page: PageParams) -> Tuple[Select[Any], Dict[str, Any]]:
+        """
+        Pick the statement and parameters of a page.
+
+        :param page: requested page.
+        :return: statement and its pagination parameters.
+        """
+        # One extra row tells `build_page` whether there is a next page.
+        params: Dict[str, Any] = {"page_limit": page.limit + 1}
+        if page.cursor is None:
+            return self.first, params
+        params["cursor_time"] = page.cursor.time
+        params["cursor_id"] = page.cursor.id
+        return self.after, params
+
+
+def keyset(
+    query: Select[Any],
+    time_column: InstrumentedAttribute[Any],
+    id_column: InstrumentedAttribute[Any],
+) -> Keyset:
+    """
+    Build keyset pagination statements of a query.
+
+    Rows are returned newest first.
+
+    :param query: query to paginate.
+    :param time_column: column the page is ordered by.
+    :param id_column: unique tie breaker.
+    :return: paginated statements.
+    """
+    after = tuple_(
+        bindparam("cursor_time", type_=time_column.type),
+        bindparam("cursor_id", type_=id_column.type),
+    )
+    order = (time_column.desc(), id_column.desc())
+    limit = bindparam("page_limit")
+    return Keyset(
+        first=query.order_by(*order).limit(limit),
+        after=query.where(tuple_(time_column, id_column) < after)
+        .order_by(*order)
+        .limit(limit),
+    )
+
+
+def build_page(
+    items: Sequence[T],
+    page: PageParams,
+    key: Callable[[T], Tuple[datetime, Any]],
+) -> Page[T]:
+    """
+    Cut the extra row fetched by `Keyset` and build the next cursor.
+
+    :param items: rows returned by a `Keyset` statement.
+    :param page: requested page.
+    :param key: returns `(time, id)` of an item.
+    :return: page of items.
+    """
+    page_items: List[T] = list(items[: page.limit])
+    next_cursor = None
+    if len(items) > page.limit:
+        next_cursor = encode_cursor(*key(page_items[-1]))
+    return Page(items=page_items, next_cursor=next_cursor)
@@ -0,0 +1,305 @@
+"""
+Monthly range partitions of time-series tables.
+
+    python -m mm_api.db.partitions --ahead 3
+
+creates the partitions of the current month and the next `--ahead`
+months. It runs on application startup too, schedule it monthly
+for deployments that restart less often. The seed creates the
+partitions of the months it writes to.
+
+Rows outside of every partition, like imported history, land in the
+default partition. The next run creates their months and moves them:
+Postgres refuses to create a partition while the default one holds
+rows that belong in it. Moving them locks `weights`, so it never
+happens in a request.
+
+Ids stay unique across partitions in `weight_ids`, which statement
+triggers on `weights` keep in sync and which other tables reference.
+Rows written to a partition directly bypass these triggers.
+"""
+import asyncio
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional, Set
+
+import click
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from mm_api.settings import settings
+
+# Partitioned tables and their partition key.
+PARTITIONED_TABLES = {"weights": "w_time"}
+
+PARTITIONS_QUERY = text(
+    "SELECT child.relname FROM pg_inherits "
+    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+    "WHERE pg_inherits.inhparent = CAST(:table AS regclass)",
+)
+# Serializes partition changes of a table across workers.
+PARTITION_LOCK = text("SELECT pg_advisory_xact_lock(hashtext(:key))")
+
+# Keeps `weight_ids` in sync with `weights`, one statement at a time.
+# Transition tables can't be shared by several events, hence three triggers.
+WEIGHT_IDS_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION weight_ids_sync() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO weight_ids (id) SELECT id FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            DELETE FROM weight_ids WHERE id IN (SELECT id FROM old_rows);
+        ELSE
+            DELETE FROM weight_ids WHERE id IN (
+                SELECT id FROM old_rows EXCEPT SELECT id FROM new_rows
+            );
+            INSERT INTO weight_ids (id)
+            SELECT id FROM new_rows EXCEPT SELECT id FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "CREATE TRIGGER weight_ids_insert AFTER INSERT ON weights "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION weight_ids_sync()",
+    "CREATE TRIGGER weight_ids_update AFTER UPDATE ON weights "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION weight_ids_sync()",
+    "CREATE TRIGGER weight_ids_delete AFTER DELETE ON weights "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION weight_ids_sync()",
+)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    First day of the month `months` after `month`.
+
+    :param month: any day of the starting month.
+    :param months: months to add, may be negative.
+    :return: first day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def iter_months(first: date, last: date) -> Iterator[date]:
+    """
+    First days of every month from `first` to `last`, both included.
+
+    :param first: any day of the first month.
+    :param last: any day of the last month.
+    :yield: first day of every month.
+    """
+    month = add_months(first, 0)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """
+    Name of the partition holding a month.
+
+    :param table: partitioned table.
+    :param month: any day of the month.
+    :return: partition name, e.g. `weights_2024_01`.
+    """
+    return f"{table}_{month:%Y_%m}"
+
+
+def partition_ddl(table: str, month: date) -> str:
+    """
+    DDL creating the partition of a month if it doesn't exist.
+
+    :param table: partitioned table.
+    :param month: any day of the month.
+    :return: CREATE TABLE statement.
+    """
+    start = add_months(month, 0)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start}') TO ('{add_months(start, 1)}')"
+    )
+
+
+def months_of(times: Iterable[Optional[datetime]]) -> List[date]:
+    """
+    Months of some partition key values.
+
+    :param times: partition key values, None for the current time.
+    :return: first day of every month, in order.
+    """
+    return sorted({add_months(time, 0) for time in times if time is not None})
+
+
+async def existing_partitions(connection: AsyncConnection, table: str) -> Set[str]:
+    """
+    Names of the partitions of a table.
+
+    :param connection: current connection.
+    :param table: partitioned table.
+    :return: partition names.
+    """
+    result = await connection.execute(PARTITIONS_QUERY, {"table": table})
+    return set(result.scalars().all())
+
+
+async def create_partition(
+    connection: AsyncConnection,
+    table: str,
+    month: date,
+) -> bool:
+    """
+    Create the partition of a month, unless it exists.
+
+    Rows of the month in the default partition are moved to the new
+    partition, with the default partition detached meanwhile. The
+    table is locked until the transaction ends.
+
+    :param connection: connection to run DDL on, in a transaction.
+    :param table: partitioned table.
+    :param month: any day of the month.
+    :return: whether the partition was created.
+    """
+    name = partition_name(table, month)
+    await connection.execute(PARTITION_LOCK, {"key": f"partitions:{table}"})
+    if name in await existing_partitions(connection, table):
+        return False
+    key, default = PARTITIONED_TABLES[table], f"{table}_default"
+    start, end = add_months(month, 0), add_months(month, 1)
+    in_month = f"{key} >= '{start}' AND {key} < '{end}'"
+    misplaced = await connection.scalar(
+        text(f"SELECT EXISTS (SELECT FROM {default} WHERE {in_month})"),  # noqa: S608
+    )
+    if not misplaced:
+        await connection.execute(text(partition_ddl(table, month)))
+        return True
+    await connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await connection.execute(text(partition_ddl(table, month)))
+    delete = f"DELETE FROM {default} WHERE {in_month} RETURNING *"  # noqa: S608
+    moved = await connection.execute(
+        text(f"WITH moved AS ({delete}) INSERT INTO {name} SELECT * FROM moved"),
+    )
+    await connection.execute(
+        text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"),
+    )
+    logger.info("Moved {} rows from {} to {}", moved.rowcount, default, name)
+    return True
+
+
+async def create_partitions(
+    connection: AsyncConnection,
+    table: str,
+    months: Iterable[date],
+) -> List[str]:
+    """
+    Create the missing partitions of some months in one transaction.
+
+    :param connection: connection to run DDL on, in a transaction.
+    :param table: partitioned table.
+    :param months: any day of every month.
+    :return: names of the created partitions.
+    """
+    existing = await existing_partitions(connection, table)
+    created = []
+    for month in months:
+        if partition_name(table, month) in existing:
+            continue
+        if await create_partition(connection, table, month):
+            created.append(partition_name(table, month))
+    return created
+
+
+async def ensure_months(
+    engine: AsyncEngine,
+    table: str,
+    months: Iterable[date],
+) -> List[str]:
+    """
+    Create the missing partitions of some months, one transaction each.
+
+    A month that can't be created doesn't roll back the others,
+    its error is raised once they are created.
+
+    :param engine: engine of the primary database.
+    :param table: partitioned table.
+    :param months: any day of every month.
+    :return: names of the created partitions.
+    """
+    async with engine.connect() as connection:
+        existing = await existing_partitions(connection, table)
+    created: List[str] = []
+    errors: List[Exception] = []
+    for month in months:
+        if partition_name(table, month) in existing:
+            continue
+        try:
+            async with engine.begin() as connection:
+                if await create_partition(connection, table, month):
+                    created.append(partition_name(table, month))
+        except Exception as exc:  # noqa: WPS440
+            logger.error("Can't create {}: {}", partition_name(table, month), exc)
+            errors.append(exc)
+    if errors:
+        raise errors[0]
+    return created
+
+
+async def ensure_partitions(
+    engine: AsyncEngine,
+    ahead: Optional[int] = None,
+) -> List[str]:
+    """
+    Create upcoming partitions of every partitioned table.
+
+    Months of rows in the default partition get their partition too,
+    so rows written before it existed don't stay there.
+
+    :param engine: engine of the primary database.
+    :param ahead: months after the current one,
+        `settings.db_partition_months_ahead` by default.
+    :raises Exception: if a partition can't be created.
+    :return: names of the created partitions.
+    """
+    if ahead is None:
+        ahead = settings.db_partition_months_ahead
+    today = date.today()
+    created = []
+    for table, key in PARTITIONED_TABLES.items():
+        async with engine.connect() as connection:
+            truncated = f"date_trunc('month', {key})"
+            result = await connection.execute(
+                text(f"SELECT DISTINCT {truncated} FROM {table}_default"),  # noqa: S608
+            )
+            misplaced = months_of(result.scalars().all())
+        upcoming = iter_months(today, add_months(today, ahead))
+        months = sorted(set(upcoming).union(misplaced))
+        created.extend(await ensure_months(engine, table, months))
+    for name in created:
+        logger.info("Created partition {}", name)
+    return created
+
+
+@click.command()
+@click.option("--ahead", default=settings.db_partition_months_ahead, show_default=True)
+def main(ahead: int) -> None:
+    """Create partitions of the upcoming months."""
+
+    async def run() -> None:  # noqa: WPS430
+        engine = create_async_engine(str(settings.db_url))
+        try:
+            names = await ensure_partitions(engine, ahead)
+        finally:
+            await engine.dispose()
+        click.echo(f"created: {', '.join(names) or 'none'}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+Daily per-bird rollup of time series.
+
+`bird_daily_stats` holds one row per bird and day. DAOs keep it up to
+date with `record_stats` in the transaction that inserts the raw rows,
+existing data is rolled up with
+
+    python -m mm_api.db.rollup [--bird-id ID ...]
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import click
+from sqlalchemy import Date, and_, case, cast, delete, func, or_, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql.dml import Insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from mm_api.db.base import Base
+from mm_api.db.models import (
+    BirdDailyStatsModel,
+    FeedingModel,
+    HuntModel,
+    TrainingModel,
+    WeightModel,
+)
+from mm_api.schema.bird_stats import BirdStatsRead, Granularity
+from mm_api.settings import settings
+
+Stats = Dict[str, Any]
+
+# Columns merged by addition, everything else needs its own rule.
+SUMMED = (
+    "weight_count",
+    "weight_sum",
+    "feeding_count",
+    "food_amount",
+    "hunt_count",
+    "prey_count",
+    "training_count",
+    "performance_sum",
+)
+MERGE_FOOD_AMOUNTS = text(
+    """(
+    SELECT coalesce(jsonb_object_agg(key, total), '{}'::jsonb)
+    FROM (
+        SELECT key, sum(value::float) AS total
+        FROM (
+            SELECT * FROM jsonb_each_text(bird_daily_stats.food_amounts)
+            UNION ALL
+            SELECT * FROM jsonb_each_text(excluded.food_amounts)
+        ) AS amounts
+        GROUP BY key
+    ) AS totals
+)""",
+)
+
+
+def _upsert(stmt: Insert) -> Insert:
+    """
+    Add rows to existing days instead of replacing them.
+
+    :param stmt: insert into bird_daily_stats.
+    :return: statement merging conflicting rows.
+    """
+    stats, excluded = BirdDailyStatsModel.__table__.c, stmt.excluded
+    newer = and_(
+        excluded.weight_last_time.is_not(None),
+        or_(
+            stats.weight_last_time.is_(None),
+            excluded.weight_last_time >= stats.weight_last_time,
+        ),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[stats.bird_id, stats.day],
+        set_={
+            **{name: stats[name] + excluded[name] for name in SUMMED},
+            # least() and greatest() skip NULLs.
+            "weight_min": func.least(stats.weight_min, excluded.weight_min),
+            "weight_max": func.greatest(stats.weight_max, excluded.weight_max),
+            "weight_last": case((newer, excluded.weight_last), else_=stats.weight_last),
+            "weight_last_time": func.greatest(
+                stats.weight_last_time,
+                excluded.weight_last_time,
+            ),
+            "food_amounts": MERGE_FOOD_AMOUNTS,
+            "updated_at": func.now(),
+        },
+    )
+
+
+UPSERT_STATS = _upsert(pg_insert(BirdDailyStatsModel))
+
+
+def _empty(bird_id: Any, day: date) -> Stats:
+    return {
+        "bird_id": bird_id,
+        "day": day,
+        "weight_count": 0,
+        "weight_sum": 0.0,
+        "weight_min": None,
+        "weight_max": None,
+        "weight_last": None,
+        "weight_last_time": None,
+        "feeding_count": 0,
+        "food_amount": 0.0,
+        "food_amounts": {},
+        "hunt_count": 0,
+        "prey_count": 0,
+        "training_count": 0,
+        "performance_sum": 0,
+    }
+
+
+def _merge(stats: Stats, other: Mapping[str, Any]) -> None:
+    """
+    Python counterpart of `_upsert`.
+
+    :param stats: stats to update in place.
+    :param other: stats to add.
+    """
+    for name in SUMMED:
+        stats[name] += other[name]
+    for name, pick in (("weight_min", min), ("weight_max", max)):
+        values = [value for value in (stats[name], other[name]) if value is not None]
+        stats[name] = pick(values) if values else None
+    last_time = other["weight_last_time"]
+    if last_time is not None and (
+        stats["weight_last_time"] is None or last_time >= stats["weight_last_time"]
+    ):
+        stats["weight_last"] = other["weight_last"]
+        stats["weight_last_time"] = last_time
+    food_amounts = dict(stats["food_amounts"])
+    for food_type, amount in other["food_amounts"].items():
+        food_amounts[food_type] = food_amounts.get(food_type, 0) + amount
+    stats["food_amounts"] = food_amounts
+
+
+def _add_weight(stats: Stats, row: Mapping[str, Any]) -> None:
+    weight = row["weight"]
+    _merge(
+        stats,
+        {
+            **_empty(None, stats["day"]),
+            "weight_count": 1,
+            "weight_sum": weight,
+            "weight_min": weight,
+            "weight_max": weight,
+            "weight_last": weight,
+            "weight_last_time": row["w_time"],
+        },
+    )
+
+
+def _add_feeding(stats: Stats, row: Mapping[str, Any]) -> None:
+    stats["feeding_count"] += 1
+    stats["food_amount"] += row["amount"]
+    food_amounts = stats["food_amounts"]
+    food_amounts[row["food_type"]] = (
+        food_amounts.get(row["food_type"], 0) + row["amount"]
+    )
+
+
+def _add_hunt(stats: Stats, row: Mapping[str, Any]) -> None:
+    stats["hunt_count"] += 1
+    stats["prey_count"] += row["prey_count"]
+
+
+def _add_training(stats: Stats, row: Mapping[str, Any]) -> None:
+    stats["training_count"] += 1
+    stats["performance_sum"] += row["performance"]
+
+
+# Time column of every rolled up model and how one of its rows is added.
+SOURCES: Dict[Any, Tuple[str, Callable[[Stats, Mapping[str, Any]], None]]] = {
+    WeightModel: ("w_time", _add_weight),
+    FeedingModel: ("f_time", _add_feeding),
+    HuntModel: ("start_time", _add_hunt),
+    TrainingModel: ("start_time", _add_training),
+}
+
+
+def daily_stats(model: Any, rows: Sequence[Mapping[str, Any]]) -> List[Stats]:
+    """
+    Roll rows of a model up into one delta per bird and day.
+
+    :param model: one of `SOURCES`.
+    :param rows: column values of inserted rows.
+    :return: deltas ordered by bird and day.
+    """
+    column, add = SOURCES[model]
+    days: Dict[Tuple[Any, date], Stats] = {}
+    for row in rows:
+        key = (row["bird_id"], row[column].date())
+        if key not in days:
+            days[key] = _empty(*key)
+        add(days[key], row)
+    # A stable order keeps concurrent writers from deadlocking.
+    return [days[key] for key in sorted(days, key=lambda key: (str(key[0]), key[1]))]
+
+
+async def record_stats(
+    session: AsyncSession,
+    model: Any,
+    rows: Sequence[Mapping[str, Any]],
+) -> None:
+    """
+    Add inserted rows to the rollup in the current transaction.
+
+    :param session: session that inserted the rows.
+    :param model: one of `SOURCES`.
+    :param rows: column values of inserted rows.
+    """
+    deltas = daily_stats(model, rows)
+    if deltas:
+        await session.execute(UPSERT_STATS, deltas)
+
+
+def _backfill_queries(bird_ids: Optional[Sequence[Any]]) -> List[Any]:
+    def day_of(column: Any) -> Any:  # noqa: WPS430
+        return cast(column, Date).label("day")
+
+    def for_birds(query: Any, model: Any) -> Any:  # noqa: WPS430
+        if bird_ids is None:
+            return query
+        return query.where(model.bird_id.in_(bird_ids))
+
+    weight_day = day_of(WeightModel.w_time)
+    weights = select(
+        WeightModel.bird_id,
+        weight_day,
+        func.count().label("weight_count"),
+        func.sum(WeightModel.weight).label("weight_sum"),
+        func.min(WeightModel.weight).label("weight_min"),
+        func.max(WeightModel.weight).label("weight_max"),
+        array_agg(aggregate_order_by(WeightModel.weight, WeightModel.w_time.desc()),)[
+            1
+        ].label("weight_last"),
+        func.max(WeightModel.w_time).label("weight_last_time"),
+    ).group_by(WeightModel.bird_id, weight_day.element)
+
+    feeding_day = day_of(FeedingModel.f_time)
+    by_food_type = for_birds(
+        select(
+            FeedingModel.bird_id,
+            feeding_day,
+            FeedingModel.food_type,
+            func.count().label("feedings"),
+            func.sum(FeedingModel.amount).label("amount"),
+        ).group_by(FeedingModel.bird_id, feeding_day.element, FeedingModel.food_type),
+        FeedingModel,
+    ).subquery()
+    feedings = select(
+        by_food_type.c.bird_id,
+        by_food_type.c.day,
+        func.sum(by_food_type.c.feedings).label("feeding_count"),
+        func.sum(by_food_type.c.amount).label("food_amount"),
+        func.jsonb_object_agg(by_food_type.c.food_type, by_food_type.c.amount).label(
+            "food_amounts",
+        ),
+    ).group_by(by_food_type.c.bird_id, by_food_type.c.day)
+
+    hunt_day = day_of(HuntModel.start_time)
+    hunts = select(
+        HuntModel.bird_id,
+        hunt_day,
+        func.count().label("hunt_count"),
+        func.sum(HuntModel.prey_count).label("prey_count"),
+    ).group_by(HuntModel.bird_id, hunt_day.element)
+
+    training_day = day_of(TrainingModel.start_time)
+    trainings = select(
+        TrainingModel.bird_id,
+        training_day,
+        func.count().label("training_count"),
+        func.sum(TrainingModel.performance).label("performance_sum"),
+    ).group_by(TrainingModel.bird_id, training_day.element)
+
+    return [
+        for_birds(weights, WeightModel),
+        feedings,
+        for_birds(hunts, HuntModel),
+        for_birds(trainings, TrainingModel),
+    ]
+
+
+def backfill_statements(bird_ids: Optional[Sequence[Any]] = None) -> List[Any]:
+    """
+    Statements rebuilding the rollup from raw rows.
+
+    :param bird_ids: birds to rebuild, all of them by default.
+    :return: statements to run in order, in one transaction.
+    """
+    stats = BirdDailyStatsModel.__table__
+    clear = delete(stats)
+    if bird_ids is not None:
+        clear = clear.where(stats.c.bird_id.in_(bird_ids))
+    statements: List[Any] = [clear]
+    for query in _backfill_queries(bird_ids):
+        columns = [column.name for column in query.selected_columns]
+        statements.append(_upsert(pg_insert(stats).from_select(columns, query)))
+    return statements
+
+
+async def backfill(
+    session: AsyncSession,
+    bird_ids: Optional[Sequence[Any]] = None,
+) -> None:
+    """
+    Rebuild the rollup from raw rows.
+
+    :param session: current session.
+    :param bird_ids: birds to rebuild, all of them by default.
+    """
+    for statement in backfill_statements(bird_ids):
+        await session.execute(statement)
+
+
+def period_start(day: date, granularity: Granularity) -> date:
+    """
+    First day of the period a day belongs to.
+
+    Weeks start on Monday, like `date_trunc('week', ...)`.
+
+    :param day: any day.
+    :param granularity: period length.
+    :return: first day of the period.
+    """
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def rollup_periods(
+    days: Sequence[Base],
+    granularity: Granularity,
+) -> List[BirdStatsRead]:
+    """
+    Combine daily rows into days, weeks or months.
+
+    :param days: `bird_daily_stats` rows ordered by day.
+    :param granularity: period length.
+    :return: stats of every period with data.
+    """
+    periods: Dict[date, Stats] = {}
+    for row in days:
+        start = period_start(row.day, granularity)  # type: ignore
+        if start not in periods:
+            periods[start] = _empty(row.bird_id, start)  # type: ignore
+        _merge(
+            periods[start],
+            {name: getattr(row, name) for name in _empty(None, start)},
+        )
+    return [
+        BirdStatsRead(
+            period=start,
+            weight_mean=(
+                stats["weight_sum"] / stats["weight_count"]
+                if stats["weight_count"]
+                else None
+            ),
+            performance_mean=(
+                stats["performance_sum"] / stats["training_count"]
+                if stats["training_count"]
+                else None
+            ),
+            **stats,
+        )
+        for start, stats in periods.items()
+    ]
+
+
+@click.command()
+@click.option("--bird-id", "bird_ids", multiple=True, help="Only these birds.")
+def main(bird_ids: Tuple[str, ...]) -> None:
+    """Rebuild bird_daily_stats from raw rows."""
+
+    async def run() -> None:  # noqa: WPS430
+        engine = create_async_engine(str(settings.db_url))
+        async with AsyncSession(engine) as session:
+            await backfill(session, list(bird_ids) or None)
+            rows = await session.scalar(
+                select(func.count()).select_from(BirdDailyStatsModel),
+            )
+            await session.commit()
+        await engine.dispose()
+        click.echo(f"bird_daily_stats: {rows} rows")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+from typing import Dict, List, Optional, Sequence
+
+import jwt
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from starlette.requests import Request
+
+from mm_api.services.metrics import Counter, Gauge
+from mm_api.settings import settings
+
+# Methods that never write, their sessions may go to a replica.
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+REPLICA_LAG = Gauge(
+    "mm_api_db_replica_lag_seconds",
+    "Replication lag of every read replica.",
+)
+ROUTED_SESSIONS = Counter(
+    "mm_api_db_routed_sessions_total",
+    "Database sessions by target and routing reason.",
+)
+
+LAG_QUERY = text(
+    "SELECT COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)",
+)
+
+
+def sticky_key(request: Request) -> Optional[str]:
+    """
+    Redis key of the client that sent the request.
+
+    The token subject identifies falconers. The signature is not
+    checked: the key only decides where reads go, authentication
+    happens in `is_authenticated`. Anonymous requests fall back
+    to the client address.
+
+    :param request: current request.
+    :return: redis key or None if the client is unknown.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization.startswith("Bearer "):
+        try:
+            claims = jwt.decode(
+                authorization[7:],
+                options={"verify_signature": False},
+            )
+        except jwt.InvalidTokenError:
+            claims = {}
+        if claims.get("sub"):
+            return f"db:sticky:{claims['sub']}"
+    if request.client is not None:
+        return f"db:sticky:{request.client.host}"
+    return None
+
+
+def on_replica(session: AsyncSession) -> bool:
+    """
+    Whether a session of `SessionRouter` reads from a replica.
+
+    :param session: session of `SessionRouter.session_for`.
+    :return: True for replica sessions.
+    """
+    return "replica" in session.info
+
+
+class SessionRouter:
+    """
+    Hands out sessions bound to the primary or to a read replica.
+
+    Reads go to replicas round-robin, writes go to the primary. After
+    a write session the client is pinned to the primary for
+    `settings.db_sticky_seconds`, so it never reads its own writes
+    from a replica that has not replayed them yet. Replicas that lag
+    more than `settings.db_replica_max_lag` are skipped.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: Sequence[async_sessionmaker[AsyncSession]] = (),
+        redis_pool: Optional[ConnectionPool] = None,
+    ) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.redis_pool = redis_pool
+        self.lag: Dict[int, float] = {}
+        self._next_replica = itertools.cycle(range(len(self.replicas)))
+
+    def _pick_replica(self) -> Optional[int]:
+        for _ in self.replicas:
+            index = next(self._next_replica)
+            if self.lag.get(index, 0) <= settings.db_replica_max_lag:
+                return index
+        return None
+
+    async def _is_sticky(self, key: str) -> bool:
+        if self.redis_pool is None:
+            return False
+        try:
+            async with Redis(connection_pool=self.redis_pool) as redis:
+                return bool(await redis.exists(key))
+        except RedisError as exc:
+            # Without the sticky flag a replica could serve stale data.
+            logger.warning("Can't read sticky flag, using primary: {}", exc)
+            return True
+
+    async def _mark_sticky(self, key: str) -> None:
+        if self.redis_pool is None:
+            return
+        try:
+            async with Redis(connection_pool=self.redis_pool) as redis:
+                await redis.set(key, 1, ex=settings.db_sticky_seconds)
+        except RedisError as exc:
+            logger.warning("Can't set sticky flag: {}", exc)
+
+    async def session_for(
+        self,
+        request: Request,
+        read_only: bool = False,
+    ) -> AsyncSession:
+        """
+        Open a session for a request.
+
+        Sessions of GET, HEAD and OPTIONS requests only read, others
+        write unless `read_only` says they don't, like the sessions
+        of POST lookups.
+
+        :param request: current request.
+        :param read_only: whether the session never writes.
+        :return: new session.
+        """
+        key = sticky_key(request)
+        if not read_only and request.method not in READ_METHODS:
+            if self.replicas and key is not None:
+                # Marked before the write, the response may be sent
+                # before the session is committed.
+                await self._mark_sticky(key)
+            ROUTED_SESSIONS.inc(target="primary", reason="write")
+            return self.primary()
+        if not self.replicas:
+            ROUTED_SESSIONS.inc(target="primary", reason="no_replica")
+            return self.primary()
+        if key is not None and await self._is_sticky(key):
+            ROUTED_SESSIONS.inc(target="primary", reason="sticky")
+            return self.primary()
+        index = self._pick_replica()
+        if index is None:
+            ROUTED_SESSIONS.inc(target="primary", reason="lagging")
+            return self.primary()
+        ROUTED_SESSIONS.inc(target=f"replica{index}", reason="read")
+        session = self.replicas[index]()
+        session.info["replica"] = index
+        return session
+
+    async def measure_lag(self, engines: List[AsyncEngine]) -> None:
+        """
+        Update lag of every replica.
+
+        :param engines: replica engines in the order of `self.replicas`.
+        """
+        for index, engine in enumerate(engines):
+            try:
+                async with engine.connect() as connection:
+                    lag = float(await connection.scalar(LAG_QUERY) or 0)
+            except (SQLAlchemyError, OSError) as exc:
+                logger.warning("Replica {} is unreachable: {}", index, exc)
+                lag = float("inf")
+            self.lag[index] = lag
+            REPLICA_LAG.set(lag, replica=f"replica{index}")
+
+    async def watch_lag(self, engines: List[AsyncEngine]) -> None:
+        """
+        Measure replica lag every `settings.db_replica_lag_interval`.
+
+        :param engines: replica engines.
+        """
+        while True:  # noqa: WPS457
+            await self.measure_lag(engines)
+            await asyncio.sleep(settings.db_replica_lag_interval)
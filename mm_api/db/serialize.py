@@ -0,0 +1,67 @@
+"""
+Read path producing JSON bytes straight from Core rows.
+
+The regular path hydrates ORM instances, builds `*Read` models from
+them and has FastAPI validate and encode those again. Here only the
+schema's columns are selected, the row mappings of a page are
+validated once by a cached `TypeAdapter` and dumped to JSON by
+pydantic-core. Routes return the bytes in a `Response`, which FastAPI sends as is.
+"""
+from functools import lru_cache
+from typing import Any, Callable, List, Sequence, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
+
+from mm_api.db.base import Base
+from mm_api.db.pagination import PageParams, encode_cursor
+from mm_api.schema.page import Page
+
+
+def read_columns(model: Type[Base], schema: Type[BaseModel]) -> List[Any]:
+    """
+    Columns of a model that a schema reads.
+
+    Relationships are left out, they stay at their schema default.
+
+    :param model: queried model.
+    :param schema: read schema.
+    :return: model columns.
+    """
+    columns = inspect(model).columns.keys()
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
+
+
+@lru_cache
+def page_adapter(schema: Type[BaseModel]) -> TypeAdapter[Any]:
+    """
+    Adapter of a page of a schema, built once per schema.
+
+    :param schema: item schema.
+    :return: adapter of `Page[schema]`.
+    """
+    return TypeAdapter(Page[schema])  # type: ignore
+
+
+def page_json(
+    schema: Type[BaseModel],
+    rows: Sequence[Any],
+    page: PageParams,
+    key: Callable[[Any], Tuple[Any, Any]],
+) -> bytes:
+    """
+    Serialize the rows of a `Keyset` page.
+
+    :param schema: item schema.
+    :param rows: row mappings returned by a `Keyset` statement.
+    :param page: requested page.
+    :param key: returns `(time, id)` of a row mapping.
+    :return: JSON of `Page[schema]`.
+    """
+    items = rows[: page.limit]
+    next_cursor = None
+    if len(rows) > page.limit:
+        next_cursor = encode_cursor(*key(items[-1]))
+    adapter = page_adapter(schema)
+    validated = adapter.validate_python({"items": items, "next_cursor": next_cursor})
+    return adapter.dump_json(validated)
@@ -0,0 +1,24 @@
+from datetime import date
+from typing import Dict, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+Granularity = Literal["day", "week", "month"]
+
+
+class BirdStatsRead(BaseModel):
+    bird_id: UUID
+    period: date
+    weight_count: int
+    weight_min: Optional[float] = None
+    weight_max: Optional[float] = None
+    weight_mean: Optional[float] = None
+    weight_last: Optional[float] = None
+    feeding_count: int
+    food_amount: float
+    food_amounts: Dict[str, float]
+    hunt_count: int
+    prey_count: int
+    training_count: int
+    performance_mean: Optional[float] = None
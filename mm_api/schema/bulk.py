@@ -0,0 +1,22 @@
+from typing import Generic, List, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_IDS = 500
+
+T = TypeVar("T")
+
+
+class BulkCreateResult(BaseModel):
+    ids: List[UUID]
+    count: int
+
+
+class BatchGet(BaseModel):
+    ids: List[UUID] = Field(max_length=MAX_BATCH_IDS)
+
+
+class BatchGetResult(BaseModel, Generic[T]):
+    items: List[T]
+    missing: List[UUID]
@@ -0,0 +1,4 @@
+from typing import Literal
+
+ExportTable = Literal["birds", "weights", "feedings", "hunts", "trainings"]
+ExportFormat = Literal["parquet", "arrow"]
@@ -30,4 +30,4 @@ class FalconerRead(FalconerBase):
 
 
 class FalconerNestedBirds(FalconerRead):
-    birds: Optional[list[BirdRead]]
+    birds: Optional[list[BirdRead]] = None
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from mm_api.schema.feeding import FeedingRead
+from mm_api.schema.hunt import HuntRead
+from mm_api.schema.training import TrainingRead
+from mm_api.schema.weight import WeightRead
+
+
+class SessionWeight(BaseModel):
+    weight: float
+    w_time: datetime
+
+
+class SessionFeeding(BaseModel):
+    f_time: datetime
+    food_type: str
+    amount: float
+
+
+class SessionTraining(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    training_type: str
+    notes: str
+    performance: int
+
+
+class SessionHunt(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    prey_type: str
+    prey_count: int
+    notes: str = ""
+
+
+class FeedingSessionCreate(BaseModel):
+    bird_id: UUID
+    start_weight: SessionWeight
+    end_weight: SessionWeight
+    feeding: SessionFeeding
+    training: Optional[SessionTraining] = None
+    hunt: Optional[SessionHunt] = None
+
+
+class FeedingSessionRead(BaseModel):
+    start_weight: WeightRead
+    end_weight: WeightRead
+    feeding: FeedingRead
+    training: Optional[TrainingRead] = None
+    hunt: Optional[HuntRead] = None
@@ -0,0 +1,17 @@
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+ImportTable = Literal["weights", "feedings", "hunts", "trainings"]
+ImportFormat = Literal["csv", "ndjson"]
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -22,3 +22,30 @@ class WeightRead(WeightBase):
 
     class Config:
         from_attributes = True
+
+
+class WeightAnalyticsDays(BaseModel):
+    day: List[date]
+    count: List[int]
+    weight_mean: List[float]
+    pre_feeding: List[Optional[float]]
+    post_feeding: List[Optional[float]]
+    feeding_gain: List[Optional[float]]
+    rolling_mean: List[float]
+    delta: List[Optional[float]]
+
+
+class WeightTrend(BaseModel):
+    days: int
+    slope: Optional[float] = None
+
+
+class WeightAnalytics(BaseModel):
+    bird_id: UUID
+    window: int
+    count: int
+    pre_feeding_mean: Optional[float] = None
+    post_feeding_mean: Optional[float] = None
+    feeding_gain_mean: Optional[float] = None
+    trends: List[WeightTrend]
+    days: WeightAnalyticsDays
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class WeightPrediction(BaseModel):
+    bird_id: UUID
+    scope: str
+    samples: int
+    fitted_at: datetime
+    gain_per_gram: float
+    amount: float
+    weight: float
+    gain: float
+    overnight_loss: Optional[float] = None
+    predicted_weight: float
@@ -1,78 +1,398 @@
+"""
+Synthetic dataset generator.
+
+Generates falconers, birds and a daily weight/feeding/training/hunt
+series for every bird with vectorized NumPy and streams it into
+Postgres with COPY over several connections. The same `--seed`
+always produces the same rows.
+
+    python -m mm_api.seed --falconers 1000 --birds-per-falconer 3 --days 365
+"""
 import asyncio
-from uuid import uuid4
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Sequence
 
+import click
+import numpy
 from faker import Faker
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-
-from mm_api.db.dao.bird_dao import BirdDAO
-from mm_api.db.dao.falconer_dao import FalconerDAO
-from mm_api.db.dao.feeding_dao import FeedingDAO
-from mm_api.db.dao.hunt_dao import HuntDAO
-from mm_api.db.dao.training_dao import TrainingDAO
-from mm_api.db.dao.weight_dao import WeightDAO
-from mm_api.schema.falconer import FalconerCreate
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from mm_api.db.bulk import copy_columns, get_driver_connection
+from mm_api.db.models import (
+    BirdModel,
+    FalconerModel,
+    FeedingModel,
+    HuntModel,
+    TrainingModel,
+    WeightModel,
+)
+from mm_api.db.partitions import ensure_months, iter_months
+from mm_api.db.rollup import backfill
 from mm_api.settings import settings
-from mm_api.tests.utils.generations import create_bird, create_hunts, create_trainings
-
-fake = Faker()
-_engine = create_async_engine(str(settings.db_url))
-SessionLocal = sessionmaker(bind=_engine, class_=AsyncSession, expire_on_commit=False)  # type: ignore
-
-
-async def seed_data() -> None:
-    async with _engine.begin() as connection:
-        async with AsyncSession(connection, expire_on_commit=False) as session:
-            logger.info("Seeding data")
-            falconer = create_falconer()
-            falconer.id = "user_2ifMt89Ay39uwvtLQUijf7OGCq5"
-            logger.info("Creating falconer {}", falconer.id)
-
-            falconer_dao = FalconerDAO(session=session)
-            bird_dao = BirdDAO(session=session)
-            weight_dao = WeightDAO(session=session)
-            feeding_dao = FeedingDAO(session=session)
-            training_dao = TrainingDAO(session=session)
-            hunt_dao = HuntDAO(session=session)
-
-            await falconer_dao.create(falconer)
-
-            for i in range(1, 6):
-                bird = create_bird(falconer.id)  # type: ignore
-                trainings, weights, feedings, date = create_trainings(
-                    bird.id,  # type: ignore
-                    bird.gender,
-                )
-                hunts, hunt_weights, hunt_feedings = create_hunts(
-                    bird.id,  # type: ignore
-                    weights[-1].weight,
-                    date,
-                )
-                weights.extend(hunt_weights)
-                feedings.extend(hunt_feedings)
-
-                await bird_dao.create(bird)
-                for w in weights:
-                    await weight_dao.create(w)
-                for f in feedings:
-                    await feeding_dao.create(f)
-                for t in trainings:
-                    await training_dao.create(t)
-                for h in hunts:
-                    await hunt_dao.create(h)
-
-
-def create_falconer() -> FalconerCreate:
-    uid = str(uuid4())
-    logger.info("{}", uid)
-    return FalconerCreate(
-        id=uid,
-        name=fake.name(),
-        permit_class=fake.random_element(elements=("apprentice", "general", "master")),
-        permit_number=str(fake.random_number(digits=6)),
+
+# The first generated falconer gets the id of the local dev user,
+# so seeded data is visible right after logging in.
+DEV_FALCONER_ID = "user_2ifMt89Ay39uwvtLQUijf7OGCq5"
+
+PERMIT_CLASSES = ("apprentice", "general", "master")
+SPECIES = ("peregrine", "goshawk", "kestrel", "red-tailed hawk")
+GENDERS = ("male", "female")
+FOOD_TYPES = ("mice", "quail", "sparrow")
+TRAINING_TYPES = ("hop-ups", "creance", "free-flight")
+PREY_TYPES = ("sparrow", "quail", "rabbit")
+
+Columns = Dict[str, Sequence[Any]]
+
+
+class Owners(NamedTuple):
+    """Falconer and bird columns."""
+
+    falconers: Columns
+    birds: Columns
+
+
+class Series(NamedTuple):
+    """Daily records of a batch of birds."""
+
+    weights: Columns
+    feedings: Columns
+    trainings: Columns
+    hunts: Columns
+
+
+def _uuids(rng: numpy.random.Generator, count: int) -> List[uuid.UUID]:
+    """
+    Draw version 4 uuids from a generator, so they are reproducible.
+
+    :param rng: random generator.
+    :param count: number of ids.
+    :return: list of ids.
+    """
+    raw = rng.integers(0, 256, size=(count, 16), dtype=numpy.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    return [uuid.UUID(bytes=row.tobytes()) for row in raw]
+
+
+def _pick(
+    rng: numpy.random.Generator,
+    choices: Sequence[str],
+    count: int,
+) -> List[str]:
+    return numpy.asarray(choices, dtype=object)[
+        rng.integers(0, len(choices), count)
+    ].tolist()
+
+
+def generate_owners(seed: int, falconers: int, birds_per_falconer: int) -> Owners:
+    """
+    Generate falconers and their birds.
+
+    :param seed: dataset seed.
+    :param falconers: number of falconers.
+    :param birds_per_falconer: birds owned by every falconer.
+    :return: falconer and bird columns.
+    """
+    rng = numpy.random.default_rng([seed, 0])
+    fake = Faker()
+    fake.seed_instance(seed)
+    names = [fake.name() for _ in range(200)]
+    bird_names = [fake.first_name() for _ in range(100)]
+
+    falconer_ids = [str(uid) for uid in _uuids(rng, falconers)]
+    if falconer_ids:
+        falconer_ids[0] = DEV_FALCONER_ID
+    birds = falconers * birds_per_falconer
+    return Owners(
+        falconers={
+            "id": falconer_ids,
+            "name": _pick(rng, names, falconers),
+            "permit_class": _pick(rng, PERMIT_CLASSES, falconers),
+            "permit_number": rng.integers(100000, 1000000, falconers)
+            .astype(str)
+            .tolist(),
+        },
+        birds={
+            "id": _uuids(rng, birds),
+            "falconer_id": numpy.repeat(
+                numpy.asarray(falconer_ids, dtype=object),
+                birds_per_falconer,
+            ).tolist(),
+            "name": _pick(rng, bird_names, birds),
+            "gender": _pick(rng, GENDERS, birds),
+            "species": _pick(rng, SPECIES, birds),
+            "trap_date": [datetime(2023, 1, 1, 12, 34, 56)] * birds,
+        },
+    )
+
+
+def generate_series(  # noqa: WPS210
+    seed: int,
+    batch: int,
+    bird_ids: Sequence[uuid.UUID],
+    genders: Sequence[str],
+    days: int,
+    start: datetime,
+    hunt_ratio: float = 0.5,
+) -> Series:
+    """
+    Generate one session a day for every bird of a batch.
+
+    Each session is a pre-feeding weight, a feeding, a post-feeding
+    weight and either a training or a hunt. Weight drifts by the
+    difference between food eaten and weight lost every day.
+
+    :param seed: dataset seed.
+    :param batch: batch number, so every batch has its own stream.
+    :param bird_ids: birds of the batch.
+    :param genders: gender of every bird.
+    :param days: number of days.
+    :param start: first day.
+    :param hunt_ratio: share of sessions that are hunts.
+    :return: columns of every table.
+    """
+    rng = numpy.random.default_rng([seed, batch + 1])
+    birds = len(bird_ids)
+    shape = (birds, days)
+    sessions = birds * days
+
+    female = numpy.asarray(genders) == "female"
+    base = numpy.where(
+        female,
+        rng.uniform(900, 1200, birds),
+        rng.uniform(700, 1000, birds),
     )
+    fed = rng.uniform(0.09, 0.11, shape)
+    lost = rng.uniform(0.09, 0.11, shape)
+    growth = numpy.cumprod(1 + fed - lost, axis=1)
+    start_weight = base[:, None] * numpy.hstack(
+        [numpy.ones((birds, 1)), growth[:, :-1]],
+    )
+    amount = fed * start_weight
+    end_weight = start_weight + amount
+
+    day = numpy.datetime64(start, "m") + numpy.arange(days).astype("timedelta64[D]")
+    start_time = (
+        day[None, :] + rng.integers(-120, 120, shape).astype("timedelta64[m]")
+    ).ravel()
+    end_time = start_time + rng.integers(30, 120, sessions).astype("timedelta64[m]")
+    start_times = start_time.astype("datetime64[us]").tolist()
+    end_times = end_time.astype("datetime64[us]").tolist()
+
+    session_bird = numpy.repeat(numpy.asarray(bird_ids, dtype=object), days)
+    start_weight_ids = numpy.asarray(_uuids(rng, sessions), dtype=object)
+    end_weight_ids = numpy.asarray(_uuids(rng, sessions), dtype=object)
+    hunt = rng.random(sessions) < hunt_ratio
+    training = ~hunt
+    trainings = int(training.sum())
+    hunts = sessions - trainings
+    start_times_arr = numpy.asarray(start_times, dtype=object)
+    end_times_arr = numpy.asarray(end_times, dtype=object)
+
+    return Series(
+        weights={
+            "id": start_weight_ids.tolist() + end_weight_ids.tolist(),
+            "bird_id": session_bird.tolist() * 2,
+            "weight": start_weight.round(2).ravel().tolist()
+            + end_weight.round(2).ravel().tolist(),
+            "w_time": start_times + end_times,
+            "post_feeding": [False] * sessions + [True] * sessions,
+        },
+        feedings={
+            "id": _uuids(rng, sessions),
+            "bird_id": session_bird.tolist(),
+            "f_time": start_times,
+            "food_type": _pick(rng, FOOD_TYPES, sessions),
+            "amount": amount.round(2).ravel().tolist(),
+            "start_weight_id": start_weight_ids.tolist(),
+            "end_weight_id": end_weight_ids.tolist(),
+        },
+        trainings={
+            "id": _uuids(rng, trainings),
+            "bird_id": session_bird[training].tolist(),
+            "start_time": start_times_arr[training].tolist(),
+            "end_time": end_times_arr[training].tolist(),
+            "training_type": _pick(rng, TRAINING_TYPES, trainings),
+            "notes": [""] * trainings,
+            "performance": rng.integers(1, 11, trainings).tolist(),
+            "start_weight_id": start_weight_ids[training].tolist(),
+            "end_weight_id": end_weight_ids[training].tolist(),
+        },
+        hunts={
+            "id": _uuids(rng, hunts),
+            "bird_id": session_bird[hunt].tolist(),
+            "start_time": start_times_arr[hunt].tolist(),
+            "end_time": end_times_arr[hunt].tolist(),
+            "prey_type": _pick(rng, PREY_TYPES, hunts),
+            "prey_count": rng.integers(1, 8, hunts).tolist(),
+            "notes": [""] * hunts,
+            "start_weight_id": start_weight_ids[hunt].tolist(),
+            "end_weight_id": end_weight_ids[hunt].tolist(),
+        },
+    )
+
+
+async def load_owners(session: AsyncSession, owners: Owners) -> None:
+    """
+    COPY falconers and birds.
+
+    :param session: current session.
+    :param owners: generated owners.
+    """
+    connection = await get_driver_connection(session)
+    await copy_columns(
+        connection,
+        FalconerModel.__table__,  # type: ignore
+        owners.falconers,
+    )
+    await copy_columns(connection, BirdModel.__table__, owners.birds)  # type: ignore
+
+
+async def load_series(session: AsyncSession, series: Series) -> int:
+    """
+    COPY a batch of generated records.
+
+    Weights go first, everything else references them.
+
+    :param session: current session.
+    :param series: generated records.
+    :return: number of copied rows.
+    """
+    connection = await get_driver_connection(session)
+    copied = 0
+    for model, columns in (
+        (WeightModel, series.weights),
+        (FeedingModel, series.feedings),
+        (TrainingModel, series.trainings),
+        (HuntModel, series.hunts),
+    ):
+        copied += await copy_columns(
+            connection,
+            model.__table__,  # type: ignore
+            columns,
+        )
+    return copied
+
+
+async def seed_data(  # noqa: WPS211
+    engine: AsyncEngine,
+    seed: int,
+    falconers: int,
+    birds_per_falconer: int,
+    days: int,
+    start: datetime,
+    batch_size: int,
+    workers: int,
+) -> None:
+    """
+    Generate and load a whole dataset.
+
+    Owners and the partitions of the seeded months are created first,
+    then birds are split into batches of `batch_size` that `workers`
+    connections generate and COPY concurrently, one transaction per
+    batch. Every batch is also rolled up into `bird_daily_stats`.
+
+    :param engine: database engine.
+    :param seed: dataset seed.
+    :param falconers: number of falconers.
+    :param birds_per_falconer: birds of every falconer.
+    :param days: days of records per bird.
+    :param start: first day.
+    :param batch_size: birds per batch.
+    :param workers: concurrent connections.
+    """
+    started = time.perf_counter()
+    owners = generate_owners(seed, falconers, birds_per_falconer)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await load_owners(session, owners)
+        await session.commit()
+    logger.info(
+        "Loaded {} falconers and {} birds",
+        falconers,
+        len(owners.birds["id"]),
+    )
+    # Weigh-ins are scattered a few hours around every day.
+    first, last = start - timedelta(days=1), start + timedelta(days=days + 1)
+    months = iter_months(first.date(), last.date())
+    await ensure_months(engine, WeightModel.__tablename__, months)
+
+    bird_ids = owners.birds["id"]
+    genders = owners.birds["gender"]
+    batches = iter(range(0, len(bird_ids), batch_size))
+    loaded = 0
+
+    async def worker() -> None:  # noqa: WPS430
+        nonlocal loaded
+        for offset in batches:
+            series = await asyncio.to_thread(
+                generate_series,
+                seed,
+                offset // batch_size,
+                bird_ids[offset : offset + batch_size],
+                genders[offset : offset + batch_size],
+                days,
+                start,
+            )
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                copied = await load_series(session, series)
+                await backfill(session, bird_ids[offset : offset + batch_size])
+                await session.commit()
+            loaded += copied
+            logger.info("Loaded birds {}-{}", offset, offset + batch_size)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Loaded {:,} rows in {:.1f}s ({:,.0f} rows/s)",
+        loaded,
+        elapsed,
+        loaded / elapsed,
+    )
+
+
+@click.command()
+@click.option("--seed", default=42, show_default=True)
+@click.option("--falconers", default=1, show_default=True)
+@click.option("--birds-per-falconer", default=5, show_default=True)
+@click.option("--days", default=26, show_default=True)
+@click.option(
+    "--start",
+    type=click.DateTime(),
+    default="2023-09-01 12:00:00",
+    show_default=True,
+)
+@click.option("--batch-size", default=100, show_default=True, help="Birds per COPY.")
+@click.option("--workers", default=4, show_default=True, help="Parallel connections.")
+def main(  # noqa: WPS211
+    seed: int,
+    falconers: int,
+    birds_per_falconer: int,
+    days: int,
+    start: datetime,
+    batch_size: int,
+    workers: int,
+) -> None:
+    """Seed the database with a synthetic dataset."""
+
+    async def run() -> None:  # noqa: WPS430
+        engine = create_async_engine(str(settings.db_url), pool_size=workers)
+        await seed_data(
+            engine,
+            seed,
+            falconers,
+            birds_per_falconer,
+            days,
+            start,
+            batch_size,
+            workers,
+        )
+        await engine.dispose()
+
+    asyncio.run(run())
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    main()
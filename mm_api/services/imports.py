@@ -0,0 +1,328 @@
+"""
+Incremental import of CSV and NDJSON logbooks.
+
+The upload is decoded and split into records as its chunks arrive.
+Every record is parsed and validated on its own, valid rows are
+collected until `settings.import_chunk_size` of them are inserted and
+committed together. Only the current record and one chunk of rows are
+held in memory, whatever the size of the upload.
+
+Rows name their bird either by `bird_id` or by `bird_name`, names are
+matched against the falconer's birds ignoring case and surrounding
+whitespace. Rows that can't be used are listed in the report with the
+line they start on, the first line of the upload being 1.
+"""
+import codecs
+import csv
+import json
+from collections import defaultdict
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+from uuid import UUID
+
+from asyncpg import PostgresError
+from pydantic import BaseModel
+from sqlalchemy.exc import DBAPIError
+
+from mm_api.schema.feeding import FeedingBase
+from mm_api.schema.hunt import HuntBase
+from mm_api.schema.imports import (
+    ImportFormat,
+    ImportReport,
+    ImportRowError,
+    ImportTable,
+)
+from mm_api.schema.training import TrainingBase
+from mm_api.schema.weight import WeightCreate
+from mm_api.settings import settings
+
+IMPORT_SCHEMAS: Dict[ImportTable, Type[BaseModel]] = {
+    "weights": WeightCreate,
+    "feedings": FeedingBase,
+    "hunts": HuntBase,
+    "trainings": TrainingBase,
+}
+BIRD_NAME = "bird_name"
+
+Record = Tuple[int, str]
+Insert = Callable[[List[Dict[str, Any]]], Awaitable[int]]
+
+
+class ImportFormatError(ValueError):
+    """Upload that can't be read past a line."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+
+async def read_lines(
+    chunks: AsyncIterator[bytes],
+    max_length: int,
+) -> AsyncIterator[str]:
+    """
+    Split an UTF-8 byte stream into lines.
+
+    :param chunks: chunks of the upload.
+    :param max_length: longest accepted line.
+    :yield: lines with their line ending.
+    :raises ImportFormatError: if the upload isn't UTF-8 or a line is too long.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    async for chunk in chunks:
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise ImportFormatError(number + 1, "Upload is not valid UTF-8")
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            yield f"{line}\n"
+        if len(pending) > max_length:
+            raise ImportFormatError(
+                number + 1,
+                f"Line is longer than {max_length} characters",
+            )
+    if pending:
+        yield pending
+
+
+async def csv_records(
+    lines: AsyncIterator[str],
+    max_length: int,
+) -> AsyncIterator[Record]:
+    """
+    Group lines into CSV records.
+
+    A quoted field may span lines, a record ends on the first line
+    that leaves an even number of quotes in it.
+
+    :param lines: lines of the upload.
+    :param max_length: longest accepted record.
+    :yield: line the record starts on and its text.
+    :raises ImportFormatError: if a record is too long.
+    """
+    record, quotes, start = "", 0, 0
+    number = 0
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+        record += line
+        quotes += line.count('"')
+        if len(record) > max_length:
+            raise ImportFormatError(
+                start,
+                f"Record is longer than {max_length} characters",
+            )
+        if quotes % 2 == 0:
+            yield start, record
+            record, quotes = "", 0
+    if record:
+        yield start, record
+
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Number the non-blank lines of NDJSON.
+
+    :param lines: lines of the upload.
+    :yield: line number and its text.
+    """
+    number = 0
+    async for line in lines:
+        number += 1
+        if line.strip():
+            yield number, line
+
+
+def csv_parser() -> Callable[[str], Optional[Dict[str, Any]]]:
+    """
+    Parser of CSV records, the first non-blank one being the header.
+
+    Empty fields are left out, so that they take their default.
+
+    :return: function returning the row of a record, None for the header
+        and blank records.
+    """
+    header: List[str] = []
+
+    def parse(record: str) -> Optional[Dict[str, Any]]:  # noqa: WPS430
+        try:
+            fields = next(csv.reader([record], strict=True), [])
+        except csv.Error as error:
+            raise ValueError(f"Invalid CSV: {error}")
+        if not fields:
+            return None
+        if not header:
+            header.extend(name.strip() for name in fields)
+            return None
+        if len(fields) != len(header):
+            raise ValueError(f"Expected {len(header)} fields, got {len(fields)}")
+        return {name: value for name, value in zip(header, fields) if value != ""}
+
+    return parse
+
+
+def ndjson_parser() -> Callable[[str], Optional[Dict[str, Any]]]:
+    """
+    Parser of NDJSON lines.
+
+    :return: function returning the row of a line.
+    """
+
+    def parse(record: str) -> Optional[Dict[str, Any]]:  # noqa: WPS430
+        row = json.loads(record)
+        if not isinstance(row, dict):
+            raise ValueError("Line is not a JSON object")
+        return row
+
+    return parse
+
+
+class BirdIndex:
+    """A falconer's birds, by id and by name."""
+
+    def __init__(self, birds: Iterable[Tuple[UUID, str]]):
+        self.ids: Set[UUID] = set()
+        self.names: Dict[str, List[UUID]] = defaultdict(list)
+        for bird_id, name in birds:
+            self.ids.add(bird_id)
+            self.names[name.strip().casefold()].append(bird_id)
+
+    def find(self, name: str) -> UUID:
+        """
+        Id of a bird by name.
+
+        :param name: bird name.
+        :return: bird id.
+        :raises ValueError: if no bird or several birds have this name.
+        """
+        ids = self.names.get(name.strip().casefold(), [])
+        if not ids:
+            raise ValueError(f"No bird named {name!r}")
+        if len(ids) > 1:
+            raise ValueError(f"{len(ids)} birds are named {name!r}, use bird_id")
+        return ids[0]
+
+
+def validate_row(
+    row: Dict[str, Any],
+    schema: Type[BaseModel],
+    birds: BirdIndex,
+) -> Dict[str, Any]:
+    """
+    Validate a row and resolve its bird.
+
+    :param row: parsed row.
+    :param schema: create schema of the table.
+    :param birds: falconer's birds.
+    :return: column values.
+    :raises ValueError: if the row is invalid or its bird isn't the falconer's.
+    """
+    name = row.pop(BIRD_NAME, None)
+    if name is not None:
+        row["bird_id"] = birds.find(str(name))
+    values = schema.model_validate(row).model_dump()
+    if values["bird_id"] not in birds.ids:
+        raise ValueError(f"No bird with id {values['bird_id']}")
+    return values
+
+
+def _describe(error: ValueError) -> str:
+    errors = getattr(error, "errors", None)
+    if errors is None:
+        return str(error)
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in errors()
+    )
+
+
+class Importer:
+    """Validates rows one by one and inserts them in chunks."""
+
+    def __init__(self, table: ImportTable, birds: BirdIndex, insert: Insert):
+        self.schema = IMPORT_SCHEMAS[table]
+        self.birds = birds
+        self.insert = insert
+        self.report = ImportReport()
+        self.rows: List[Dict[str, Any]] = []
+        self.lines: List[int] = []
+
+    def fail(self, line: int, error: str) -> None:
+        """
+        Count a failed row and list it while the report has room.
+
+        :param line: line the row starts on.
+        :param error: why the row failed.
+        """
+        self.report.failed += 1
+        if len(self.report.errors) < settings.import_max_errors:
+            self.report.errors.append(ImportRowError(line=line, error=error))
+
+    async def flush(self) -> None:
+        """Insert the collected rows."""
+        if not self.rows:
+            return
+        try:
+            self.report.imported += await self.insert(self.rows)
+        except (DBAPIError, PostgresError) as error:
+            # SQLAlchemy wraps the driver's error twice.
+            driver_error = getattr(error, "orig", error)
+            reason = driver_error.__cause__ or driver_error
+            for line in self.lines:
+                self.fail(line, f"Chunk rejected by the database: {reason}")
+        self.rows, self.lines = [], []
+
+    async def run(
+        self,
+        chunks: AsyncIterator[bytes],
+        import_format: ImportFormat,
+    ) -> ImportReport:
+        """
+        Import an upload.
+
+        Rows committed before an unreadable line are kept, reading
+        stops there.
+
+        :param chunks: chunks of the upload.
+        :param import_format: format of the upload.
+        :return: import report.
+        """
+        max_length = settings.import_max_record_length
+        lines = read_lines(chunks, max_length)
+        if import_format == "csv":
+            records, parse = csv_records(lines, max_length), csv_parser()
+        else:
+            records, parse = ndjson_records(lines), ndjson_parser()
+        try:
+            async for line, record in records:
+                try:
+                    row = parse(record)
+                    if row is None:
+                        continue
+                    self.rows.append(validate_row(row, self.schema, self.birds))
+                except ValueError as error:
+                    self.fail(line, _describe(error))
+                    continue
+                self.lines.append(line)
+                if len(self.rows) >= settings.import_chunk_size:
+                    await self.flush()
+        except ImportFormatError as error:
+            self.fail(error.line, str(error))
+        await self.flush()
+        return self.report
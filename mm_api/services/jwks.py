@@ -0,0 +1,191 @@
+"""
+Parsed JWKS keys of Clerk, indexed by `kid`.
+
+Keys are parsed once per fetch. The set is refetched every
+`settings.jwks_refresh_interval` by `KeyStore.watch` and whenever
+a token names an unknown `kid`. Refetches are serialized by a lock
+and at most one happens every `settings.jwks_min_refresh_interval`,
+so a key rotation or a flood of forged `kid`s costs a single fetch.
+
+Nothing is fetched at import or while a worker starts. On startup
+`KeyStore.load_files` reads `settings.jwks_file`, which replaces
+fetching altogether, or the last fetched JWKS saved in
+`settings.jwks_cache_file`; `watch` then fetches in the background.
+The cache file is written with mode 0600 and only read back when it is
+still owned by the app and unreadable to others.
+"""
+import asyncio
+import json
+import math
+import os
+import stat
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+from jwt import PyJWKSet
+from jwt.exceptions import PyJWKSetError
+from loguru import logger
+
+from mm_api.settings import settings
+
+
+class KeyStore:
+    """Public keys of a JWKS URL."""
+
+    def __init__(self, url: str, api_key: str) -> None:
+        self.url = url
+        self.api_key = api_key
+        self.keys: Dict[Optional[str], Any] = {}
+        self._lock = asyncio.Lock()
+        self._fetched_at = -math.inf
+
+    def load(self, jwks: Dict[str, Any]) -> None:
+        """
+        Parse and replace the keys.
+
+        Keys that can't be parsed are skipped.
+
+        :param jwks: JWKS document.
+        """
+        try:
+            key_set = PyJWKSet.from_dict(jwks)
+        except PyJWKSetError as exc:
+            logger.warning("No usable JWKS keys: {}", exc)
+            return
+        self.keys = {key.key_id: key.key for key in key_set.keys}
+
+    def load_file(self, path: Path, private: bool = False) -> bool:
+        """
+        Load keys from a JWKS file.
+
+        :param path: JWKS document.
+        :param private: only trust the file if it is a regular file owned
+            by the current user that no one else can read or write.
+        :return: whether any key was loaded.
+        """
+        try:
+            jwks = json.loads(_read(path, private))
+        except (OSError, ValueError) as exc:
+            logger.warning("Could not read JWKS from {}: {}", path, exc)
+            return False
+        self.load(jwks)
+        return bool(self.keys)
+
+    def load_files(self) -> None:
+        """Load `settings.jwks_file`, or the last fetched JWKS if there is one."""
+        if settings.jwks_file is not None:
+            self.load_file(settings.jwks_file)
+        elif settings.jwks_cache_file is not None and settings.jwks_cache_file.exists():
+            self.load_file(settings.jwks_cache_file, private=True)
+
+    def save(self, jwks: Dict[str, Any]) -> None:
+        """
+        Keep a fetched JWKS for the next cold start.
+
+        :param jwks: JWKS document.
+        """
+        path = settings.jwks_cache_file
+        if path is None:
+            return
+        partial = path.with_name(f"{path.name}.{os.getpid()}")
+        try:
+            partial.unlink(missing_ok=True)
+            fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w") as partial_file:
+                partial_file.write(json.dumps(jwks))
+            # Workers saving at once must never leave a torn file.
+            partial.replace(path)
+        except OSError as exc:
+            logger.warning("Could not save JWKS to {}: {}", path, exc)
+
+    async def fetch(self) -> Dict[str, Any]:
+        """
+        Download the JWKS document.
+
+        :return: JWKS document.
+        """
+        async with httpx.AsyncClient(timeout=settings.jwks_timeout) as client:
+            response = await client.get(
+                self.url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+            response.raise_for_status()
+        return response.json()
+
+    async def refresh(self) -> bool:
+        """
+        Refetch the keys, unless they were fetched too recently.
+
+        Keys of `settings.jwks_file` are never refetched.
+
+        :return: whether the keys were fetched.
+        """
+        if settings.jwks_file is not None or self._recently_fetched():
+            return False
+        async with self._lock:
+            # Another request may have fetched them while we waited.
+            if self._recently_fetched():
+                return False
+            try:
+                jwks = await self.fetch()
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning("Could not fetch JWKS: {}", exc)
+                return False
+            finally:
+                self._fetched_at = time.monotonic()
+            self.load(jwks)
+            if self.keys:
+                self.save(jwks)
+            return True
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Any]:
+        """
+        Public key of a token.
+
+        :param kid: `kid` header of the token.
+        :return: key, None if it is unknown even after a refresh.
+        """
+        key = self._lookup(kid)
+        if key is None and kid is not None:
+            # Waits for a refetch already in flight.
+            await self.refresh()
+            key = self._lookup(kid)
+        return key
+
+    async def watch(self) -> None:
+        """Fetch the keys now and every `settings.jwks_refresh_interval`."""
+        while True:  # noqa: WPS457
+            await self.refresh()
+            await asyncio.sleep(settings.jwks_refresh_interval)
+
+    def _lookup(self, kid: Optional[str]) -> Optional[Any]:
+        key = self.keys.get(kid)
+        if key is None and kid is None and len(self.keys) == 1:
+            # A token without `kid` can only mean the single key.
+            key = next(iter(self.keys.values()))
+        return key
+
+    def _recently_fetched(self) -> bool:
+        elapsed = time.monotonic() - self._fetched_at
+        return elapsed < settings.jwks_min_refresh_interval
+
+
+def _read(path: Path, private: bool) -> str:
+    fd = os.open(path, os.O_RDONLY | (os.O_NOFOLLOW if private else 0))
+    with os.fdopen(fd) as jwks_file:
+        if private:
+            status = os.fstat(jwks_file.fileno())
+            if (
+                not stat.S_ISREG(status.st_mode)
+                or status.st_uid != os.getuid()
+                or status.st_mode & 0o077
+            ):
+                raise PermissionError(
+                    "not a private file of the current user, ignored",
+                )
+        return jwks_file.read()
+
+
+key_store = KeyStore(settings.jwks_url, settings.clerk_api_key)
@@ -0,0 +1,102 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Values are kept per worker process and served by `/api/metrics`.
+Every sample carries the `pid` of its worker, so scrapes answered by
+different workers don't mix their values. Aggregate across workers
+with `sum without (pid) (...)`.
+"""
+import os
+from typing import Dict, List, Tuple
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+
+class Metric:
+    """Named family of samples keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.samples: Dict[LabelValues, float] = {}
+        REGISTRY.append(self)
+
+    def get(self, **labels: str) -> float:
+        """
+        Current value of a sample.
+
+        :param labels: sample labels.
+        :return: value, 0 if the sample was never set.
+        """
+        return self.samples.get(_key(labels), 0)
+
+    def render(self, extra: LabelValues = ()) -> List[str]:
+        """
+        Render samples in the Prometheus text format.
+
+        :param extra: labels added to every sample.
+        :return: lines of the metric family.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for labels, value in self.samples.items():
+            label_str = ",".join(f'{key}="{label}"' for key, label in labels + extra)
+            if label_str:
+                label_str = f"{{{label_str}}}"
+            lines.append(f"{self.name}{label_str} {value}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increase a sample.
+
+        :param amount: increment.
+        :param labels: sample labels.
+        """
+        key = _key(labels)
+        self.samples[key] = self.samples.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:  # noqa: WPS125
+        """
+        Set a sample.
+
+        :param value: new value.
+        :param labels: sample labels.
+        """
+        self.samples[_key(labels)] = value
+
+
+REGISTRY: List[Metric] = []
+
+
+def _key(labels: Dict[str, str]) -> LabelValues:
+    return tuple(sorted(labels.items()))
+
+
+def render() -> str:
+    """
+    Render every registered metric of this worker.
+
+    :return: Prometheus exposition text.
+    """
+    worker = (("pid", str(os.getpid())),)
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(worker))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,349 @@
+"""
+Read-through cache of DAO lookups in Redis.
+
+Every cached entity is a hash `cache:<resource>:<id>` with one field
+per `include=` variant, so invalidating an entity is a single DEL.
+Every field is stamped with the entity's version, `version:<resource>:<id>`,
+read before the payload was loaded.
+
+Time-window queries of a bird are cached under keys stamped with
+the bird's version, `version:bird:<id>`, which every write touching
+the bird increments. Stale entries are never read again and expire
+by themselves, nothing has to be scanned or deleted. Every entry keeps
+the freshness its JSON was loaded with, so validators sent with a
+cached page always describe that page.
+
+A payload loaded while a write invalidated it is stored under the
+old version, and never read. A replica may still return a write
+after its invalidation, until it replays it: with replicas, writes
+are invalidated once more after replicas caught up, replicas lagging
+more than `settings.db_replica_max_lag` are not read from. Until
+then, a replica's stale payload may be served from the cache, like
+from the replica itself.
+
+Lookups fall back to the database whenever Redis fails, and Redis
+is then left alone for `settings.cache_retry_seconds`.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from fastapi import Depends
+from loguru import logger
+from pydantic import BaseModel
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dependencies import after_commit
+from mm_api.db.freshness import Freshness
+from mm_api.services.metrics import Counter
+from mm_api.services.redis.dependency import get_redis_pool
+from mm_api.settings import settings
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+T = TypeVar("T")
+# Queues the commands storing a serialized payload.
+Store = Callable[[Pipeline, Any], Any]
+# Reads a cached payload, returns it and how to store a new one.
+Read = Callable[[Redis], Awaitable[Tuple[Optional[bytes], Store]]]
+
+CACHE_REQUESTS = Counter(
+    "mm_api_cache_requests_total",
+    "Read-through cache lookups by resource and result.",
+)
+CACHE_INVALIDATIONS = Counter(
+    "mm_api_cache_invalidations_total",
+    "Cached entities dropped after writes.",
+)
+
+# JSON of a window query and the freshness it was loaded with.
+Window = Tuple[Freshness, bytes]
+
+# Monotonic time until which Redis is skipped after an error.
+_retry_at = 0.0
+# Delayed invalidations, referenced until they ran.
+_delayed: Set["asyncio.Task[None]"] = set()
+
+
+def cache_key(resource: str, uid: Any) -> str:
+    """
+    Redis key of a cached entity.
+
+    :param resource: resource name, e.g. `bird`.
+    :param uid: entity id.
+    :return: redis key.
+    """
+    return f"cache:{resource}:{uid}"
+
+
+def version_key(resource: str, uid: Any) -> str:
+    """
+    Redis key of an entity's version counter.
+
+    Versions never expire: a counter restarting from zero could
+    match the stamp of an entry cached before it was lost.
+
+    :param resource: resource name, e.g. `bird`.
+    :param uid: entity id.
+    :return: redis key.
+    """
+    return f"version:{resource}:{uid}"
+
+
+def _encode_window(window: Window) -> bytes:
+    freshness, body = window
+    modified = freshness.last_modified
+    header = f"{freshness.count} {modified.isoformat() if modified else ''}\n"
+    return header.encode() + body
+
+
+def _stamp(version: Optional[bytes], payload: str) -> str:
+    return f"{int(version or 0)}\n{payload}"
+
+
+def _unstamp(version: Optional[bytes], stamped: Optional[bytes]) -> Optional[bytes]:
+    if stamped is None:
+        return None
+    stamp, _, payload = stamped.partition(b"\n")
+    return payload if int(stamp) == int(version or 0) else None
+
+
+def _drop_later(drop: Callable[[], Awaitable[None]]) -> None:
+    async def run() -> None:  # noqa: WPS430
+        await asyncio.sleep(
+            settings.db_replica_max_lag + settings.db_replica_lag_interval,
+        )
+        await drop()
+
+    task = asyncio.create_task(run())
+    _delayed.add(task)
+    task.add_done_callback(_delayed.discard)
+
+
+def _decode_window(payload: bytes) -> Window:
+    header, _, body = payload.partition(b"\n")
+    count, _, modified = header.decode().partition(" ")
+    last_modified = datetime.fromisoformat(modified) if modified else None
+    return Freshness(last_modified, int(count)), body
+
+
+class ReadCache:
+    """Caches serialized `*Read` payloads of `get_by_id` lookups."""
+
+    def __init__(self, redis_pool: ConnectionPool, ttl: Optional[int] = None) -> None:
+        self.redis_pool = redis_pool
+        self.ttl = ttl or settings.cache_ttl
+
+    async def _call(self, command: Callable[[Redis], Awaitable[Any]]) -> Any:
+        """
+        Run a Redis command, or nothing if Redis is failing.
+
+        :param command: function sending the command.
+        :return: command result.
+        :raises _Unavailable: if Redis failed recently or now.
+        """
+        global _retry_at  # noqa: WPS420
+        if time.monotonic() < _retry_at:
+            raise _Unavailable
+        try:
+            async with Redis(connection_pool=self.redis_pool) as redis:
+                return await command(redis)
+        except (RedisError, OSError) as exc:
+            logger.warning("Redis cache unavailable, using the database: {}", exc)
+            _retry_at = time.monotonic() + settings.cache_retry_seconds
+            raise _Unavailable from exc
+
+    async def _read_through(
+        self,
+        label: str,
+        read: Read,
+        load: Callable[[], Awaitable[T]],
+        encode: Callable[[T], Union[str, bytes]],
+        decode: Callable[[bytes], T],
+    ) -> T:
+        """
+        Get a payload from the cache, loading and caching it on a miss.
+
+        :param label: resource label of the metrics.
+        :param read: reads the cached payload.
+        :param load: loads the payload from the database.
+        :param encode: serializes a loaded payload.
+        :param decode: deserializes a cached payload.
+        :return: payload.
+        """
+        try:
+            cached, store = await self._call(read)
+        except _Unavailable:
+            CACHE_REQUESTS.inc(resource=label, result="error")
+            return await load()
+        if cached is not None:
+            CACHE_REQUESTS.inc(resource=label, result="hit")
+            return decode(cached)
+
+        CACHE_REQUESTS.inc(resource=label, result="miss")
+        loaded = await load()
+        payload = encode(loaded)
+
+        async def write(redis: Redis) -> None:  # noqa: WPS430
+            async with redis.pipeline(transaction=True) as pipe:
+                store(pipe, payload)
+                await pipe.execute()
+
+        try:
+            await self._call(write)
+        except _Unavailable:
+            pass  # noqa: WPS420
+        return loaded
+
+    async def get_or_load(
+        self,
+        resource: str,
+        uid: Any,
+        schema: Type[SchemaT],
+        load: Callable[[], Awaitable[SchemaT]],
+        include: Sequence[str] = (),
+    ) -> SchemaT:
+        """
+        Get an entity from the cache, loading and caching it on a miss.
+
+        :param resource: resource name, e.g. `bird`.
+        :param uid: entity id.
+        :param schema: schema of the payload.
+        :param load: loads the entity from the database.
+        :param include: included relationships, cached separately.
+        :return: entity.
+        """
+        key, field = cache_key(resource, uid), ",".join(sorted(include))
+
+        async def read(redis: Redis) -> Any:  # noqa: WPS430
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.get(version_key(resource, uid))
+                pipe.hget(key, field)
+                version, stamped = await pipe.execute()
+
+            def store(pipe: Pipeline, payload: str) -> None:  # noqa: WPS430
+                pipe.hset(key, field, _stamp(version, payload))
+                pipe.expire(key, self.ttl)
+
+            return _unstamp(version, stamped), store
+
+        return await self._read_through(
+            resource,
+            read,
+            load,
+            lambda entity: entity.model_dump_json(),
+            schema.model_validate_json,
+        )
+
+    async def get_or_load_window(
+        self,
+        resource: str,
+        bird_id: Any,
+        params: Sequence[Any],
+        load: Callable[[], Awaitable[Window]],
+    ) -> Window:
+        """
+        Get a time-window query of a bird, stamped with the bird's version.
+
+        Results are cached as the JSON the query produced and
+        returned as is, without being parsed.
+
+        :param resource: resource name, e.g. `weight`.
+        :param bird_id: bird of the query.
+        :param params: query parameters, e.g. days and page.
+        :param load: runs the query, returns its freshness and JSON.
+        :return: freshness and JSON of the query result.
+        """
+        suffix = ":".join(str(param) for param in params)
+
+        async def read(redis: Redis) -> Any:  # noqa: WPS430
+            version = await redis.get(version_key("bird", bird_id))
+            key = f"{cache_key(resource, bird_id)}:window:v{int(version or 0)}:{suffix}"
+
+            def store(pipe: Pipeline, payload: bytes) -> None:  # noqa: WPS430
+                pipe.set(key, payload, ex=self.ttl)
+
+            return await redis.get(key), store
+
+        return await self._read_through(
+            f"{resource}_window",
+            read,
+            load,
+            _encode_window,
+            _decode_window,
+        )
+
+    async def invalidate(
+        self,
+        resource: str,
+        uids: Iterable[Any],
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """
+        Drop cached entities and bump their versions.
+
+        With a session this is repeated after it commits, and once
+        more after replicas replayed the write if there are replicas.
+
+        :param resource: resource name, e.g. `bird`.
+        :param uids: entity ids.
+        :param session: session of `get_db_session` that wrote them.
+        """
+        unique = sorted({str(uid) for uid in uids})
+        if not unique:
+            return
+
+        async def bump(redis: Redis) -> None:  # noqa: WPS430
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*[cache_key(resource, uid) for uid in unique])
+                for uid in unique:
+                    pipe.incr(version_key(resource, uid))
+                await pipe.execute()
+
+        async def drop() -> None:  # noqa: WPS430
+            try:
+                await self._call(bump)
+            except _Unavailable:
+                # Entries expire after `settings.cache_ttl` anyway.
+                return
+            CACHE_INVALIDATIONS.inc(len(unique), resource=resource)
+
+        async def drop_after_replicas() -> None:  # noqa: WPS430
+            _drop_later(drop)
+
+        await drop()
+        if session is not None:
+            after_commit(session, drop)
+            if settings.db_replica_urls:
+                after_commit(session, drop_after_replicas)
+
+
+class _Unavailable(Exception):
+    """Redis failed, the cache is bypassed."""
+
+
+def get_read_cache(
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> ReadCache:
+    """
+    Read-through cache on the application's Redis pool.
+
+    :param redis_pool: redis connection pool.
+    :return: cache.
+    """
+    return ReadCache(redis_pool)
@@ -12,6 +12,8 @@ def init_redis(app: FastAPI) -> None:  # pragma: no cover
     """
     app.state.redis_pool = ConnectionPool.from_url(
         str(settings.redis_url),
+        socket_timeout=settings.redis_timeout,
+        socket_connect_timeout=settings.redis_timeout,
     )
 
 
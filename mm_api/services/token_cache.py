@@ -0,0 +1,139 @@
+"""
+Cache of verified bearer tokens.
+
+Verifying an RS256 signature costs far more than the rest of an
+authenticated request, and clients send the same token many times
+a minute. Claims of verified tokens are kept in a bounded LRU per
+worker, keyed by the token's SHA-256, until the token expires.
+With `settings.token_cache_shared` they are also stored in Redis,
+so a token verified by one worker is trusted by all of them.
+
+Tokens without `exp` are never cached.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+
+from mm_api.services.metrics import Counter
+from mm_api.settings import settings
+
+Claims = Dict[str, Any]
+
+TOKEN_CACHE_REQUESTS = Counter(
+    "mm_api_token_cache_requests_total",
+    "Verified-token cache lookups by result.",
+)
+
+
+def token_key(token: str) -> str:
+    """
+    Cache key of a token, the token itself is never stored.
+
+    :param token: bearer token.
+    :return: SHA-256 hex digest.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def expires_at(claims: Claims) -> Optional[float]:
+    """
+    Time until which verification would accept the claims.
+
+    :param claims: verified claims.
+    :return: `exp` plus `settings.jwt_leeway`, None without `exp`.
+    """
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return None
+    return exp + settings.jwt_leeway
+
+
+class TokenCache:
+    """Bounded LRU of verified claims."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[str, Tuple[float, Claims]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Claims]:
+        """
+        Claims of an unexpired token.
+
+        :param key: `token_key` of the token.
+        :return: claims, None if unknown or expired.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, claims = entry
+        if expires <= time.time():
+            del self.entries[key]  # noqa: WPS420
+            return None
+        self.entries.move_to_end(key)
+        return claims
+
+    def put(self, key: str, claims: Claims) -> None:
+        """
+        Remember verified claims, evicting the least recently used.
+
+        :param key: `token_key` of the token.
+        :param claims: verified claims.
+        """
+        expires = expires_at(claims)
+        if expires is None or self.maxsize <= 0:
+            return
+        self.entries[key] = (expires, claims)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all tokens."""
+        self.entries.clear()
+
+
+async def get_shared(redis_pool: ConnectionPool, key: str) -> Optional[Claims]:
+    """
+    Claims verified by any worker.
+
+    :param redis_pool: redis connection pool.
+    :param key: `token_key` of the token.
+    :return: claims, None if unknown or Redis fails.
+    """
+    try:
+        async with Redis(connection_pool=redis_pool) as redis:
+            cached = await redis.get(f"token:{key}")
+    except RedisError as exc:
+        logger.warning("Token cache unavailable: {}", exc)
+        return None
+    return None if cached is None else json.loads(cached)
+
+
+async def put_shared(redis_pool: ConnectionPool, key: str, claims: Claims) -> None:
+    """
+    Share verified claims with every worker until they expire.
+
+    :param redis_pool: redis connection pool.
+    :param key: `token_key` of the token.
+    :param claims: verified claims.
+    """
+    expires = expires_at(claims)
+    if expires is None:
+        return
+    ttl = int(expires - time.time())
+    if ttl <= 0:
+        return
+    try:
+        async with Redis(connection_pool=redis_pool) as redis:
+            await redis.set(f"token:{key}", json.dumps(claims), ex=ttl)
+    except RedisError as exc:
+        logger.warning("Token cache unavailable: {}", exc)
+
+
+token_cache = TokenCache(settings.token_cache_size)
@@ -0,0 +1,145 @@
+"""
+Vectorized analytics of a bird's weight series.
+
+The series is fetched as one row of arrays (see
+`WeightDAO.get_series`) and every statistic is computed with
+Polars expressions or NumPy array operations.
+"""
+from datetime import timedelta
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+import numpy
+import polars as pl
+
+from mm_api.schema.weight import WeightAnalytics, WeightTrend
+
+# Trend windows in days, the whole series is always added.
+TREND_DAYS = (7, 30)
+
+
+class WeightSeries(NamedTuple):
+    """Weigh-ins of a bird as columns, ordered by time."""
+
+    w_time: numpy.ndarray
+    weight: numpy.ndarray
+    post_feeding: numpy.ndarray
+
+    @classmethod
+    def from_lists(
+        cls,
+        w_time: Optional[Sequence[Any]],
+        weight: Optional[Sequence[float]],
+        post_feeding: Optional[Sequence[bool]],
+    ) -> "WeightSeries":
+        """
+        Build a series from `array_agg` results.
+
+        :param w_time: weigh-in times, None when there are none.
+        :param weight: weights.
+        :param post_feeding: whether the bird was weighed after feeding.
+        :return: series.
+        """
+        return cls(
+            numpy.array(w_time or [], dtype="datetime64[us]"),
+            numpy.array(weight or [], dtype=numpy.float64),
+            numpy.array(post_feeding or [], dtype=numpy.bool_),
+        )
+
+
+def slope(x: numpy.ndarray, y: numpy.ndarray) -> Optional[float]:
+    """
+    Least-squares slope of y over x.
+
+    :param x: x values.
+    :param y: y values.
+    :return: slope, None with fewer than two distinct x values.
+    """
+    if x.size < 2:
+        return None
+    x_centered = x - x.mean()
+    variance = numpy.dot(x_centered, x_centered)
+    if variance == 0:
+        return None
+    return float(numpy.dot(x_centered, y - y.mean()) / variance)
+
+
+def _trends(series: WeightSeries) -> List[WeightTrend]:
+    """
+    Slopes of pre-feeding weights in grams per day.
+
+    Post-feeding weigh-ins are left out, they measure the meal
+    rather than the bird's condition.
+
+    :param series: weight series.
+    :return: trend of every window ending at the last weigh-in.
+    """
+    pre = ~series.post_feeding
+    times, weights = series.w_time[pre], series.weight[pre]
+    if not times.size:
+        return [WeightTrend(days=days) for days in TREND_DAYS]
+    # Days before the latest weigh-in, as negative floats.
+    age = (times - times[-1]) / numpy.timedelta64(1, "D")
+    span = int(numpy.ceil(-age[0]))
+    trends = []
+    for days in sorted({*TREND_DAYS, span}):
+        recent = age >= -days
+        trends.append(WeightTrend(days=days, slope=slope(age[recent], weights[recent])))
+    return trends
+
+
+def _optional(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def analyze(bird_id: Any, series: WeightSeries, window: int = 7) -> WeightAnalytics:
+    """
+    Compute daily statistics and trends of a weight series.
+
+    :param bird_id: bird of the series.
+    :param series: weight series.
+    :param window: days of the rolling mean.
+    :return: analytics of the series.
+    """
+    frame = pl.DataFrame(
+        {
+            "w_time": series.w_time,
+            "weight": series.weight,
+            "post_feeding": series.post_feeding,
+        },
+    )
+    weight, post_feeding = pl.col("weight"), pl.col("post_feeding")
+    daily = (
+        frame.group_by(pl.col("w_time").dt.date().alias("day"))
+        .agg(
+            pl.len().alias("count"),
+            weight.mean().alias("weight_mean"),
+            weight.filter(~post_feeding).mean().alias("pre_feeding"),
+            weight.filter(post_feeding).mean().alias("post_feeding"),
+        )
+        .sort("day")
+        .with_columns(
+            (pl.col("post_feeding") - pl.col("pre_feeding")).alias("feeding_gain"),
+            pl.col("weight_mean")
+            .rolling_mean_by("day", window_size=f"{window}d")
+            .alias("rolling_mean"),
+            # Only consecutive days have a day-over-day delta.
+            pl.when(pl.col("day").diff() == timedelta(days=1))
+            .then(pl.col("weight_mean").diff())
+            .alias("delta"),
+        )
+    )
+    means = daily.select(
+        pl.col("pre_feeding").mean(),
+        pl.col("post_feeding").mean(),
+        pl.col("feeding_gain").mean(),
+    ).row(0)
+    return WeightAnalytics(
+        bird_id=bird_id,
+        window=window,
+        count=len(frame),
+        pre_feeding_mean=_optional(means[0]),
+        post_feeding_mean=_optional(means[1]),
+        feeding_gain_mean=_optional(means[2]),
+        trends=_trends(series),
+        days=daily.to_dict(as_series=False),
+    )
@@ -0,0 +1,174 @@
+"""
+Food-to-weight-gain model of every bird.
+
+For every feeding the gain is `end_weight - start_weight`, fitted
+as `gain = gain_intercept + gain_per_gram * amount` by least squares.
+The overnight loss is the drop from a feeding's end weight to the
+next feeding's start weight, in grams per day.
+
+Coefficients are fitted per bird and per species with grouped
+Polars aggregations over one joined query and stored in
+`weight_gain_models`:
+
+    python -m mm_api.services.weight_gain
+
+Birds with fewer than `MIN_SAMPLES` feedings are predicted with
+the coefficients of their species.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+import polars as pl
+from sqlalchemy import String, cast, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import aliased
+
+from mm_api.db.models import BirdModel, FeedingModel, WeightGainModel, WeightModel
+from mm_api.settings import settings
+
+MIN_SAMPLES = 5
+# Feedings further apart don't tell much about the overnight loss.
+MAX_OVERNIGHT_DAYS = 2
+
+_start, _end = aliased(WeightModel), aliased(WeightModel)
+FEEDING_GAINS = (
+    select(
+        cast(FeedingModel.bird_id, String).label("bird_id"),
+        BirdModel.species,
+        FeedingModel.f_time,
+        FeedingModel.amount,
+        _start.weight.label("start_weight"),
+        _end.weight.label("end_weight"),
+    )
+    .join(BirdModel, BirdModel.id == FeedingModel.bird_id)
+    .join(_start, _start.id == FeedingModel.start_weight_id)
+    .join(_end, _end.id == FeedingModel.end_weight_id)
+)
+COLUMNS = ["bird_id", "species", "f_time", "amount", "start_weight", "end_weight"]
+
+
+def prepare(frame: pl.DataFrame) -> pl.DataFrame:
+    """
+    Add the gain and overnight loss of every feeding.
+
+    :param frame: rows of `FEEDING_GAINS`.
+    :return: frame with `gain` and `overnight_loss` columns.
+    """
+    days = (
+        pl.col("f_time").shift(-1).over("bird_id") - pl.col("f_time")
+    ).dt.total_seconds() / 86400
+    next_start = pl.col("start_weight").shift(-1).over("bird_id")
+    return (
+        frame.sort("bird_id", "f_time")
+        .with_columns(days.alias("days"))
+        .with_columns(
+            (pl.col("end_weight") - pl.col("start_weight")).alias("gain"),
+            pl.when(pl.col("days").is_between(0, MAX_OVERNIGHT_DAYS, closed="right"))
+            .then((pl.col("end_weight") - next_start) / pl.col("days"))
+            .alias("overnight_loss"),
+        )
+    )
+
+
+def fit(frame: pl.DataFrame, by: List[str]) -> pl.DataFrame:
+    """
+    Fit coefficients of every group at once.
+
+    :param frame: output of `prepare`.
+    :param by: columns to group by.
+    :return: one row of coefficients per group.
+    """
+    amount, gain = pl.col("amount"), pl.col("gain")
+    # A group fed the same amount every time only has a mean gain.
+    gain_per_gram = (
+        pl.when(amount.var() > 0).then(pl.cov(amount, gain) / amount.var()).otherwise(0)
+    )
+    return frame.group_by(by).agg(
+        pl.len().alias("samples"),
+        (gain.mean() - gain_per_gram * amount.mean()).alias("gain_intercept"),
+        gain_per_gram.alias("gain_per_gram"),
+        pl.col("overnight_loss").mean(),
+    )
+
+
+def coefficients(frame: pl.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Rows of `weight_gain_models` for a training set.
+
+    :param frame: rows of `FEEDING_GAINS`.
+    :return: bird rows with at least `MIN_SAMPLES` feedings
+        and one row per species.
+    """
+    prepared = prepare(frame)
+    birds = (
+        fit(prepared, ["bird_id", "species"])
+        .filter(pl.col("samples") >= MIN_SAMPLES)
+        .select(
+            pl.lit("bird").alias("scope"),
+            pl.col("bird_id").alias("key"),
+            pl.exclude("bird_id"),
+        )
+    )
+    species = fit(prepared, ["species"]).select(
+        pl.lit("species").alias("scope"),
+        pl.col("species").alias("key"),
+        pl.all(),
+    )
+    return pl.concat([birds, species], how="diagonal").to_dicts()
+
+
+async def refit(session: AsyncSession) -> int:
+    """
+    Refit and replace all coefficients in the current transaction.
+
+    :param session: current session.
+    :return: number of stored rows.
+    """
+    result = await session.execute(FEEDING_GAINS)
+    feedings = result.all()
+    rows = []
+    if feedings:
+        frame = pl.DataFrame(dict(zip(COLUMNS, zip(*feedings))))
+        rows = coefficients(frame)
+    await session.execute(delete(WeightGainModel))
+    if rows:
+        await session.execute(insert(WeightGainModel), rows)
+    return len(rows)
+
+
+def predict(
+    model: Any,
+    weight: float,
+    amount: float,
+) -> Tuple[float, float, Optional[float]]:
+    """
+    Predict the next day's weight.
+
+    :param model: `WeightGainModel` row.
+    :param weight: weight before feeding.
+    :param amount: grams to feed.
+    :return: predicted weight, gain of the feeding, overnight loss.
+    """
+    gain = model.gain_intercept + model.gain_per_gram * amount
+    loss = model.overnight_loss or 0
+    return weight + gain - loss, gain, model.overnight_loss
+
+
+@click.command()
+def main() -> None:
+    """Refit the food-to-weight-gain model of every bird."""
+
+    async def run() -> None:  # noqa: WPS430
+        engine = create_async_engine(str(settings.db_url))
+        async with AsyncSession(engine) as session:
+            rows = await refit(session)
+            await session.commit()
+        await engine.dispose()
+        click.echo(f"weight_gain_models: {rows} rows")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
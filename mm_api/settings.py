@@ -1,9 +1,8 @@
 import enum
 from pathlib import Path
 from tempfile import gettempdir
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-import httpx
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from yarl import URL
 
@@ -48,6 +47,37 @@ class Settings(BaseSettings):
     db_base: str = "mm_api"
     db_echo: bool = False
     test_db_name: str = "test"
+    # Rows per multi-row INSERT issued by bulk endpoints.
+    bulk_chunk_size: int = 1000
+    # Payloads of at least this many rows are loaded with COPY.
+    bulk_copy_threshold: int = 5000
+    # Read replicas as a JSON list of SQLAlchemy URLs.
+    db_replica_urls: List[str] = []
+    # Seconds a client reads from the primary after a write.
+    db_sticky_seconds: int = 5
+    # Replicas lagging more than this many seconds get no reads.
+    db_replica_max_lag: float = 10
+    # Seconds between replica lag measurements.
+    db_replica_lag_interval: float = 5
+    # Connections all workers together may open to one database.
+    # When set, pool size of every worker is derived from it.
+    db_connection_budget: Optional[int] = None
+    # Connection pool of a worker, explicit values win over the budget.
+    db_pool_size: Optional[int] = None
+    db_max_overflow: Optional[int] = None
+    # Seconds to wait for a free connection before failing.
+    db_pool_timeout: float = 30
+    # Seconds after which connections are reopened, -1 to keep them.
+    db_pool_recycle: int = -1
+    # Check connections with a ping before handing them out.
+    db_pool_pre_ping: bool = False
+    # Prepared statements kept per connection, 0 disables them
+    # (needed behind pgbouncer in transaction mode).
+    db_prepared_statement_cache_size: int = 500
+    # Compiled SQL strings cached per engine.
+    db_query_cache_size: int = 500
+    # Monthly partitions created ahead of the current month.
+    db_partition_months_ahead: int = 3
 
     # Variables for Redis
     redis_host: str = "mm_api-redis"
@@ -55,6 +85,29 @@ class Settings(BaseSettings):
     redis_user: Optional[str] = None
     redis_pass: Optional[str] = None
     redis_base: Optional[int] = None
+    # Seconds to wait for Redis before giving up on it.
+    redis_timeout: float = 1.0
+
+    # Read-through cache of `get_by_id` lookups.
+    cache_ttl: int = 300
+    # Seconds Redis is skipped after an error.
+    cache_retry_seconds: int = 5
+
+    # Rows fetched from the server-side cursor per export chunk.
+    export_chunk_size: int = 10000
+    # Rows validated and committed together by imports.
+    import_chunk_size: int = 5000
+    # Longest CSV record or NDJSON line accepted by imports, in characters.
+    import_max_record_length: int = 65536
+    # Row errors listed in an import report, the rest are only counted.
+    import_max_errors: int = 1000
+
+    # Responses smaller than this many bytes are sent uncompressed.
+    compression_min_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    # Compressed bodies kept per worker, in bytes.
+    compression_cache_bytes: int = 32 * 1024 * 1024
 
     # Sentry's configuration.
     sentry_dsn: Optional[str] = None
@@ -66,29 +119,49 @@ class Settings(BaseSettings):
     # JWKS URL
     jwks_url: str = "https://api.clerk.com/v1/jwks"
 
-    jwks: Optional[dict] = None  # type: ignore
+    # JWKS document used instead of fetching `jwks_url`, for offline runs.
+    jwks_file: Optional[Path] = None
+    # Last fetched JWKS, loaded on startup before anything is fetched.
+    # Keys in it are trusted, so it must be in a directory only the app
+    # can write to; it is ignored unless owned by the app and private.
+    jwks_cache_file: Optional[Path] = None
+    # Seconds between scheduled JWKS refetches.
+    jwks_refresh_interval: float = 3600
+    # Unknown `kid`s refetch the JWKS at most once in this many seconds.
+    jwks_min_refresh_interval: float = 30
+    jwks_timeout: float = 5
+    # Seconds of clock skew tolerated on `exp` and `nbf`.
+    jwt_leeway: float = 5
+    # Verified tokens kept per worker, 0 disables the cache.
+    token_cache_size: int = 10000
+    # Share verified tokens between workers through Redis.
+    token_cache_shared: bool = False
 
-    def __init__(self, *args, **kwargs) -> None:  # type: ignore
-        super().__init__(*args, **kwargs)
-        self.fetch_jwks()
-
-    def fetch_jwks(self) -> None:
+    @property
+    def db_pool_options(self) -> Dict[str, Any]:
         """
-        Fetch JWKS from the given URL.
+        Connection pool arguments for `create_async_engine`.
+
+        With `db_connection_budget` every worker gets an equal share
+        as its pool and no overflow, so all workers together never
+        open more connections than the budget. Otherwise SQLAlchemy's
+        defaults of 5 connections plus 10 overflow are used.
 
-        :return: JWKS dictionary.
+        :return: engine keyword arguments.
         """
-        try:
-            self.jwks = httpx.get(
-                self.jwks_url,
-                headers={"Authorization": f"Bearer {self.clerk_api_key}"},
-            ).json()
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error occurred: {e}")
-            return
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            return
+        pool_size, max_overflow = 5, 10
+        if self.db_connection_budget is not None:
+            pool_size = max(1, self.db_connection_budget // self.workers_count)
+            max_overflow = 0
+        return {
+            "pool_size": self.db_pool_size or pool_size,
+            "max_overflow": (
+                max_overflow if self.db_max_overflow is None else self.db_max_overflow
+            ),
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+        }
 
     @property
     def db_url(self) -> URL:
@@ -0,0 +1,96 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from starlette import status
+
+from mm_api.db.dependencies import get_db_read_session
+from mm_api.db.routing import SessionRouter
+from mm_api.schema.bulk import MAX_BATCH_IDS
+from mm_api.schema.feeding import FeedingRead
+from mm_api.schema.weight import WeightRead
+
+
+@pytest.mark.anyio
+async def test_batch_get_weights(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    weight: WeightRead,
+    end_weight: WeightRead,
+) -> None:
+    unknown = str(uuid4())
+    ids = [str(end_weight.id), unknown, str(weight.id), str(end_weight.id)]
+    response = await client.post(
+        fastapi_app.url_path_for("batch_get_weights"),
+        json={"ids": ids},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    result = response.json()
+    assert [item["id"] for item in result["items"]] == [
+        str(end_weight.id),
+        str(weight.id),
+    ]
+    assert result["items"][1]["weight"] == weight.weight
+    assert result["missing"] == [unknown]
+
+
+@pytest.mark.anyio
+async def test_batch_get_feedings_include(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    feeding: FeedingRead,
+) -> None:
+    url = fastapi_app.url_path_for("batch_get_feedings")
+    response = await client.post(
+        url,
+        params={"include": "start_weight"},
+        json={"ids": [str(feeding.id)]},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    (item,) = response.json()["items"]
+    assert item["start_weight"]["id"] == str(feeding.start_weight_id)
+    assert item["end_weight"] is None
+
+    response = await client.post(url, json={"ids": []})
+    assert response.json() == {"items": [], "missing": []}
+
+
+@pytest.mark.anyio
+async def test_batch_get_limits(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    url = fastapi_app.url_path_for("batch_get_hunts")
+    ids = [str(uuid4()) for _ in range(MAX_BATCH_IDS + 1)]
+    response = await client.post(url, json={"ids": ids})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await client.post(url, json={"ids": ids[:MAX_BATCH_IDS]})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["missing"]) == MAX_BATCH_IDS
+
+    response = await client.post(
+        fastapi_app.url_path_for("batch_get_trainings"),
+        json={"ids": ["not-a-uuid"]},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_batch_get_is_not_sticky(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    _engine: AsyncEngine,
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    sessions = async_sessionmaker(_engine, expire_on_commit=False)
+    fastapi_app.state.db_router = SessionRouter(sessions, [sessions], fake_redis_pool)
+    del fastapi_app.dependency_overrides[get_db_read_session]
+
+    response = await client.post(
+        fastapi_app.url_path_for("batch_get_weights"),
+        json={"ids": [str(uuid4())]},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert await redis.keys("db:sticky:*") == []
@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from faker import Faker
 from fastapi import FastAPI
@@ -8,11 +10,13 @@ from starlette import status
 
 from mm_api.schema.bird import BirdRead
 from mm_api.schema.falconer import FalconerRead
+from mm_api.schema.feeding import FeedingRead
 from mm_api.schema.hunt import HuntBase
-from mm_api.schema.training import TrainingBase
+from mm_api.schema.training import TrainingBase, TrainingRead
 from mm_api.schema.weight import WeightCreate
 from mm_api.tests.utils.birds import create_bird
 from mm_api.tests.utils.generations import create_feeding
+from mm_api.tests.utils.statements import capture_statements
 
 fake = Faker()
 
@@ -58,7 +62,77 @@ async def test_get_bids_by_falconer_id(
     response = await authed_client.get(url)
     assert response.status_code == status.HTTP_200_OK
     response_data = response.json()
-    assert len(response_data) == 2
+    assert len(response_data["items"]) == 2
+    assert response_data["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_get_bird_include(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    bird: BirdRead,
+    feeding: FeedingRead,
+    training: TrainingRead,
+) -> None:
+    url = fastapi_app.url_path_for("get_bird", bird_id=bird.id)
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["weights"] is None
+
+    with capture_statements(dbsession) as statements:
+        response = await client.get(
+            url,
+            params={"include": "weights,feedings,trainings,hunts"},
+        )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    response_data = response.json()
+    assert len(response_data["weights"]) == 2
+    assert response_data["feedings"][0]["id"] == str(feeding.id)
+    assert response_data["trainings"][0]["id"] == str(training.id)
+    assert response_data["hunts"] == []
+    # One query for the bird and one per included relationship.
+    assert len(statements) == 5
+
+
+@pytest.mark.anyio
+async def test_get_bird_unknown_include(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    url = fastapi_app.url_path_for("get_bird", bird_id=bird.id)
+    response = await client.get(url, params={"include": "weights,falconer"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_get_birds_by_falconer_id_include(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    dbsession: AsyncSession,
+    falconer: FalconerRead,
+) -> None:
+    for _ in range(3):
+        bird, response = await create_bird(fastapi_app, authed_client, falconer)
+        url = fastapi_app.url_path_for("create_weight")
+        weight = WeightCreate(
+            id=uuid.uuid4(),
+            bird_id=bird.id,
+            weight=900,
+            w_time=fake.date_time(),
+        )
+        response = await authed_client.post(url, json=jsonable_encoder(weight))
+        assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    url = fastapi_app.url_path_for("get_birds_by_falconer_id")
+    with capture_statements(dbsession) as statements:
+        response = await authed_client.get(url, params={"include": "weights"})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    items = response.json()["items"]
+    assert len(items) == 3
+    assert all(len(item["weights"]) == 1 for item in items)
+    assert len(statements) == 2
 
 
 # @pytest.mark.anyio
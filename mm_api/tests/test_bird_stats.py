@@ -0,0 +1,180 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from mm_api.db.models import BirdDailyStatsModel
+from mm_api.db.rollup import backfill, period_start
+from mm_api.schema.bird import BirdRead
+from mm_api.schema.hunt import HuntBase
+from mm_api.schema.training import TrainingBase
+from mm_api.tests.utils.generations import create_feeding, create_weight
+
+# Monday and Tuesday of last week.
+MONDAY = datetime.combine(
+    period_start(date.today(), "week") - timedelta(days=7),
+    datetime.min.time(),
+)
+TUESDAY = MONDAY + timedelta(days=1)
+
+
+def test_period_start() -> None:
+    day = date(2024, 5, 16)
+    assert period_start(day, "day") == day
+    assert period_start(day, "week") == date(2024, 5, 13)
+    assert period_start(day, "month") == date(2024, 5, 1)
+
+
+async def _record_week(
+    fastapi_app: FastAPI, client: AsyncClient, bird: BirdRead
+) -> None:
+    weights = [
+        create_weight(bird.id, MONDAY + timedelta(hours=8), 900),
+        create_weight(bird.id, MONDAY + timedelta(hours=18), 950),
+        create_weight(bird.id, TUESDAY + timedelta(hours=8), 1000),
+    ]
+    response = await client.post(
+        fastapi_app.url_path_for("create_weight"),
+        json=jsonable_encoder(weights[0]),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    response = await client.post(
+        fastapi_app.url_path_for("create_bulk_weight"),
+        json=jsonable_encoder(weights[1:]),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    feedings = [
+        create_feeding(bird.id, amount, MONDAY + timedelta(hours=hour), *ids)
+        for amount, hour, ids in (
+            (40, 9, (weights[0].id, weights[1].id)),
+            (60, 19, (weights[1].id, weights[2].id)),
+        )
+    ]
+    for feeding in feedings:
+        feeding.food_type = "quail"
+    response = await client.post(
+        fastapi_app.url_path_for("create_bulk_feeding"),
+        json=jsonable_encoder(feedings),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    hunt = HuntBase(
+        bird_id=bird.id,
+        prey_type="rabbit",
+        prey_count=2,
+        notes="",
+        start_time=TUESDAY + timedelta(hours=10),
+        end_time=TUESDAY + timedelta(hours=12),
+    )
+    response = await client.post(
+        fastapi_app.url_path_for("create_hunt"),
+        json=jsonable_encoder(hunt),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    trainings = [
+        TrainingBase(
+            bird_id=bird.id,
+            start_time=TUESDAY + timedelta(hours=hour),
+            end_time=TUESDAY + timedelta(hours=hour + 1),
+            training_type="lure",
+            notes="",
+            performance=performance,
+        )
+        for hour, performance in ((14, 4), (16, 8))
+    ]
+    response = await client.post(
+        fastapi_app.url_path_for("create_bulk_training"),
+        json=jsonable_encoder(trainings),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+
+async def _daily_rows(dbsession: AsyncSession, bird: BirdRead) -> List[Dict[str, Any]]:
+    rows = await dbsession.execute(
+        select(BirdDailyStatsModel)
+        .where(BirdDailyStatsModel.bird_id == bird.id)
+        .order_by(BirdDailyStatsModel.day),
+    )
+    return [
+        {
+            column.key: getattr(row, column.key)
+            for column in BirdDailyStatsModel.__table__.columns
+            if column.key != "updated_at"
+        }
+        for row in rows.scalars().all()
+    ]
+
+
+@pytest.mark.anyio
+async def test_daily_stats(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    await _record_week(fastapi_app, client, bird)
+
+    url = fastapi_app.url_path_for("get_bird_stats", bird_id=bird.id)
+    response = await client.get(url, params={"days": 30})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    monday, tuesday = response.json()
+    assert monday["period"] == MONDAY.date().isoformat()
+    assert monday["weight_count"] == 2
+    assert monday["weight_min"] == 900
+    assert monday["weight_max"] == 950
+    assert monday["weight_mean"] == 925
+    assert monday["weight_last"] == 950
+    assert monday["feeding_count"] == 2
+    assert monday["food_amounts"] == {"quail": 100}
+    assert monday["hunt_count"] == 0
+    assert monday["performance_mean"] is None
+    assert tuesday["weight_last"] == 1000
+    assert tuesday["prey_count"] == 2
+    assert tuesday["training_count"] == 2
+    assert tuesday["performance_mean"] == 6
+
+
+@pytest.mark.anyio
+async def test_weekly_stats(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    await _record_week(fastapi_app, client, bird)
+
+    url = fastapi_app.url_path_for("get_bird_stats", bird_id=bird.id)
+    response = await client.get(url, params={"granularity": "week", "days": 30})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    (week,) = response.json()
+    assert week["period"] == MONDAY.date().isoformat()
+    assert week["weight_count"] == 3
+    assert week["weight_min"] == 900
+    assert week["weight_last"] == 1000
+    assert week["food_amount"] == 100
+    assert week["hunt_count"] == 1
+    assert week["training_count"] == 2
+
+    response = await client.get(url, params={"granularity": "year"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_backfill_matches_incremental(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    await _record_week(fastapi_app, client, bird)
+    incremental = await _daily_rows(dbsession, bird)
+    assert len(incremental) == 2
+
+    await backfill(dbsession, [bird.id])
+    dbsession.expire_all()
+    assert await _daily_rows(dbsession, bird) == incremental
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from mm_api.db.freshness import Freshness
+from mm_api.schema.bird import BirdRead
+from mm_api.services.redis import cache
+from mm_api.services.redis.cache import CACHE_REQUESTS, ReadCache, version_key
+from mm_api.services.redis.dependency import get_redis_pool
+from mm_api.settings import settings
+from mm_api.tests.utils.generations import create_weight
+
+
+@pytest.mark.anyio
+async def test_bird_cache_hit_and_invalidation(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    hits = CACHE_REQUESTS.get(resource="bird", result="hit")
+    misses = CACHE_REQUESTS.get(resource="bird", result="miss")
+    url = fastapi_app.url_path_for("get_bird", bird_id=bird.id)
+
+    first = await client.get(url, params={"include": "weights"})
+    second = await client.get(url, params={"include": "weights"})
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    assert CACHE_REQUESTS.get(resource="bird", result="miss") == misses + 1
+    assert CACHE_REQUESTS.get(resource="bird", result="hit") == hits + 1
+
+    # Other includes are cached separately.
+    response = await client.get(url)
+    assert response.json()["weights"] is None
+    assert CACHE_REQUESTS.get(resource="bird", result="miss") == misses + 2
+
+    weight = create_weight(bird.id, datetime.now(), 850)
+    response = await client.post(
+        fastapi_app.url_path_for("create_weight"),
+        json=jsonable_encoder(weight),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    response = await client.get(url, params={"include": "weights"})
+    assert [row["id"] for row in response.json()["weights"]] == [str(weight.id)]
+    assert CACHE_REQUESTS.get(resource="bird", result="miss") == misses + 3
+
+
+@pytest.mark.anyio
+async def test_replica_reads_cached(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "db_replica_urls", ["postgresql://replica/mm_api"])
+    monkeypatch.setitem(dbsession.info, "replica", 0)
+    hits = CACHE_REQUESTS.get(resource="bird", result="hit")
+    window_hits = CACHE_REQUESTS.get(resource="weight_window", result="hit")
+    url = fastapi_app.url_path_for("get_bird", bird_id=bird.id)
+    window_url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=bird.id)
+
+    for _ in range(2):
+        response = await client.get(url)
+        assert response.json()["id"] == str(bird.id)
+        response = await client.get(window_url)
+        assert response.status_code == status.HTTP_200_OK
+    assert CACHE_REQUESTS.get(resource="bird", result="hit") == hits + 1
+    assert CACHE_REQUESTS.get(resource="weight_window", result="hit") == window_hits + 1
+
+
+@pytest.mark.anyio
+async def test_loads_racing_invalidation_not_served(
+    fake_redis_pool: ConnectionPool,
+    bird: BirdRead,
+) -> None:
+    read_cache = ReadCache(fake_redis_pool)
+    misses = CACHE_REQUESTS.get(resource="bird", result="miss")
+    window_misses = CACHE_REQUESTS.get(resource="weight_window", result="miss")
+
+    def racing(payload: Any) -> Callable[[], Awaitable[Any]]:
+        raced = []
+
+        async def load() -> Any:  # noqa: WPS430
+            # A write invalidates the bird while its old payload is loaded.
+            if not raced:
+                raced.append(True)
+                await read_cache.invalidate("bird", [bird.id])
+            return payload
+
+        return load
+
+    load_bird, load_window = racing(bird), racing((Freshness(None, 0), b"[]"))
+    for _ in range(3):
+        await read_cache.get_or_load("bird", bird.id, BirdRead, load_bird)
+    for _ in range(3):
+        await read_cache.get_or_load_window("weight", bird.id, (7,), load_window)
+    assert CACHE_REQUESTS.get(resource="bird", result="miss") == misses + 2
+    assert CACHE_REQUESTS.get(resource="weight_window", result="miss") == (
+        window_misses + 2
+    )
+
+
+@pytest.mark.anyio
+async def test_invalidated_again_after_replicas(
+    dbsession: AsyncSession,
+    fake_redis_pool: ConnectionPool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "db_replica_urls", ["postgresql://replica/mm_api"])
+    monkeypatch.setattr(settings, "db_replica_max_lag", 0)
+    monkeypatch.setattr(settings, "db_replica_lag_interval", 0)
+    bird_id = uuid4()
+
+    await ReadCache(fake_redis_pool).invalidate("bird", [bird_id], dbsession)
+    for callback in dbsession.info.pop("after_commit"):
+        await callback()
+    await asyncio.gather(*cache._delayed)  # noqa: WPS437
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert await redis.get(version_key("bird", bird_id)) == b"3"
+
+
+@pytest.mark.anyio
+async def test_cache_falls_back_to_db(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(cache, "_retry_at", 0.0)
+    broken_pool = ConnectionPool.from_url(
+        "redis://127.0.0.1:1",
+        socket_connect_timeout=0.1,
+    )
+    fastapi_app.dependency_overrides[get_redis_pool] = lambda: broken_pool
+    errors = CACHE_REQUESTS.get(resource="bird", result="error")
+
+    url = fastapi_app.url_path_for("get_bird", bird_id=bird.id)
+    for _ in range(2):
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == str(bird.id)
+    assert CACHE_REQUESTS.get(resource="bird", result="error") == errors + 2
+    # Redis is skipped after the first error.
+    assert cache._retry_at > 0  # noqa: WPS437
+
+    weight = create_weight(bird.id, datetime.now(), 850)
+    response = await client.post(
+        fastapi_app.url_path_for("create_weight"),
+        json=jsonable_encoder(weight),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    await broken_pool.disconnect()
+
+
+@pytest.mark.anyio
+async def test_filter_date_versioned_by_bird(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+    fake_redis_pool: ConnectionPool,
+) -> None:
+    hits = CACHE_REQUESTS.get(resource="weight_window", result="hit")
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=bird.id)
+
+    assert (await client.get(url, params={"days": 7})).json()["items"] == []
+    assert (await client.get(url, params={"days": 7})).json()["items"] == []
+    assert CACHE_REQUESTS.get(resource="weight_window", result="hit") == hits + 1
+
+    weight = create_weight(bird.id, datetime.now(), 850)
+    response = await client.post(
+        fastapi_app.url_path_for("create_weight"),
+        json=jsonable_encoder(weight),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        assert await redis.get(version_key("bird", bird.id)) == b"1"
+
+    response = await client.get(url, params={"days": 7})
+    assert [row["id"] for row in response.json()["items"]] == [str(weight.id)]
+    assert CACHE_REQUESTS.get(resource="weight_window", result="hit") == hits + 1
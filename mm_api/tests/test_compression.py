@@ -0,0 +1,130 @@
+import gzip
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from starlette import status
+
+from mm_api.schema.bird import BirdRead
+from mm_api.services.compression import compression_cache, negotiate
+from mm_api.settings import settings
+from mm_api.tests.utils.generations import create_weight
+
+
+@pytest.fixture(autouse=True)
+def _empty_compression_cache() -> Iterator[None]:
+    compression_cache.clear()
+    yield
+    compression_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("GZIP", "gzip"),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("gzip;q=0, identity", None),
+        ("gzip;q=oops", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding: str, expected: str) -> None:
+    assert negotiate(accept_encoding) == expected
+
+
+@pytest.mark.anyio
+async def test_echo_compression(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    url = fastapi_app.url_path_for("send_echo_message")
+    message = "mews " * 1000
+    response = await client.post(
+        url,
+        json={"message": message},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) < len(message)
+    assert response.json()["message"] == message
+    # POST responses are not cached.
+    assert not compression_cache.entries
+
+    response = await client.post(
+        url,
+        json={"message": "short"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    response = await client.post(
+        url,
+        json={"message": message},
+        headers={"Accept-Encoding": "gzip, br"},
+    )
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.json()["message"] == message
+
+    response = await client.post(
+        url,
+        json={"message": message},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.json()["message"] == message
+
+
+@pytest.mark.anyio
+async def test_filter_date_compression_cached(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    start = datetime.now() - timedelta(days=20)
+    weights = [
+        create_weight(bird.id, start + timedelta(hours=hour), 900 + hour)
+        for hour in range(200)
+    ]
+    response = await client.post(
+        fastapi_app.url_path_for("create_bulk_weight"),
+        json=jsonable_encoder(weights),
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    calls = []
+
+    def counting_compress(body: bytes, encoding: str) -> bytes:
+        calls.append(encoding)
+        return gzip.compress(body, mtime=0)
+
+    monkeypatch.setattr(settings, "compression_min_size", 100)
+    monkeypatch.setattr("mm_api.web.middleware.compress", counting_compress)
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=str(bird.id))
+    plain = await client.get(url, headers={"Accept-Encoding": "identity"})
+    for _ in range(3):
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.content == plain.content
+    assert calls == ["gzip"]
+    assert len(compression_cache.entries) == 1
+
+
+@pytest.mark.anyio
+async def test_streamed_export_not_compressed(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+) -> None:
+    url = fastapi_app.url_path_for("export_table", table="weights")
+    response = await authed_client.get(
+        url,
+        params={"format": "arrow"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from mm_api.db.dao.feeding_dao import FeedingDAO
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.models import WeightModel
+from mm_api.schema.bird import BirdRead
+from mm_api.schema.feeding import FeedingRead
+from mm_api.schema.weight import WeightRead
+from mm_api.tests.utils.generations import create_weight
+
+
+def _refuse(*args: object, **kwargs: object) -> None:
+    raise AssertionError("rows were loaded")
+
+
+@pytest.mark.anyio
+async def test_get_weight_not_modified(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    weight: WeightRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    url = fastapi_app.url_path_for("get_weight", weight_id=str(weight.id))
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert etag.startswith('W/"1-')
+
+    monkeypatch.setattr(WeightDAO, "get_by_id", _refuse)
+    for headers in (
+        {"If-None-Match": etag},
+        {"If-None-Match": f'"other", {etag.removeprefix("W/")}'},
+        {"If-None-Match": "*"},
+        {"If-Modified-Since": last_modified},
+    ):
+        response = await client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, headers
+        assert response.headers["ETag"] == etag
+        assert not response.content
+    monkeypatch.undo()
+
+    earlier = weight.updated_at.replace(tzinfo=timezone.utc) - timedelta(days=1)
+    for headers in (
+        {"If-None-Match": '"other"'},
+        {"If-Modified-Since": format_datetime(earlier, usegmt=True)},
+        {"If-None-Match": '"other"', "If-Modified-Since": last_modified},
+    ):
+        response = await client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK, headers
+        assert response.json()["id"] == str(weight.id)
+
+
+@pytest.mark.anyio
+async def test_get_bird_etag_follows_children(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+    weight: WeightRead,
+) -> None:
+    url = fastapi_app.url_path_for("get_bird", bird_id=str(bird.id))
+    params = {"include": "weights,hunts"}
+    etag = (await client.get(url, params=params)).headers["ETag"]
+    assert etag.startswith('W/"2-')
+    assert (await client.get(url)).headers["ETag"] != etag
+
+    response = await client.get(url, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    new_weight = create_weight(bird.id, datetime(2024, 3, 1, 9), 900)
+    response = await client.post(
+        fastapi_app.url_path_for("create_weight"),
+        json=jsonable_encoder(new_weight),
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get(url, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["weights"]) == 2
+    assert response.headers["ETag"].startswith('W/"3-')
+
+
+@pytest.mark.anyio
+async def test_get_feeding_etag_with_includes(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    feeding: FeedingRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    url = fastapi_app.url_path_for("get_feeding", feeding_id=str(feeding.id))
+    params = {"include": "start_weight,end_weight"}
+    etag = (await client.get(url, params=params)).headers["ETag"]
+    assert etag.startswith('W/"3-')
+
+    monkeypatch.setattr(FeedingDAO, "get_by_id", _refuse)
+    response = await client.get(url, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.anyio
+async def test_filter_date_not_modified(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    start = datetime.now() - timedelta(days=3)
+    for day in range(3):
+        weight = create_weight(bird.id, start + timedelta(days=day), 900 + day)
+        await client.post(
+            fastapi_app.url_path_for("create_weight"),
+            json=jsonable_encoder(weight),
+        )
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=str(bird.id))
+    response = await client.get(url, params={"limit": 2})
+    etag = response.headers["ETag"]
+    # The extra row that tells whether there is a next page is counted.
+    assert etag.startswith('W/"3-')
+    assert response.json()["next_cursor"]
+
+    monkeypatch.setattr(WeightDAO, "filter_json_by_bird_id_and_time", _refuse)
+    response = await client.get(
+        url,
+        params={"limit": 2},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    monkeypatch.undo()
+    response = await client.get(
+        url,
+        params={"limit": 2, "days": 1},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_filter_date_validators_cached_with_page(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    weight: WeightRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=str(weight.bird_id))
+    first = await client.get(url, params={"days": 1})
+    assert first.headers["ETag"].startswith('W/"1-')
+
+    # A write the cache doesn't know about leaves the cached page as is,
+    # it is still sent with the validators it was loaded with.
+    await dbsession.execute(
+        update(WeightModel)
+        .where(WeightModel.id == weight.id)
+        .values(updated_at=weight.updated_at + timedelta(minutes=1)),
+    )
+    # Without preconditions a cached page costs no query.
+    monkeypatch.setattr(WeightDAO, "freshness_by_bird_id_and_time", _refuse)
+    response = await client.get(url, params={"days": 1})
+    assert response.content == first.content
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert response.headers["Last-Modified"] == first.headers["Last-Modified"]
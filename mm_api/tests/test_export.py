@@ -0,0 +1,49 @@
+import io
+from datetime import datetime, timedelta
+
+import polars as pl
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from starlette import status
+
+from mm_api.schema.bird import BirdRead
+from mm_api.settings import settings
+from mm_api.tests.utils.generations import create_weight
+
+
+@pytest.mark.anyio
+async def test_export_weights(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "export_chunk_size", 2)
+    start = datetime(2024, 3, 1, 9)
+    weights = [
+        create_weight(bird.id, start + timedelta(days=day), 900 + day)
+        for day in range(5)
+    ]
+    response = await authed_client.post(
+        fastapi_app.url_path_for("create_bulk_weight"),
+        json=jsonable_encoder(weights),
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    url = fastapi_app.url_path_for("export_table", table="weights")
+    readers = {"arrow": pl.read_ipc_stream, "parquet": pl.read_parquet}
+    for export_format, read in readers.items():
+        response = await authed_client.get(url, params={"format": export_format})
+        assert response.status_code == status.HTTP_200_OK, response.text
+        frame = read(io.BytesIO(response.content))
+        assert frame["id"].to_list() == [str(weight.id) for weight in weights]
+        assert frame["weight"].to_list() == [900, 901, 902, 903, 904]
+        assert frame["w_time"].dtype == pl.Datetime("us")
+
+    url = fastapi_app.url_path_for("export_table", table="hunts")
+    response = await authed_client.get(url, params={"format": "arrow"})
+    frame = pl.read_ipc_stream(io.BytesIO(response.content))
+    assert frame.is_empty()
+    assert "prey_count" in frame.columns
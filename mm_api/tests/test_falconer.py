@@ -5,6 +5,8 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from mm_api.db.dao.falconer_dao import FalconerDAO
+from mm_api.db.pagination import PageParams, decode_cursor
 from mm_api.schema.falconer import FalconerCreate, FalconerRead
 
 fake = Faker()
@@ -45,3 +47,30 @@ async def test_get_falconer(
     response_data = response.json()
     assert response_data["id"] == falconer.id
     assert response_data["name"] == falconer.name
+
+
+@pytest.mark.anyio
+async def test_page_falconers(dbsession: AsyncSession) -> None:
+    dao = FalconerDAO(dbsession)
+    created = [
+        await dao.create(
+            FalconerCreate(
+                id=f"user_{fake.pystr()}",
+                name=fake.name(),
+                permit_class="general",
+                permit_number=fake.numerify("######"),
+            ),
+        )
+        for _ in range(5)
+    ]
+
+    seen = []
+    page = PageParams(limit=2)
+    while True:
+        result = await dao.get_all(page)
+        seen.extend(falconer.id for falconer in result.items)
+        if result.next_cursor is None:
+            break
+        page = PageParams(limit=2, cursor=decode_cursor(result.next_cursor))
+
+    assert sorted(seen) == sorted(falconer.id for falconer in created)
@@ -47,6 +47,21 @@ async def test_get_feeding(
     assert response.status_code == status.HTTP_200_OK
     response_data = response.json()
     assert response_data["id"] == str(feeding.id)
+    assert response_data["start_weight"] is None
+
+
+@pytest.mark.anyio
+async def test_get_feeding_include_weights(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    feeding: FeedingRead,
+) -> None:
+    url = fastapi_app.url_path_for("get_feeding", feeding_id=feeding.id)
+    response = await client.get(url, params={"include": "start_weight,end_weight"})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    response_data = response.json()
+    assert response_data["start_weight"]["id"] == str(feeding.start_weight_id)
+    assert response_data["end_weight"]["id"] == str(feeding.end_weight_id)
 
 
 @pytest.mark.anyio
@@ -71,6 +86,7 @@ async def test_bulk_create_feeding(
     url = fastapi_app.url_path_for("create_bulk_feeding")
     response = await client.post(url, json=jsonable_encoder(feedings))
     assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert response.json()["count"] == 10
 
 
 @pytest.mark.anyio
@@ -82,7 +98,7 @@ async def test_filter_feeding_by_date(
     url = fastapi_app.url_path_for("filter_feeding_by_date", bird_id=feeding.bird_id)
     response = await client.get(url, params={"days": 31})
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()["items"]
     assert len(response_data) == 1
     assert response_data[0]["id"] == str(feeding.id)
     assert response_data[0]["bird_id"] == str(feeding.bird_id)
@@ -97,5 +113,5 @@ async def test_filter_feeding_by_date_passed(
     url = fastapi_app.url_path_for("filter_feeding_by_date", bird_id=feeding.bird_id)
     response = await client.get(url, params={"days": 1})
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()["items"]
     assert len(response_data) == 0
@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from mm_api.db.dao.feeding_dao import FeedingDAO
+from mm_api.db.dao.training_dao import TrainingDAO
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.schema.bird import BirdRead
+from mm_api.schema.feeding_session import (
+    FeedingSessionCreate,
+    SessionFeeding,
+    SessionHunt,
+    SessionTraining,
+    SessionWeight,
+)
+
+
+def create_feeding_session(bird: BirdRead) -> FeedingSessionCreate:
+    start = datetime.datetime.now() - datetime.timedelta(hours=2)
+    end = start + datetime.timedelta(hours=1)
+    return FeedingSessionCreate(
+        bird_id=bird.id,
+        start_weight=SessionWeight(weight=950, w_time=start),
+        end_weight=SessionWeight(weight=1040, w_time=end),
+        feeding=SessionFeeding(f_time=end, food_type="quail", amount=90),
+        training=SessionTraining(
+            start_time=start,
+            end_time=end,
+            training_type="creance",
+            notes="",
+            performance=7,
+        ),
+    )
+
+
+@pytest.mark.anyio
+async def test_create_feeding_session(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    url = fastapi_app.url_path_for("create_feeding_session")
+    feeding_session = create_feeding_session(bird)
+    response = await client.post(url, json=jsonable_encoder(feeding_session))
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    response_data = response.json()
+    assert response_data["hunt"] is None
+
+    start_weight_id = response_data["start_weight"]["id"]
+    end_weight_id = response_data["end_weight"]["id"]
+    feeding = await FeedingDAO(dbsession).get_by_id(response_data["feeding"]["id"])
+    assert str(feeding.start_weight_id) == start_weight_id
+    assert str(feeding.end_weight_id) == end_weight_id
+    training = await TrainingDAO(dbsession).get_by_id(response_data["training"]["id"])
+    assert str(training.start_weight_id) == start_weight_id
+    end_weight = await WeightDAO(dbsession).get_by_id(end_weight_id)
+    assert end_weight.weight == 1040
+
+
+@pytest.mark.anyio
+async def test_create_feeding_session_with_hunt(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    url = fastapi_app.url_path_for("create_feeding_session")
+    feeding_session = create_feeding_session(bird)
+    feeding_session.training = None
+    feeding_session.hunt = SessionHunt(
+        start_time=feeding_session.start_weight.w_time,
+        end_time=feeding_session.end_weight.w_time,
+        prey_type="rabbit",
+        prey_count=2,
+    )
+    response = await client.post(url, json=jsonable_encoder(feeding_session))
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    response_data = response.json()
+    assert response_data["training"] is None
+    assert response_data["hunt"]["prey_count"] == 2
+    assert response_data["hunt"]["end_weight_id"] == response_data["end_weight"]["id"]
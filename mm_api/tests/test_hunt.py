@@ -76,6 +76,7 @@ async def test_bulk_create_hunt(
     url = fastapi_app.url_path_for("create_bulk_hunt")
     response = await client.post(url, json=jsonable_encoder(hunts))
     assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert response.json()["count"] == 10
 
 
 @pytest.mark.anyio
@@ -87,7 +88,7 @@ async def test_filter_hunt_by_date(
     url = fastapi_app.url_path_for("filter_hunt_by_date", bird_id=hunt.bird_id)
     response = await client.get(url, params={"days": 31})
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()["items"]
     assert len(response_data) == 1
     assert response_data[0]["id"] == str(hunt.id)
     assert response_data[0]["bird_id"] == str(hunt.bird_id)
@@ -102,5 +103,5 @@ async def test_filter_hunt_by_date_passed(
     url = fastapi_app.url_path_for("filter_hunt_by_date", bird_id=hunt.bird_id)
     response = await client.get(url, params={"days": 1})
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()["items"]
     assert len(response_data) == 0
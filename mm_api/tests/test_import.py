@@ -0,0 +1,187 @@
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from mm_api.schema.bird import BirdRead
+from mm_api.settings import settings
+
+
+async def _upload(text: str, size: int = 7) -> AsyncIterator[bytes]:
+    body = text.encode()
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _weights(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> List[float]:
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=str(bird.id))
+    response = await client.get(url, params={"days": 30})
+    return [weight["weight"] for weight in response.json()["items"]]
+
+
+@pytest.mark.anyio
+async def test_import_weights_csv(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "import_chunk_size", 2)
+    day = (datetime.now() - timedelta(days=1)).replace(microsecond=0)
+    name = f"  {bird.name.upper()} "
+    upload = "\r\n".join(
+        [
+            "\ufeffbird_name,bird_id,weight,w_time",
+            f"{name},,901,{day.isoformat()}",
+            f",{bird.id},902,{(day - timedelta(hours=1)).isoformat()}",
+            "",
+            f"{name},,heavy,{day.isoformat()}",
+            f"Nobody,,903,{day.isoformat()}",
+            f",{uuid4()},904,{day.isoformat()}",
+            f"{name},,905",
+            f'"{name}",,906,{(day - timedelta(hours=2)).isoformat()}',
+        ],
+    )
+    response = await authed_client.post(
+        fastapi_app.url_path_for("import_table", table="weights"),
+        params={"format": "csv"},
+        content=_upload(upload),
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    report = response.json()
+    assert report["imported"] == 3
+    assert report["failed"] == 4
+    assert [error["line"] for error in report["errors"]] == [5, 6, 7, 8]
+    assert report["errors"][0]["error"].startswith("weight: ")
+    assert "No bird named 'Nobody'" in report["errors"][1]["error"]
+    assert report["errors"][3]["error"] == "Expected 4 fields, got 3"
+
+    weights = await _weights(fastapi_app, authed_client, bird)
+    assert weights == [901, 902, 906]
+
+
+@pytest.mark.anyio
+async def test_import_hunts_ndjson(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    start = datetime(2024, 3, 1, 9)
+    hunt = {
+        "bird_name": bird.name,
+        "prey_type": "rabbit",
+        "prey_count": 2,
+        "notes": "windy\nlong flight",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat(),
+    }
+    lines = [json.dumps(hunt), "", "[1, 2]", "{not json", json.dumps(hunt)]
+    response = await authed_client.post(
+        fastapi_app.url_path_for("import_table", table="hunts"),
+        params={"format": "ndjson"},
+        content=_upload("\n".join(lines)),
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    report = response.json()
+    assert report["imported"] == 2
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert report["errors"][0]["error"] == "Line is not a JSON object"
+
+
+@pytest.mark.anyio
+async def test_import_csv_quoted_newlines(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    upload = (
+        "bird_id,start_time,end_time,training_type,notes,performance\n"
+        f'{bird.id},2024-03-01T09:00,2024-03-01T10:00,lure,"first\nsecond",4\n'
+        f"{bird.id},2024-03-02T09:00,2024-03-02T10:00,lure,,4\n"
+        f'{bird.id},2024-03-03T09:00,2024-03-03T10:00,lure,"""ok""",x\n'
+        f'{bird.id},2024-03-04T09:00,2024-03-04T10:00,lure,"open,4\n'
+    )
+    response = await authed_client.post(
+        fastapi_app.url_path_for("import_table", table="trainings"),
+        params={"format": "csv"},
+        content=_upload(upload),
+    )
+    report = response.json()
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [4, 5, 6]
+    assert report["errors"][0]["error"].startswith("notes: ")
+    assert report["errors"][1]["error"].startswith("performance: ")
+    assert report["errors"][2]["error"].startswith("Invalid CSV: ")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("copy", [False, True])
+async def test_import_rejected_chunk(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+    copy: bool,
+) -> None:
+    monkeypatch.setattr(settings, "import_chunk_size", 2)
+    if copy:
+        # Full chunks are streamed with COPY inside their savepoint.
+        monkeypatch.setattr(settings, "bulk_copy_threshold", 2)
+    day = datetime.now() - timedelta(days=1)
+    duplicate = uuid4()
+    rows = [
+        {"id": str(uuid4()), "weight": 901},
+        {"id": str(duplicate), "weight": 902},
+        {"id": str(duplicate), "weight": 903},
+        {"id": str(uuid4()), "weight": 904},
+        {"id": str(uuid4()), "weight": 905},
+    ]
+    upload = "\n".join(
+        json.dumps({"bird_id": str(bird.id), "w_time": day.isoformat(), **row})
+        for row in rows
+    )
+    response = await authed_client.post(
+        fastapi_app.url_path_for("import_table", table="weights"),
+        params={"format": "ndjson"},
+        content=_upload(upload, 64),
+    )
+    report = response.json()
+    assert report["imported"] == 3
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert report["errors"][0]["error"].startswith(
+        "Chunk rejected by the database: duplicate key value",
+    )
+
+    weights = await _weights(fastapi_app, authed_client, bird)
+    assert sorted(weights) == [901, 902, 905]
+
+
+@pytest.mark.anyio
+async def test_import_stops_at_long_line(
+    fastapi_app: FastAPI,
+    authed_client: AsyncClient,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "import_max_record_length", 100)
+    monkeypatch.setattr(settings, "import_max_errors", 1)
+    row = {"bird_id": str(bird.id), "weight": 900, "w_time": "2024-03-01T09:00"}
+    lines = ["[]", "[]", json.dumps(row), "x" * 500, json.dumps(row)]
+    response = await authed_client.post(
+        fastapi_app.url_path_for("import_table", table="weights"),
+        params={"format": "ndjson"},
+        content=_upload("\n".join(lines), 64),
+    )
+    report = response.json()
+    assert report["imported"] == 1
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [1]
@@ -0,0 +1,51 @@
+from typing import Any, Type
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dao.feeding_dao import FeedingDAO
+from mm_api.db.dao.hunt_dao import HuntDAO
+from mm_api.db.dao.training_dao import TrainingDAO
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.schema.bird import BirdRead
+from mm_api.tests.utils.statements import capture_statements
+
+
+async def explain(session: AsyncSession, statement: str, parameters: Any) -> str:
+    """
+    Get query plan for a statement.
+
+    Sequential scans are disabled so the planner picks an index whenever
+    one can serve the query, even on the tiny test tables.
+
+    :param session: current session.
+    :param statement: SQL statement.
+    :param parameters: statement parameters.
+    :return: plan as text.
+    """
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    connection = await session.connection()
+    plan = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in plan.fetchall())
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "dao_class",
+    [WeightDAO, FeedingDAO, HuntDAO, TrainingDAO],
+)
+async def test_filter_by_bird_id_and_time_uses_index(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+    dao_class: Type[Any],
+) -> None:
+    dao = dao_class(dbsession)
+    with capture_statements(dbsession) as statements:
+        await dao.filter_by_bird_id_and_time(str(bird.id), 30)
+
+    assert statements
+    for statement, parameters in statements:
+        plan = await explain(dbsession, statement, parameters)
+        assert "Index" in plan, plan
+        assert "Seq Scan" not in plan, plan
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import jwt
+import pytest
+
+from mm_api.services.jwks import KeyStore
+from mm_api.settings import settings
+from mm_api.tests.utils.tokens import create_rsa_key
+
+
+@pytest.fixture(autouse=True)
+def _jwks_cache_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "jwks_cache_file", tmp_path / "jwks.json")
+
+
+class FakeJWKS(KeyStore):
+    """Key store serving a JWKS document from memory."""
+
+    def __init__(self, jwks: Dict[str, Any]) -> None:
+        super().__init__("http://jwks.test", "key")
+        self.document = jwks
+        self.fetches = 0
+
+    async def fetch(self) -> Dict[str, Any]:
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return self.document
+
+
+@pytest.mark.anyio
+async def test_key_lookup_by_kid() -> None:
+    first, first_jwk = create_rsa_key("first")
+    second, second_jwk = create_rsa_key("second")
+    store = FakeJWKS({"keys": [first_jwk, second_jwk]})
+    store.load(store.document)
+
+    token = jwt.encode(
+        {"sub": "user"}, second, algorithm="RS256", headers={"kid": "second"}
+    )
+    key = await store.get_key(jwt.get_unverified_header(token)["kid"])
+    assert jwt.decode(token, key, algorithms=["RS256"])["sub"] == "user"
+    # Tokens without `kid` are ambiguous with two keys.
+    assert await store.get_key(None) is None
+    assert store.fetches == 0
+
+
+@pytest.mark.anyio
+async def test_unknown_kid_refetches_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "jwks_min_refresh_interval", 60)
+    _, old_jwk = create_rsa_key("old")
+    _, new_jwk = create_rsa_key("new")
+    store = FakeJWKS({"keys": [old_jwk]})
+    store.load(store.document)
+
+    # Keys rotated, every concurrent request waits for one fetch.
+    store.document = {"keys": [old_jwk, new_jwk]}
+    keys = await asyncio.gather(*[store.get_key("new") for _ in range(20)])
+    assert all(key is not None for key in keys)
+    assert store.fetches == 1
+
+    # Forged `kid`s don't refetch again before the minimum interval.
+    assert await store.get_key("forged") is None
+    assert store.fetches == 1
+
+
+@pytest.mark.anyio
+async def test_fetched_keys_survive_restart() -> None:
+    _, jwk = create_rsa_key("cached")
+    store = FakeJWKS({"keys": [jwk]})
+    store.load_files()
+    assert store.keys == {}
+    assert await store.get_key("cached") is not None
+
+    restarted = FakeJWKS({})
+    restarted.load_files()
+    assert await restarted.get_key("cached") is not None
+    assert restarted.fetches == 0
+
+
+@pytest.mark.anyio
+async def test_cached_jwks_must_be_private(monkeypatch: pytest.MonkeyPatch) -> None:
+    _, jwk = create_rsa_key("cached")
+    store = FakeJWKS({"keys": [jwk]})
+    assert await store.get_key("cached") is not None
+    cache_file = settings.jwks_cache_file
+    assert cache_file is not None
+    assert cache_file.stat().st_mode & 0o777 == 0o600
+
+    # A file others could have written is not trusted.
+    cache_file.chmod(0o622)
+    restarted = FakeJWKS({})
+    restarted.load_files()
+    assert restarted.keys == {}
+
+    # Neither is a link to a private file.
+    cache_file.chmod(0o600)
+    link = cache_file.with_name("link.json")
+    link.symlink_to(cache_file)
+    monkeypatch.setattr(settings, "jwks_cache_file", link)
+    restarted.load_files()
+    assert restarted.keys == {}
+
+
+@pytest.mark.anyio
+async def test_local_jwks_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _, jwk = create_rsa_key("local")
+    jwks_file = tmp_path / "local.json"
+    jwks_file.write_text(json.dumps({"keys": [jwk]}))
+    monkeypatch.setattr(settings, "jwks_file", jwks_file)
+
+    store = FakeJWKS({"keys": []})
+    store.load_files()
+    assert await store.get_key("local") is not None
+    # Offline, unknown keys are never fetched.
+    assert await store.get_key("other") is None
+    assert store.fetches == 0
@@ -1,8 +1,12 @@
+import os
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 from starlette import status
 
+from mm_api.db.routing import ROUTED_SESSIONS
+
 
 @pytest.mark.anyio
 async def test_health(client: AsyncClient, fastapi_app: FastAPI) -> None:
@@ -15,3 +19,20 @@ async def test_health(client: AsyncClient, fastapi_app: FastAPI) -> None:
     url = fastapi_app.url_path_for("health_check")
     response = await client.get(url)
     assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_metrics(client: AsyncClient, fastapi_app: FastAPI) -> None:
+    """
+    Checks that metrics are exposed in the Prometheus format.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    """
+    ROUTED_SESSIONS.inc(0, target="primary", reason="write")
+    url = fastapi_app.url_path_for("get_metrics")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert "# TYPE mm_api_db_routed_sessions_total counter" in response.text
+    sample = f'reason="write",target="primary",pid="{os.getpid()}"}}'
+    assert sample in response.text
@@ -0,0 +1,196 @@
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.models.feeding_model import FeedingModel
+from mm_api.db.models.weight_model import WeightIdModel, WeightModel
+from mm_api.db.partitions import (
+    add_months,
+    create_partitions,
+    existing_partitions,
+    iter_months,
+    months_of,
+    partition_name,
+)
+from mm_api.schema.bird import BirdRead
+from mm_api.schema.weight import WeightCreate
+from mm_api.tests.utils.statements import capture_statements
+
+
+def test_add_months() -> None:
+    assert add_months(date(2024, 1, 31), 1) == date(2024, 2, 1)
+    assert add_months(date(2024, 12, 5), 1) == date(2025, 1, 1)
+    assert add_months(date(2024, 1, 5), -1) == date(2023, 12, 1)
+
+
+def test_iter_months() -> None:
+    months = list(iter_months(date(2024, 11, 20), date(2025, 2, 1)))
+    assert months == [
+        date(2024, 11, 1),
+        date(2024, 12, 1),
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+    ]
+
+
+def test_partition_name() -> None:
+    assert partition_name("weights", date(2024, 3, 15)) == "weights_2024_03"
+
+
+def test_months_of() -> None:
+    times = [datetime(2024, 3, 15), None, datetime(2024, 1, 2), datetime(2024, 3, 1)]
+    assert months_of(times) == [date(2024, 1, 1), date(2024, 3, 1)]
+
+
+async def _count(dbsession: AsyncSession, table: str) -> int:
+    return await dbsession.scalar(text(f"SELECT count(*) FROM {table}"))  # noqa: S608
+
+
+@pytest.mark.anyio
+async def test_partition_moves_default_rows(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    month = add_months(date.today(), 24)
+    weight_id = uuid4()
+    await dbsession.execute(
+        insert(WeightModel),
+        [
+            {
+                "id": weight_id,
+                "bird_id": bird.id,
+                "weight": 1000,
+                "w_time": datetime.combine(month, datetime.min.time()),
+            },
+        ],
+    )
+    name = partition_name("weights", month)
+    assert await _count(dbsession, "weights_default") == 1
+
+    connection = await dbsession.connection()
+    assert await create_partitions(connection, "weights", [month]) == [name]
+    assert await create_partitions(connection, "weights", [month]) == []
+
+    assert await _count(dbsession, name) == 1
+    assert await _count(dbsession, "weights_default") == 0
+    assert "weights_default" in await existing_partitions(connection, "weights")
+    ids = await dbsession.scalars(select(WeightIdModel.id))
+    assert ids.all() == [weight_id]
+
+
+@pytest.mark.anyio
+async def test_bulk_leaves_partitions_alone(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    old = datetime(2001, 5, 17, 8)
+    connection = await dbsession.connection()
+    partitions = await existing_partitions(connection, "weights")
+    await WeightDAO(dbsession).bulk_create(
+        [WeightCreate(bird_id=bird.id, weight=1000, w_time=old)],
+    )
+
+    assert await existing_partitions(connection, "weights") == partitions
+    assert await _count(dbsession, "weights_default") == 1
+    name = partition_name("weights", old.date())
+    assert await create_partitions(connection, "weights", [old.date()]) == [name]
+    assert await _count(dbsession, name) == 1
+
+
+@pytest.mark.anyio
+async def test_weight_ids_are_unique(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    weight_id = uuid4()
+    row = {"id": weight_id, "bird_id": bird.id, "weight": 1000}
+    await dbsession.execute(
+        insert(WeightModel),
+        [{**row, "w_time": datetime(2024, 1, 1)}],
+    )
+
+    with pytest.raises(IntegrityError):
+        async with dbsession.begin_nested():
+            await dbsession.execute(
+                insert(WeightModel),
+                [{**row, "w_time": datetime(2024, 2, 1)}],
+            )
+    count = select(func.count()).select_from(WeightModel)
+    assert await dbsession.scalar(count.where(WeightModel.id == weight_id)) == 1
+
+
+@pytest.mark.anyio
+async def test_weight_references_are_checked(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    with pytest.raises(IntegrityError):
+        async with dbsession.begin_nested():
+            await dbsession.execute(
+                insert(FeedingModel),
+                [
+                    {
+                        "bird_id": bird.id,
+                        "food_type": "quail",
+                        "amount": 50,
+                        "start_weight_id": uuid4(),
+                    },
+                ],
+            )
+
+
+@pytest.mark.anyio
+async def test_weight_window_prunes_old_partitions(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    today = date.today()
+    first = add_months(today, -6)
+    partitions = await create_partitions(
+        await dbsession.connection(),
+        "weights",
+        iter_months(first, today),
+    )
+    now = datetime.now()
+    await dbsession.execute(
+        insert(WeightModel),
+        [
+            {
+                "id": uuid4(),
+                "bird_id": bird.id,
+                "weight": 1000,
+                "w_time": now - timedelta(days=days),
+            }
+            for days in range(0, 180, 5)
+        ],
+    )
+
+    dao = WeightDAO(dbsession)
+    with capture_statements(dbsession) as statements:
+        await dao.filter_by_bird_id_and_time(str(bird.id), 30)
+
+    ((statement, parameters),) = statements
+    connection = await dbsession.connection()
+    plan = await connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) {statement}",
+        parameters,
+    )
+    lines = [row[0] for row in plan.fetchall()]
+    # Scans of the window itself, the InitPlan looking up the latest
+    # weigh-in reads a single index entry per partition.
+    scanned = {
+        name
+        for name in partitions
+        for line, condition in zip(lines, lines[1:])
+        if f" on {name} " in line
+        and "w_time >=" in condition
+        and "never executed" not in line
+    }
+    assert partition_name("weights", today) in scanned, lines
+    assert partition_name("weights", first) not in scanned, lines
+    assert partition_name("weights", add_months(today, -3)) not in scanned, lines
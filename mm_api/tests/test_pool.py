@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from mm_api.db.engine import (
+    POOL_CHECKED_OUT,
+    POOL_CHECKOUTS,
+    POOL_TIMEOUTS,
+    create_engine,
+)
+from mm_api.settings import settings
+
+
+def test_pool_options_from_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert settings.db_pool_options["pool_size"] == 5
+    monkeypatch.setattr(settings, "db_connection_budget", 40)
+    monkeypatch.setattr(settings, "workers_count", 4)
+    options = settings.db_pool_options
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 0
+
+    monkeypatch.setattr(settings, "db_pool_size", 8)
+    monkeypatch.setattr(settings, "db_max_overflow", 2)
+    options = settings.db_pool_options
+    assert options["pool_size"] == 8
+    assert options["max_overflow"] == 2
+
+
+@pytest.mark.anyio
+async def test_pool_metrics(
+    _engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout", 0.1)
+    engine = create_engine(str(settings.db_url_test), "test_pool")
+    checkouts = POOL_CHECKOUTS.get(pool="test_pool")
+    try:
+        async with engine.connect():
+            assert POOL_CHECKED_OUT.get(pool="test_pool") == 1
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass  # noqa: WPS420
+        assert POOL_CHECKED_OUT.get(pool="test_pool") == 0
+        assert POOL_CHECKOUTS.get(pool="test_pool") == checkouts + 1
+        assert POOL_TIMEOUTS.get(pool="test_pool") == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from starlette.requests import Request
+
+from mm_api.db.dependencies import get_db_read_session, get_db_session
+from mm_api.db.models import FalconerModel
+from mm_api.db.routing import SessionRouter
+
+
+def make_request(_engine: AsyncEngine, method: str) -> Request:
+    session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+    app = SimpleNamespace(
+        state=SimpleNamespace(db_router=SessionRouter(session_factory)),
+    )
+    return Request({"type": "http", "method": method, "headers": [], "app": app})
+
+
+@pytest.mark.anyio
+async def test_read_session_is_read_only(
+    _engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sessions = get_db_read_session(make_request(_engine, "GET"))
+    session = await sessions.__anext__()
+    commit = AsyncMock()
+    monkeypatch.setattr(session, "commit", commit)
+    assert await session.scalar(text("SELECT 1")) == 1
+    with pytest.raises(DBAPIError, match="read-only transaction"):
+        await session.execute(
+            insert(FalconerModel).values(
+                id="read_only",
+                name="name",
+                permit_class="general",
+                permit_number="1",
+            ),
+        )
+    with pytest.raises(StopAsyncIteration):
+        await sessions.__anext__()
+    commit.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_write_session_commits(_engine: AsyncEngine) -> None:
+    sessions = get_db_session(make_request(_engine, "POST"))
+    session = await sessions.__anext__()
+    assert await session.scalar(text("SHOW transaction_read_only")) == "off"
+    with pytest.raises(StopAsyncIteration):
+        await sessions.__anext__()
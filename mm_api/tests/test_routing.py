@@ -0,0 +1,91 @@
+from typing import Any, Dict, Optional
+
+import jwt
+import pytest
+from redis.asyncio import ConnectionPool
+from starlette.requests import Request
+
+from mm_api.db.routing import ROUTED_SESSIONS, SessionRouter, on_replica
+
+
+def make_request(method: str, falconer_id: Optional[str] = None) -> Request:
+    headers = []
+    if falconer_id is not None:
+        token = jwt.encode({"sub": falconer_id}, "secret", algorithm="HS256")
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "headers": headers,
+            "client": ("10.0.0.1", 1234),
+        },
+    )
+
+
+class FakeSession(str):
+    """Session stand-in named after its database."""
+
+    def __init__(self, name: str) -> None:
+        self.info: Dict[str, Any] = {}
+
+
+def factory(name: str) -> Any:
+    return lambda: FakeSession(name)
+
+
+@pytest.fixture
+def session_router(fake_redis_pool: ConnectionPool) -> SessionRouter:
+    return SessionRouter(
+        factory("primary"),
+        [factory("replica0"), factory("replica1")],
+        fake_redis_pool,
+    )
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_replicas(session_router: SessionRouter) -> None:
+    first = await session_router.session_for(make_request("GET", "f1"))
+    second = await session_router.session_for(make_request("GET", "f1"))
+    assert {first, second} == {"replica0", "replica1"}
+    assert on_replica(first) and on_replica(second)
+    write = await session_router.session_for(make_request("POST", "f1"))
+    assert not on_replica(write)
+
+
+@pytest.mark.anyio
+async def test_reads_after_write_are_sticky(session_router: SessionRouter) -> None:
+    sticky = ROUTED_SESSIONS.get(target="primary", reason="sticky")
+    assert await session_router.session_for(make_request("POST", "f1")) == "primary"
+    assert await session_router.session_for(make_request("GET", "f1")) == "primary"
+    assert ROUTED_SESSIONS.get(target="primary", reason="sticky") == sticky + 1
+    # Other falconers keep reading from replicas.
+    assert await session_router.session_for(make_request("GET", "f2")) != "primary"
+
+
+@pytest.mark.anyio
+async def test_read_only_posts_are_not_sticky(session_router: SessionRouter) -> None:
+    request = make_request("POST", "f1")
+    assert on_replica(await session_router.session_for(request, read_only=True))
+    assert await session_router.session_for(make_request("GET", "f1")) != "primary"
+
+
+@pytest.mark.anyio
+async def test_anonymous_writes_are_sticky(session_router: SessionRouter) -> None:
+    assert await session_router.session_for(make_request("DELETE")) == "primary"
+    assert await session_router.session_for(make_request("GET")) == "primary"
+
+
+@pytest.mark.anyio
+async def test_lagging_replicas_are_skipped(session_router: SessionRouter) -> None:
+    session_router.lag = {0: 60}
+    for _ in range(3):
+        assert await session_router.session_for(make_request("GET")) == "replica1"
+    session_router.lag = {0: 60, 1: float("inf")}
+    assert await session_router.session_for(make_request("GET")) == "primary"
+
+
+@pytest.mark.anyio
+async def test_without_replicas() -> None:
+    session_router = SessionRouter(factory("primary"))
+    assert await session_router.session_for(make_request("GET")) == "primary"
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.models import FeedingModel, HuntModel, TrainingModel, WeightModel
+from mm_api.seed import generate_owners, generate_series, load_owners, load_series
+
+START = datetime(2023, 9, 1, 12, 0, 0)
+
+
+def test_generation_is_deterministic() -> None:
+    first = generate_owners(7, 2, 3)
+    second = generate_owners(7, 2, 3)
+    assert first == second
+    assert generate_owners(8, 2, 3).birds["id"] != first.birds["id"]
+
+    birds = first.birds
+    series = generate_series(7, 0, birds["id"], birds["gender"], 10, START)
+    assert series == generate_series(7, 0, birds["id"], birds["gender"], 10, START)
+    assert len(series.weights["id"]) == 2 * 6 * 10
+    assert len(series.feedings["id"]) == 6 * 10
+    assert len(series.trainings["id"]) + len(series.hunts["id"]) == 6 * 10
+
+
+@pytest.mark.anyio
+async def test_load(dbsession: AsyncSession) -> None:
+    owners = generate_owners(7, 1, 2)
+    birds = owners.birds
+    series = generate_series(7, 0, birds["id"], birds["gender"], 5, START)
+    await load_owners(dbsession, owners)
+    assert await load_series(dbsession, series) == 2 * 10 + 10 + 10
+
+    for model, expected in (
+        (WeightModel, 20),
+        (FeedingModel, 10),
+        (TrainingModel, len(series.trainings["id"])),
+        (HuntModel, len(series.hunts["id"])),
+    ):
+        count = await dbsession.scalar(select(func.count()).select_from(model))
+        assert count == expected
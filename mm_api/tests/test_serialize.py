@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mm_api.db.dao.feeding_dao import FeedingDAO
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.pagination import PageParams
+from mm_api.schema.feeding import FeedingRead
+from mm_api.schema.weight import WeightRead
+
+
+@pytest.mark.anyio
+async def test_json_pages_match_model_pages(
+    dbsession: AsyncSession,
+    weight: WeightRead,
+    end_weight: WeightRead,
+    feeding: FeedingRead,
+) -> None:
+    weight_dao = WeightDAO(dbsession)
+    for page in (PageParams(limit=1), PageParams(limit=10)):
+        expected = await weight_dao.filter_by_bird_id_and_time(
+            str(weight.bird_id), 7, page
+        )
+        body = await weight_dao.filter_json_by_bird_id_and_time(
+            str(weight.bird_id),
+            7,
+            page,
+        )
+        assert body == expected.model_dump_json().encode()
+
+    feeding_dao = FeedingDAO(dbsession)
+    for include in ((), ("end_weight", "start_weight")):
+        expected = await feeding_dao.filter_by_bird_id_and_time(
+            str(feeding.bird_id),
+            None,
+            PageParams(),
+            include,
+        )
+        body = await feeding_dao.filter_json_by_bird_id_and_time(
+            str(feeding.bird_id),
+            None,
+            PageParams(),
+            include,
+        )
+        assert body == expected.model_dump_json().encode()
+        assert len(expected.items) == 1
@@ -0,0 +1,82 @@
+import time
+
+import jwt
+import pytest
+from redis.asyncio import ConnectionPool
+
+from mm_api.services.jwks import key_store
+from mm_api.services.token_cache import TOKEN_CACHE_REQUESTS, TokenCache, token_cache
+from mm_api.settings import settings
+from mm_api.tests.utils.tokens import create_rsa_key
+from mm_api.web.utils.token import verify_token
+
+
+@pytest.fixture
+def signing_key(monkeypatch: pytest.MonkeyPatch) -> object:
+    private_key, jwk = create_rsa_key("test")
+    monkeypatch.setattr(key_store, "keys", {})
+    key_store.load({"keys": [jwk]})
+    token_cache.clear()
+    yield private_key
+    token_cache.clear()
+
+
+def _token(private_key: object, exp: float) -> str:
+    return jwt.encode(
+        {"sub": "user", "exp": int(exp)},
+        private_key,  # type: ignore
+        algorithm="RS256",
+        headers={"kid": "test"},
+    )
+
+
+@pytest.mark.anyio
+async def test_verified_token_is_cached(signing_key: object) -> None:
+    misses = TOKEN_CACHE_REQUESTS.get(result="miss")
+    hits = TOKEN_CACHE_REQUESTS.get(result="hit")
+    token = _token(signing_key, time.time() + 60)
+
+    for _ in range(3):
+        assert (await verify_token(token))["sub"] == "user"
+    assert TOKEN_CACHE_REQUESTS.get(result="miss") == misses + 1
+    assert TOKEN_CACHE_REQUESTS.get(result="hit") == hits + 2
+
+    # Invalid and expired tokens are verified every time.
+    expired = _token(signing_key, time.time() - 60)
+    for _ in range(2):
+        assert await verify_token(expired) == {}
+        assert await verify_token(token[:-4] + "AAAA") == {}
+    assert TOKEN_CACHE_REQUESTS.get(result="miss") == misses + 5
+
+
+@pytest.mark.anyio
+async def test_shared_token_cache(
+    signing_key: object,
+    fake_redis_pool: ConnectionPool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "token_cache_shared", True)
+    shared_hits = TOKEN_CACHE_REQUESTS.get(result="shared_hit")
+    token = _token(signing_key, time.time() + 60)
+
+    assert (await verify_token(token, fake_redis_pool))["sub"] == "user"
+    # Another worker knows nothing about the token.
+    token_cache.clear()
+    assert (await verify_token(token, fake_redis_pool))["sub"] == "user"
+    assert TOKEN_CACHE_REQUESTS.get(result="shared_hit") == shared_hits + 1
+
+
+def test_lru_eviction_and_expiry() -> None:
+    cache = TokenCache(maxsize=2)
+    future = time.time() + 60
+    cache.put("a", {"exp": future})
+    cache.put("b", {"exp": future})
+    assert cache.get("a") is not None
+    cache.put("c", {"exp": future})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.put("old", {"exp": time.time() - settings.jwt_leeway - 1})
+    assert cache.get("old") is None
+    cache.put("forever", {"sub": "user"})
+    assert cache.get("forever") is None
@@ -1,3 +1,6 @@
+import base64
+import datetime
+import json
 import uuid
 
 import pytest
@@ -5,12 +8,18 @@ from faker import Faker
 from fastapi import FastAPI
 from fastapi.encoders import jsonable_encoder
 from httpx import AsyncClient
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from mm_api.db.bulk import bulk_insert
+from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.models import WeightModel
 from mm_api.schema.bird import BirdRead
 from mm_api.schema.falconer import FalconerRead
 from mm_api.schema.weight import WeightCreate, WeightRead
+from mm_api.services.weight_analytics import WeightSeries, analyze
+from mm_api.settings import settings
 
 fake = Faker()
 
@@ -52,6 +61,67 @@ async def test_bulk_create_weight(
     url = fastapi_app.url_path_for("create_bulk_weight")
     response = await client.post(url, json=jsonable_encoder(weights))
     assert response.status_code == status.HTTP_201_CREATED, response.text
+    response_data = response.json()
+    assert response_data["count"] == 10
+    assert response_data["ids"] == [str(weight.id) for weight in weights]
+
+
+@pytest.mark.anyio
+async def test_bulk_create_weight_copy(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "bulk_copy_threshold", 5)
+    weights = [
+        WeightCreate(bird_id=bird.id, weight=100, w_time=fake.date_time_this_year())
+        for _ in range(10)
+    ]
+    url = fastapi_app.url_path_for("create_bulk_weight")
+    response = await client.post(url, json=jsonable_encoder(weights))
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    response_data = response.json()
+    assert response_data["count"] == 10
+
+    dao = WeightDAO(dbsession)
+    for uid in response_data["ids"]:
+        stored = await dao.get_by_id(uid)
+        assert stored.bird_id == bird.id
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_copy_in_savepoint(
+    dbsession: AsyncSession,
+    bird: BirdRead,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "bulk_copy_threshold", 2)
+    rows = [
+        {
+            "bird_id": bird.id,
+            "weight": 100 + day,
+            "w_time": datetime.datetime(2024, 3, day, 9),
+        }
+        for day in range(1, 4)
+    ]
+    savepoint = await dbsession.begin_nested()
+    kept = await bulk_insert(dbsession, WeightModel, rows)
+    await savepoint.commit()
+
+    savepoint = await dbsession.begin_nested()
+    rolled_back = await bulk_insert(dbsession, WeightModel, rows)
+    assert await dbsession.scalar(
+        select(func.count()).where(WeightModel.id.in_(rolled_back)),
+    ) == len(rows)
+    await savepoint.rollback()
+
+    dao = WeightDAO(dbsession)
+    assert [(await dao.get_by_id(uid)).weight for uid in kept] == [101, 102, 103]
+    assert not await dbsession.scalar(
+        select(func.count()).where(WeightModel.id.in_(rolled_back)),
+    )
 
 
 @pytest.mark.anyio
@@ -76,12 +146,68 @@ async def test_filter_weight_by_date(
     url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=weight.bird_id)
     response = await client.get(url, params={"days": 31})
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()["items"]
     assert len(response_data) == 1
     assert response_data[0]["id"] == str(weight.id)
     assert response_data[0]["bird_id"] == str(weight.bird_id)
 
 
+@pytest.mark.anyio
+async def test_filter_weight_by_date_pages(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    now = datetime.datetime.now()
+    weights = [
+        WeightCreate(
+            id=uuid.uuid4(),
+            bird_id=bird.id,
+            weight=100 + day,
+            w_time=now - datetime.timedelta(days=day),
+        )
+        for day in range(5)
+    ]
+    url = fastapi_app.url_path_for("create_bulk_weight")
+    response = await client.post(url, json=jsonable_encoder(weights))
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=bird.id)
+    seen = []
+    params = {"days": 31, "limit": 2}
+    while True:
+        response = await client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        response_data = response.json()
+        assert len(response_data["items"]) <= 2
+        seen.extend(item["id"] for item in response_data["items"])
+        if response_data["next_cursor"] is None:
+            break
+        params["cursor"] = response_data["next_cursor"]
+
+    assert seen == [str(weight.id) for weight in weights]
+
+
+@pytest.mark.anyio
+async def test_filter_weight_by_date_bad_cursor(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    weight: WeightRead,
+) -> None:
+    url = fastapi_app.url_path_for("filter_weight_by_date", bird_id=weight.bird_id)
+    response = await client.get(url, params={"days": 31, "cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    for raw in (
+        ["2024-01-01T00:00:00", "x"],
+        ["2024-01-01T00:00:00", None],
+        ["2024-01-01T00:00:00+02:00", str(weight.id)],
+    ):
+        cursor = base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+        response = await client.get(url, params={"days": 31, "cursor": cursor})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, raw
+
+
 # @pytest.mark.anyio
 # async def test_filter_weight_by_date_passed(
 #     fastapi_app: FastAPI,
@@ -93,3 +219,57 @@ async def test_filter_weight_by_date(
 #     assert response.status_code == status.HTTP_200_OK
 #     response_data = response.json()
 #     assert len(response_data) == 0
+
+
+def test_analyze_weight_series() -> None:
+    start = datetime.datetime(2024, 1, 1, 8)
+    # Weighed before and after feeding every day but the third,
+    # the pre-feeding weight grows 2g a day, every meal adds 30g.
+    times, weights, post_feeding = [], [], []
+    for day in (0, 1, 3, 4):
+        times += [start + datetime.timedelta(days=day, hours=hour) for hour in (0, 2)]
+        weights += [900 + 2 * day, 930 + 2 * day]
+        post_feeding += [False, True]
+    series = WeightSeries.from_lists(times, weights, post_feeding)
+    bird_id = uuid.uuid4()
+
+    analytics = analyze(bird_id, series, window=2)
+    assert analytics.count == 8
+    assert analytics.feeding_gain_mean == 30
+    assert [trend.slope for trend in analytics.trends] == pytest.approx([2, 2, 2])
+    assert analytics.days.weight_mean == [915, 917, 921, 923]
+    assert analytics.days.delta == [None, 2, None, 2]
+    assert analytics.days.rolling_mean == [915, 916, 921, 922]
+
+    empty = analyze(bird_id, WeightSeries.from_lists(None, None, None))
+    assert empty.count == 0
+    assert not empty.days.day
+
+
+@pytest.mark.anyio
+async def test_weight_analytics(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    bird: BirdRead,
+) -> None:
+    now = datetime.datetime.now()
+    weights = [
+        WeightCreate(
+            id=uuid.uuid4(),
+            bird_id=bird.id,
+            weight=1000 - day,
+            w_time=now - datetime.timedelta(days=day),
+        )
+        for day in range(10)
+    ]
+    url = fastapi_app.url_path_for("create_bulk_weight")
+    response = await client.post(url, json=jsonable_encoder(weights))
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    url = fastapi_app.url_path_for("get_weight_analytics", bird_id=bird.id)
+    response = await client.get(url, params={"days": 5})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    analytics = response.json()
+    assert analytics["count"] == 5
+    assert analytics["days"]["delta"] == [None, 1, 1, 1, 1]
+    assert analytics["trends"][0]["slope"] == pytest.approx(1)
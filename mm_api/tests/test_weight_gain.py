@@ -0,0 +1,111 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import polars as pl
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from mm_api.schema.bird import BirdRead
+from mm_api.services.weight_gain import COLUMNS, coefficients, refit
+from mm_api.tests.utils.generations import create_feeding, create_weight
+
+START = datetime(2024, 3, 1, 9)
+
+
+def _feedings(bird_id: str, amounts: List[float]) -> List[Dict[str, Any]]:
+    """
+    Daily feedings gaining 5g plus 0.8g per gram fed, losing 20g overnight.
+
+    :param bird_id: bird id.
+    :param amounts: grams fed every day.
+    :return: rows of `FEEDING_GAINS`.
+    """
+    rows, weight = [], 900.0
+    for day, amount in enumerate(amounts):
+        end_weight = weight + 5 + 0.8 * amount
+        rows.append(
+            {
+                "bird_id": bird_id,
+                "species": "kestrel",
+                "f_time": START + timedelta(days=day),
+                "amount": amount,
+                "start_weight": weight,
+                "end_weight": end_weight,
+            },
+        )
+        weight = end_weight - 20
+    return rows
+
+
+def test_coefficients() -> None:
+    rows = _feedings("a", [40, 60, 50, 70, 30, 45]) + _feedings("b", [50, 60])
+    frame = pl.DataFrame(rows).select(COLUMNS)
+
+    models = {(row["scope"], row["key"]): row for row in coefficients(frame)}
+    assert set(models) == {("bird", "a"), ("species", "kestrel")}
+    bird = models["bird", "a"]
+    assert bird["samples"] == 6
+    assert bird["gain_intercept"] == pytest.approx(5)
+    assert bird["gain_per_gram"] == pytest.approx(0.8)
+    assert bird["overnight_loss"] == pytest.approx(20)
+    assert models["species", "kestrel"]["samples"] == 8
+
+
+@pytest.mark.anyio
+async def test_weight_prediction(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    bird: BirdRead,
+) -> None:
+    url = fastapi_app.url_path_for("predict_bird_weight", bird_id=bird.id)
+    response = await client.get(url, params={"amount": 50})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    start = datetime.now() - timedelta(days=7)
+    weights, feedings = [], []
+    for day, row in enumerate(_feedings(str(bird.id), [40, 60, 50, 70, 30, 45])):
+        before = create_weight(
+            bird.id, start + timedelta(days=day), row["start_weight"]
+        )
+        after = create_weight(
+            bird.id, before.w_time + timedelta(hours=1), row["end_weight"]
+        )
+        weights += [before, after]
+        feeding = create_feeding(
+            bird.id, row["amount"], before.w_time, before.id, after.id
+        )
+        feedings.append(feeding)
+    # The bird's latest pre-feeding weigh-in.
+    latest = create_weight(bird.id, datetime.now(), 1000)
+    weights.append(latest)
+    for name, payload in (
+        ("create_bulk_weight", weights),
+        ("create_bulk_feeding", feedings),
+    ):
+        response = await client.post(
+            fastapi_app.url_path_for(name),
+            json=jsonable_encoder(payload),
+        )
+        assert response.status_code == status.HTTP_201_CREATED, response.text
+    await refit(dbsession)
+
+    response = await client.get(url, params={"amount": 50})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    prediction = response.json()
+    assert prediction["scope"] == "bird"
+    assert prediction["weight"] == 1000
+    assert prediction["predicted_weight"] == pytest.approx(1000 + 5 + 40 - 20)
+
+    response = await client.get(url, params={"amount": 50, "weight": 900})
+    assert response.json()["predicted_weight"] == pytest.approx(925)
+
+    other = str(uuid.uuid4())
+    url = fastapi_app.url_path_for("predict_bird_weight", bird_id=other)
+    response = await client.get(url, params={"amount": 50})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@contextmanager
+def capture_statements(session: AsyncSession) -> Iterator[List[Tuple[str, Any]]]:
+    """
+    Collect SQL statements sent to the database by the session.
+
+    :param session: session to watch.
+    :yield: list of captured (statement, parameters) pairs.
+    """
+    engine = session.bind.sync_engine  # type: ignore
+    captured: List[Tuple[str, Any]] = []
+
+    def _capture(  # noqa: WPS211, WPS430
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
@@ -0,0 +1,17 @@
+import json
+from typing import Any, Dict, Tuple
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+
+def create_rsa_key(kid: str) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Generate a signing key.
+
+    :param kid: key id.
+    :return: private key and its public JWK.
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    return private_key, {**jwk, "kid": kid}
@@ -1,31 +1,89 @@
-from typing import List
+from typing import List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from mm_api.db.dao.bird_dao import BirdDAO
+from mm_api.db.dao.bird_stats_dao import BirdStatsDAO
 from mm_api.db.dao.feeding_dao import FeedingDAO
 from mm_api.db.dao.hunt_dao import HuntDAO
 from mm_api.db.dao.training_dao import TrainingDAO
 from mm_api.db.dao.weight_dao import WeightDAO
+from mm_api.db.dao.weight_gain_dao import WeightGainDAO
+from mm_api.db.dependencies import read_only
+from mm_api.db.pagination import PageParams
 from mm_api.schema.bird import BirdCreate, BirdNestedChildren, BirdRead
-from mm_api.web.dependencies import is_authenticated
+from mm_api.schema.bird_stats import BirdStatsRead, Granularity
+from mm_api.schema.page import Page
+from mm_api.schema.weight_gain import WeightPrediction
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.web.dependencies import IncludeParams, get_page_params, is_authenticated
+from mm_api.web.utils.conditional import Conditional
 
 router = APIRouter(prefix="/bird")
 
+bird_includes = IncludeParams("weights", "hunts", "trainings", "feedings")
 
-@router.get("/{bird_id}")
-async def get_bird(bird_id: str, bird_dao: BirdDAO = Depends()) -> BirdRead:
-    return await bird_dao.get_by_id(bird_id)
+
+@router.get("/{bird_id}", response_model=BirdNestedChildren)
+async def get_bird(
+    bird_id: str,
+    include: Tuple[str, ...] = Depends(bird_includes),
+    bird_dao: BirdDAO = Depends(read_only(BirdDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Union[BirdNestedChildren, Response]:
+    return await conditional.entity(
+        lambda: bird_dao.freshness_by_id(bird_id, include),
+        lambda: read_cache.get_or_load(
+            "bird",
+            bird_id,
+            BirdNestedChildren,
+            lambda: bird_dao.get_by_id(bird_id, include),
+            include,
+        ),
+        include,
+    )
 
 
 @router.post("", status_code=201)
-async def create_bird(bird: BirdCreate, bird_dao: BirdDAO = Depends()) -> BirdRead:
-    return await bird_dao.create(bird)
+async def create_bird(
+    bird: BirdCreate,
+    bird_dao: BirdDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> BirdRead:
+    created = await bird_dao.create(bird)
+    await read_cache.invalidate("falconer", [bird.falconer_id], bird_dao.session)
+    return created
 
 
 @router.get("")
 async def get_birds_by_falconer_id(
     user_id: str = Depends(is_authenticated),
-    bird_dao: BirdDAO = Depends(),
-) -> List[BirdRead]:
-    return await bird_dao.get_by_falconer_id(user_id)
+    page: PageParams = Depends(get_page_params),
+    include: Tuple[str, ...] = Depends(bird_includes),
+    bird_dao: BirdDAO = Depends(read_only(BirdDAO)),
+) -> Page[BirdNestedChildren]:
+    return await bird_dao.get_by_falconer_id(user_id, page, include)
+
+
+@router.get("/{bird_id}/stats")
+async def get_bird_stats(
+    bird_id: str,
+    granularity: Granularity = "day",
+    days: int = 90,
+    stats_dao: BirdStatsDAO = Depends(read_only(BirdStatsDAO)),
+) -> List[BirdStatsRead]:
+    return await stats_dao.get_stats(bird_id, granularity, days)
+
+
+@router.get("/{bird_id}/weight-prediction")
+async def predict_bird_weight(
+    bird_id: str,
+    amount: float = Query(ge=0),
+    weight: Optional[float] = Query(default=None, gt=0),
+    weight_gain_dao: WeightGainDAO = Depends(read_only(WeightGainDAO)),
+) -> WeightPrediction:
+    prediction = await weight_gain_dao.get_prediction(bird_id, amount, weight)
+    if prediction is None:
+        raise HTTPException(status_code=404, detail="No weight model for this bird")
+    return prediction
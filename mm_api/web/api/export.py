@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from mm_api.db.dao.export_dao import EXPORT_SCHEMAS, ExportDAO
+from mm_api.db.dependencies import read_only
+from mm_api.schema.export import ExportFormat, ExportTable
+from mm_api.services.export import EXTENSIONS, MEDIA_TYPES, arrow_stream, parquet_file
+from mm_api.settings import settings
+from mm_api.web.dependencies import is_authenticated
+
+router = APIRouter(prefix="/export")
+
+
+@router.get("/{table}")
+async def export_table(
+    table: ExportTable,
+    format: ExportFormat = "parquet",  # noqa: WPS125
+    user_id: str = Depends(is_authenticated),
+    export_dao: ExportDAO = Depends(read_only(ExportDAO)),
+) -> StreamingResponse:
+    """
+    Export the falconer's rows of a table.
+
+    Arrow IPC is streamed as rows are read. Parquet is written
+    in full before its first byte is sent, prefer Arrow for
+    large exports.
+    """
+    frames = export_dao.frames(table, user_id, settings.export_chunk_size)
+    encode = arrow_stream if format == "arrow" else parquet_file
+    return StreamingResponse(
+        encode(EXPORT_SCHEMAS[table], frames),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{table}.{EXTENSIONS[format]}"'
+            ),
+        },
+    )
@@ -1,18 +1,30 @@
+from typing import Tuple
+
 from fastapi import APIRouter, Depends
 
 from mm_api.db.dao.falconer_dao import FalconerDAO
-from mm_api.schema.falconer import FalconerCreate, FalconerRead
-from mm_api.web.dependencies import is_authenticated
+from mm_api.db.dependencies import read_only
+from mm_api.schema.falconer import FalconerCreate, FalconerNestedBirds, FalconerRead
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.web.dependencies import IncludeParams, is_authenticated
 
 router = APIRouter(prefix="/falconer")
 
 
 @router.get("/}")
 async def get_falconer(
-    falconer_dao: FalconerDAO = Depends(),
+    falconer_dao: FalconerDAO = Depends(read_only(FalconerDAO)),
     user_id: str = Depends(is_authenticated),
-) -> FalconerRead:
-    return await falconer_dao.get_by_id(user_id)
+    include: Tuple[str, ...] = Depends(IncludeParams("birds")),
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> FalconerNestedBirds:
+    return await read_cache.get_or_load(
+        "falconer",
+        user_id,
+        FalconerNestedBirds,
+        lambda: falconer_dao.get_by_id(user_id, include),
+        include,
+    )
 
 
 @router.post("", status_code=201)
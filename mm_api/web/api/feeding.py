@@ -1,42 +1,99 @@
-from typing import List
+from functools import partial
+from typing import List, Tuple, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from mm_api.db.dao.feeding_dao import FeedingDAO
-from mm_api.schema.feeding import FeedingBase, FeedingRead
-from mm_api.web.dependencies import is_authenticated
+from mm_api.db.dependencies import read_only
+from mm_api.db.freshness import with_freshness
+from mm_api.db.pagination import PageParams
+from mm_api.schema.bulk import BatchGet, BatchGetResult, BulkCreateResult
+from mm_api.schema.feeding import FeedingBase, FeedingNestedWeight, FeedingRead
+from mm_api.schema.page import Page
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.web.dependencies import IncludeParams, get_page_params, is_authenticated
+from mm_api.web.utils.conditional import Conditional
 
 router = APIRouter(prefix="/feeding")
 
+feeding_includes = IncludeParams("start_weight", "end_weight")
 
-@router.get("/{feeding_id}")
+
+@router.get("/{feeding_id}", response_model=FeedingNestedWeight)
 async def get_feeding(
     feeding_id: str,
-    feeding_dao: FeedingDAO = Depends(),
-) -> FeedingRead:
-    return await feeding_dao.get_by_id(feeding_id)
+    include: Tuple[str, ...] = Depends(feeding_includes),
+    feeding_dao: FeedingDAO = Depends(read_only(FeedingDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Union[FeedingNestedWeight, Response]:
+    return await conditional.entity(
+        lambda: feeding_dao.freshness_by_id(feeding_id, include),
+        lambda: read_cache.get_or_load(
+            "feeding",
+            feeding_id,
+            FeedingNestedWeight,
+            lambda: feeding_dao.get_by_id(feeding_id, include),
+            include,
+        ),
+        include,
+    )
 
 
 @router.post("", status_code=201)
 async def create_feeding(
     feeding: FeedingBase,
     feeding_dao: FeedingDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
 ) -> FeedingRead:
-    return await feeding_dao.create(feeding)
+    created = await feeding_dao.create(feeding)
+    await read_cache.invalidate("bird", [feeding.bird_id], feeding_dao.session)
+    return created
 
 
 @router.post("/bulk", status_code=201)
 async def create_bulk_feeding(
     feedings: List[FeedingBase],
     feeding_dao: FeedingDAO = Depends(),
-) -> None:
-    return await feeding_dao.bulk_create(feedings)
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> BulkCreateResult:
+    result = await feeding_dao.bulk_create(feedings)
+    await read_cache.invalidate(
+        "bird",
+        [feeding.bird_id for feeding in feedings],
+        feeding_dao.session,
+    )
+    return result
 
 
-@router.get("/{bird_id}/filter-date")
+@router.post("/batch-get")
+async def batch_get_feedings(
+    batch: BatchGet,
+    include: Tuple[str, ...] = Depends(feeding_includes),
+    feeding_dao: FeedingDAO = Depends(read_only(FeedingDAO)),
+) -> BatchGetResult[FeedingNestedWeight]:
+    return await feeding_dao.get_by_ids(batch.ids, include)
+
+
+@router.get("/{bird_id}/filter-date", response_model=Page[FeedingNestedWeight])
 async def filter_feeding_by_date(
     days: int,
     bird_id: str,
-    feeding_dao: FeedingDAO = Depends(),
-) -> List[FeedingRead]:
-    return await feeding_dao.filter_by_bird_id_and_time(bird_id, days)
+    page: PageParams = Depends(get_page_params),
+    include: Tuple[str, ...] = Depends(feeding_includes),
+    feeding_dao: FeedingDAO = Depends(read_only(FeedingDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Response:
+    query = (bird_id, days, page, include)
+    freshness = partial(feeding_dao.freshness_by_bird_id_and_time, *query)
+    load = partial(feeding_dao.filter_json_by_bird_id_and_time, *query)
+    return await conditional.page(
+        freshness,
+        lambda: read_cache.get_or_load_window(
+            "feeding",
+            bird_id,
+            (days, *page, *sorted(include)),
+            lambda: with_freshness(freshness, load),
+        ),
+    )
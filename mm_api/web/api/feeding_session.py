@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from mm_api.db.dao.feeding_session_dao import FeedingSessionDAO
+from mm_api.schema.feeding_session import FeedingSessionCreate, FeedingSessionRead
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+
+router = APIRouter(prefix="/feeding-session")
+
+
+@router.post("", status_code=201)
+async def create_feeding_session(
+    feeding_session: FeedingSessionCreate,
+    feeding_session_dao: FeedingSessionDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> FeedingSessionRead:
+    created = await feeding_session_dao.create(feeding_session)
+    await read_cache.invalidate(
+        "bird",
+        [feeding_session.bird_id],
+        feeding_session_dao.session,
+    )
+    return created
@@ -1,42 +1,99 @@
-from typing import List
+from functools import partial
+from typing import List, Tuple, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from mm_api.db.dao.hunt_dao import HuntDAO
-from mm_api.schema.hunt import HuntBase, HuntRead
-from mm_api.web.dependencies import is_authenticated
+from mm_api.db.dependencies import read_only
+from mm_api.db.freshness import with_freshness
+from mm_api.db.pagination import PageParams
+from mm_api.schema.bulk import BatchGet, BatchGetResult, BulkCreateResult
+from mm_api.schema.hunt import HuntBase, HuntNestedWeight, HuntRead
+from mm_api.schema.page import Page
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.web.dependencies import IncludeParams, get_page_params, is_authenticated
+from mm_api.web.utils.conditional import Conditional
 
 router = APIRouter(prefix="/hunt")
 
+hunt_includes = IncludeParams("start_weight", "end_weight")
 
-@router.get("/{hunt_id}")
+
+@router.get("/{hunt_id}", response_model=HuntNestedWeight)
 async def get_hunt(
     hunt_id: str,
-    hunt_dao: HuntDAO = Depends(),
-) -> HuntRead:
-    return await hunt_dao.get_by_id(hunt_id)
+    include: Tuple[str, ...] = Depends(hunt_includes),
+    hunt_dao: HuntDAO = Depends(read_only(HuntDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Union[HuntNestedWeight, Response]:
+    return await conditional.entity(
+        lambda: hunt_dao.freshness_by_id(hunt_id, include),
+        lambda: read_cache.get_or_load(
+            "hunt",
+            hunt_id,
+            HuntNestedWeight,
+            lambda: hunt_dao.get_by_id(hunt_id, include),
+            include,
+        ),
+        include,
+    )
 
 
 @router.post("", status_code=201)
 async def create_hunt(
     hunt: HuntBase,
     hunt_dao: HuntDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
 ) -> HuntRead:
-    return await hunt_dao.create(hunt)
+    created = await hunt_dao.create(hunt)
+    await read_cache.invalidate("bird", [hunt.bird_id], hunt_dao.session)
+    return created
 
 
 @router.post("/bulk", status_code=201)
 async def create_bulk_hunt(
     hunts: List[HuntBase],
     hunt_dao: HuntDAO = Depends(),
-) -> None:
-    return await hunt_dao.bulk_create(hunts)
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> BulkCreateResult:
+    result = await hunt_dao.bulk_create(hunts)
+    await read_cache.invalidate(
+        "bird",
+        [hunt.bird_id for hunt in hunts],
+        hunt_dao.session,
+    )
+    return result
 
 
-@router.get("/{bird_id}/filter-date")
+@router.post("/batch-get")
+async def batch_get_hunts(
+    batch: BatchGet,
+    include: Tuple[str, ...] = Depends(hunt_includes),
+    hunt_dao: HuntDAO = Depends(read_only(HuntDAO)),
+) -> BatchGetResult[HuntNestedWeight]:
+    return await hunt_dao.get_by_ids(batch.ids, include)
+
+
+@router.get("/{bird_id}/filter-date", response_model=Page[HuntNestedWeight])
 async def filter_hunt_by_date(
     days: int,
     bird_id: str,
-    hunt_dao: HuntDAO = Depends(),
-) -> List[HuntRead]:
-    return await hunt_dao.filter_by_bird_id_and_time(bird_id, days)
+    page: PageParams = Depends(get_page_params),
+    include: Tuple[str, ...] = Depends(hunt_includes),
+    hunt_dao: HuntDAO = Depends(read_only(HuntDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Response:
+    query = (bird_id, days, page, include)
+    freshness = partial(hunt_dao.freshness_by_bird_id_and_time, *query)
+    load = partial(hunt_dao.filter_json_by_bird_id_and_time, *query)
+    return await conditional.page(
+        freshness,
+        lambda: read_cache.get_or_load_window(
+            "hunt",
+            bird_id,
+            (days, *page, *sorted(include)),
+            lambda: with_freshness(freshness, load),
+        ),
+    )
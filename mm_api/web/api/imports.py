@@ -0,0 +1,29 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, Request
+
+from mm_api.db.dao.import_dao import ImportDAO
+from mm_api.schema.imports import ImportFormat, ImportReport, ImportTable
+from mm_api.services.imports import BirdIndex, Importer
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.web.dependencies import is_authenticated
+
+router = APIRouter(prefix="/import")
+
+
+@router.post("/{table}")
+async def import_table(
+    table: ImportTable,
+    request: Request,
+    format: ImportFormat = "csv",  # noqa: WPS125
+    user_id: str = Depends(is_authenticated),
+    import_dao: ImportDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> ImportReport:
+    async def insert(rows: List[Dict[str, Any]]) -> int:  # noqa: WPS430
+        count = await import_dao.insert(table, rows)
+        await read_cache.invalidate("bird", {row["bird_id"] for row in rows})
+        return count
+
+    birds = BirdIndex(await import_dao.bird_names(user_id))
+    return await Importer(table, birds, insert).run(request.stream(), format)
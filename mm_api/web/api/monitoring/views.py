@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from mm_api.services import metrics
 
 router = APIRouter()
 
@@ -10,3 +13,15 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> str:
+    """
+    Expose metrics of this worker in the Prometheus text format.
+
+    Samples are labelled with the worker's pid.
+
+    :returns: metrics.
+    """
+    return metrics.render()
@@ -4,9 +4,12 @@ from mm_api.web.api import (
     bird,
     dummy,
     echo,
+    export,
     falconer,
     feeding,
+    feeding_session,
     hunt,
+    imports,
     monitoring,
     redis,
     training,
@@ -21,6 +24,9 @@ api_router.include_router(redis.router, prefix="/redis", tags=["redis"])
 api_router.include_router(falconer.router, tags=["falconer"])
 api_router.include_router(bird.router, tags=["bird"])
 api_router.include_router(feeding.router, tags=["feeding"])
+api_router.include_router(feeding_session.router, tags=["feeding-session"])
 api_router.include_router(hunt.router, tags=["hunt"])
 api_router.include_router(training.router, tags=["training"])
 api_router.include_router(weight.router, tags=["weight"])
+api_router.include_router(export.router, tags=["export"])
+api_router.include_router(imports.router, tags=["import"])
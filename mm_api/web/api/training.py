@@ -1,42 +1,99 @@
-from typing import List
+from functools import partial
+from typing import List, Tuple, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from mm_api.db.dao.training_dao import TrainingDAO
-from mm_api.schema.training import TrainingBase, TrainingRead
-from mm_api.web.dependencies import is_authenticated
+from mm_api.db.dependencies import read_only
+from mm_api.db.freshness import with_freshness
+from mm_api.db.pagination import PageParams
+from mm_api.schema.bulk import BatchGet, BatchGetResult, BulkCreateResult
+from mm_api.schema.page import Page
+from mm_api.schema.training import TrainingBase, TrainingNestedWeight, TrainingRead
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.web.dependencies import IncludeParams, get_page_params, is_authenticated
+from mm_api.web.utils.conditional import Conditional
 
 router = APIRouter(prefix="/training")
 
+training_includes = IncludeParams("start_weight", "end_weight")
 
-@router.get("/{training_id}")
+
+@router.get("/{training_id}", response_model=TrainingNestedWeight)
 async def get_training(
     training_id: str,
-    training_dao: TrainingDAO = Depends(),
-) -> TrainingRead:
-    return await training_dao.get_by_id(training_id)
+    include: Tuple[str, ...] = Depends(training_includes),
+    training_dao: TrainingDAO = Depends(read_only(TrainingDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Union[TrainingNestedWeight, Response]:
+    return await conditional.entity(
+        lambda: training_dao.freshness_by_id(training_id, include),
+        lambda: read_cache.get_or_load(
+            "training",
+            training_id,
+            TrainingNestedWeight,
+            lambda: training_dao.get_by_id(training_id, include),
+            include,
+        ),
+        include,
+    )
 
 
 @router.post("", status_code=201)
 async def create_training(
     training: TrainingBase,
     training_dao: TrainingDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
 ) -> TrainingRead:
-    return await training_dao.create(training)
+    created = await training_dao.create(training)
+    await read_cache.invalidate("bird", [training.bird_id], training_dao.session)
+    return created
 
 
 @router.post("/bulk", status_code=201)
 async def create_bulk_training(
     trainings: List[TrainingBase],
     training_dao: TrainingDAO = Depends(),
-) -> None:
-    return await training_dao.bulk_create(trainings)
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> BulkCreateResult:
+    result = await training_dao.bulk_create(trainings)
+    await read_cache.invalidate(
+        "bird",
+        [training.bird_id for training in trainings],
+        training_dao.session,
+    )
+    return result
 
 
-@router.get("/{bird_id}/filter-date")
+@router.post("/batch-get")
+async def batch_get_trainings(
+    batch: BatchGet,
+    include: Tuple[str, ...] = Depends(training_includes),
+    training_dao: TrainingDAO = Depends(read_only(TrainingDAO)),
+) -> BatchGetResult[TrainingNestedWeight]:
+    return await training_dao.get_by_ids(batch.ids, include)
+
+
+@router.get("/{bird_id}/filter-date", response_model=Page[TrainingNestedWeight])
 async def filter_training_by_date(
     days: int,
     bird_id: str,
-    training_dao: TrainingDAO = Depends(),
-) -> List[TrainingRead]:
-    return await training_dao.filter_by_bird_id_and_time(bird_id, days)
+    page: PageParams = Depends(get_page_params),
+    include: Tuple[str, ...] = Depends(training_includes),
+    training_dao: TrainingDAO = Depends(read_only(TrainingDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Response:
+    query = (bird_id, days, page, include)
+    freshness = partial(training_dao.freshness_by_bird_id_and_time, *query)
+    load = partial(training_dao.filter_json_by_bird_id_and_time, *query)
+    return await conditional.page(
+        freshness,
+        lambda: read_cache.get_or_load_window(
+            "training",
+            bird_id,
+            (days, *page, *sorted(include)),
+            lambda: with_freshness(freshness, load),
+        ),
+    )
@@ -1,44 +1,104 @@
-from typing import List
+from functools import partial
+from typing import List, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 
 from mm_api.db.dao.weight_dao import WeightDAO
-from mm_api.schema.weight import WeightCreate, WeightRead
-from mm_api.web.dependencies import is_authenticated
+from mm_api.db.dependencies import read_only
+from mm_api.db.freshness import with_freshness
+from mm_api.db.pagination import PageParams
+from mm_api.schema.bulk import BatchGet, BatchGetResult, BulkCreateResult
+from mm_api.schema.page import Page
+from mm_api.schema.weight import WeightAnalytics, WeightCreate, WeightRead
+from mm_api.services.redis.cache import ReadCache, get_read_cache
+from mm_api.services.weight_analytics import analyze
+from mm_api.web.dependencies import get_page_params, is_authenticated
+from mm_api.web.utils.conditional import Conditional
 
 router = APIRouter(prefix="/weight")
 
 
-@router.get("/{weight_id}")
+@router.get("/{weight_id}", response_model=WeightRead)
 async def get_weight(
     weight_id: str,
-    weight_dao: WeightDAO = Depends(),
-) -> WeightRead:
-    return await weight_dao.get_by_id(weight_id)
+    weight_dao: WeightDAO = Depends(read_only(WeightDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Union[WeightRead, Response]:
+    return await conditional.entity(
+        lambda: weight_dao.freshness_by_id(weight_id),
+        lambda: read_cache.get_or_load(
+            "weight",
+            weight_id,
+            WeightRead,
+            lambda: weight_dao.get_by_id(weight_id),
+        ),
+    )
 
 
 @router.post("", status_code=201)
 async def create_weight(
     weight: WeightCreate,
     weight_dao: WeightDAO = Depends(),
+    read_cache: ReadCache = Depends(get_read_cache),
 ) -> WeightRead:
-    return await weight_dao.create(weight)
+    created = await weight_dao.create(weight)
+    await read_cache.invalidate("bird", [weight.bird_id], weight_dao.session)
+    return created
 
 
 @router.post("/bulk", status_code=201)
 async def create_bulk_weight(
     weights: List[WeightCreate],
     weight_dao: WeightDAO = Depends(),
-) -> None:
-    return await weight_dao.bulk_create(weights)
+    read_cache: ReadCache = Depends(get_read_cache),
+) -> BulkCreateResult:
+    result = await weight_dao.bulk_create(weights)
+    await read_cache.invalidate(
+        "bird",
+        [weight.bird_id for weight in weights],
+        weight_dao.session,
+    )
+    return result
+
+
+@router.post("/batch-get")
+async def batch_get_weights(
+    batch: BatchGet,
+    weight_dao: WeightDAO = Depends(read_only(WeightDAO)),
+) -> BatchGetResult[WeightRead]:
+    return await weight_dao.get_by_ids(batch.ids)
 
 
-@router.get("/{bird_id}/filter-date")
+@router.get("/{bird_id}/filter-date", response_model=Page[WeightRead])
 async def filter_weight_by_date(
     bird_id: str,
     days: int = 30,
-    weight_dao: WeightDAO = Depends(),
-) -> List[WeightRead]:
-    weights = await weight_dao.filter_by_bird_id_and_time(bird_id, days)
-    print(len(weights))
-    return weights
+    page: PageParams = Depends(get_page_params),
+    weight_dao: WeightDAO = Depends(read_only(WeightDAO)),
+    read_cache: ReadCache = Depends(get_read_cache),
+    conditional: Conditional = Depends(),
+) -> Response:
+    query = (bird_id, days, page)
+    freshness = partial(weight_dao.freshness_by_bird_id_and_time, *query)
+    load = partial(weight_dao.filter_json_by_bird_id_and_time, *query)
+    return await conditional.page(
+        freshness,
+        lambda: read_cache.get_or_load_window(
+            "weight",
+            bird_id,
+            (days, *page),
+            lambda: with_freshness(freshness, load),
+        ),
+    )
+
+
+@router.get("/{bird_id}/analytics")
+async def get_weight_analytics(
+    bird_id: str,
+    days: int = 365,
+    window: int = Query(default=7, ge=1),
+    weight_dao: WeightDAO = Depends(read_only(WeightDAO)),
+) -> WeightAnalytics:
+    series = await weight_dao.get_series(bird_id, days)
+    return analyze(bird_id, series, window)
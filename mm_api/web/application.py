@@ -12,6 +12,7 @@ from mm_api.log import configure_logging
 from mm_api.settings import settings
 from mm_api.web.api.router import api_router
 from mm_api.web.lifetime import register_shutdown_event, register_startup_event
+from mm_api.web.middleware import CompressionMiddleware
 
 
 def get_app() -> FastAPI:
@@ -53,6 +54,9 @@ def get_app() -> FastAPI:
     register_startup_event(app)
     register_shutdown_event(app)
 
+    # Compresses text responses the client accepts compressed.
+    app.add_middleware(CompressionMiddleware)
+
     # Main router for the API.
     app.include_router(router=api_router, prefix="/api")
 
@@ -1,11 +1,69 @@
-from typing import Annotated
+from typing import Annotated, Optional, Tuple
+from uuid import UUID
 
-from fastapi import Header
+from fastapi import Depends, Header, HTTPException, Query
+from redis.asyncio import ConnectionPool
 
-from mm_api.web.utils.token import decode_token
+from mm_api.db.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    PageParams,
+    decode_cursor,
+)
+from mm_api.services.redis.dependency import get_redis_pool
+from mm_api.web.utils.token import verify_token
 
 
 async def is_authenticated(
     authorization: Annotated[str | None, Header()] = None,
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
 ) -> str:
-    return decode_token(authorization[7:])["sub"]  # type: ignore
+    return (await verify_token(authorization[7:], redis_pool))["sub"]  # type: ignore
+
+
+async def get_page_params(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    """
+    Read keyset pagination parameters from the query string.
+
+    Paginated routes page on uuid ids.
+
+    :param cursor: `next_cursor` of the previous page.
+    :param limit: page size.
+    :raises HTTPException: if cursor is malformed.
+    :return: requested page.
+    """
+    if cursor is None:
+        return PageParams(limit=limit)
+    try:
+        return PageParams(limit=limit, cursor=decode_cursor(cursor, UUID))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class IncludeParams:
+    """Reads the relationships to load from `?include=a,b`."""
+
+    def __init__(self, *allowed: str) -> None:
+        self.allowed = allowed
+
+    def __call__(self, include: Optional[str] = None) -> Tuple[str, ...]:
+        """
+        Parse and validate requested relationships.
+
+        :param include: comma separated relationship names.
+        :raises HTTPException: if a relationship can't be included.
+        :return: relationship names.
+        """
+        if not include:
+            return ()
+        names = tuple(dict.fromkeys(name.strip() for name in include.split(",")))
+        unknown = [name for name in names if name not in self.allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown include: {', '.join(unknown)}",
+            )
+        return names
@@ -1,8 +1,13 @@
+import asyncio
 from typing import Awaitable, Callable
 
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from mm_api.db.engine import create_engine
+from mm_api.db.partitions import ensure_partitions
+from mm_api.db.routing import SessionRouter
+from mm_api.services.jwks import key_store
 from mm_api.services.redis.lifetime import init_redis, shutdown_redis
 from mm_api.settings import settings
 
@@ -11,19 +16,39 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
     """
     Creates connection to the database.
 
-    This function creates SQLAlchemy engine instance,
-    session_factory for creating sessions
+    This function creates SQLAlchemy engine instances for the primary
+    and every read replica, session_factory for creating sessions,
+    the router that picks one of them for a request
     and stores them in the application's state property.
 
     :param app: fastAPI application.
     """
-    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    engine = create_engine(str(settings.db_url), "primary")
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
     )
+    replica_engines = [
+        create_engine(url, f"replica{index}")
+        for index, url in enumerate(settings.db_replica_urls)
+    ]
+    router = SessionRouter(
+        session_factory,
+        [
+            async_sessionmaker(replica, expire_on_commit=False)
+            for replica in replica_engines
+        ],
+        app.state.redis_pool,
+    )
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
+    app.state.db_replica_engines = replica_engines
+    app.state.db_router = router
+    app.state.db_lag_task = None
+    if replica_engines:
+        app.state.db_lag_task = asyncio.create_task(
+            router.watch_lag(replica_engines),
+        )
 
 
 def register_startup_event(
@@ -42,8 +67,11 @@ def register_startup_event(
     @app.on_event("startup")
     async def _startup() -> None:  # noqa: WPS430
         app.middleware_stack = None
-        _setup_db(app)
         init_redis(app)
+        _setup_db(app)
+        await ensure_partitions(app.state.db_engine)
+        key_store.load_files()
+        app.state.jwks_task = asyncio.create_task(key_store.watch())
         app.middleware_stack = app.build_middleware_stack()
         pass  # noqa: WPS420
 
@@ -62,7 +90,12 @@ def register_shutdown_event(
 
     @app.on_event("shutdown")
     async def _shutdown() -> None:  # noqa: WPS430
+        if app.state.db_lag_task is not None:
+            app.state.db_lag_task.cancel()
+        app.state.jwks_task.cancel()
         await app.state.db_engine.dispose()
+        for replica in app.state.db_replica_engines:
+            await replica.dispose()
 
         await shutdown_redis(app)
         pass  # noqa: WPS420
@@ -0,0 +1,106 @@
+"""
+Negotiated compression of responses.
+
+Text responses are sent with the content coding picked by
+`negotiate` once their body is complete. Streamed responses, such as
+exports, are passed through: their formats are compressed already.
+
+Bodies of GET responses are looked up in `compression_cache` first.
+"""
+import asyncio
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from mm_api.services.compression import (
+    COMPRESSED_RESPONSES,
+    compress,
+    compression_cache,
+    negotiate,
+)
+from mm_api.settings import settings
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Bodies at least this large are compressed in a worker thread.
+THREAD_MIN_SIZE = 64 * 1024
+
+
+async def compress_cached(body: bytes, encoding: str, cacheable: bool) -> bytes:
+    """
+    Compress a body, reusing the cached result of an identical body.
+
+    :param body: uncompressed body.
+    :param encoding: content coding.
+    :param cacheable: whether the result may be cached.
+    :return: compressed body.
+    """
+    key = compression_cache.key(body, encoding) if cacheable else None
+    if key is not None:
+        compressed = compression_cache.get(key)
+        if compressed is not None:
+            COMPRESSED_RESPONSES.inc(encoding=encoding, cache="hit")
+            return compressed
+    if len(body) >= THREAD_MIN_SIZE:
+        compressed = await asyncio.to_thread(compress, body, encoding)
+    else:
+        compressed = compress(body, encoding)
+    if key is not None:
+        compression_cache.put(key, compressed)
+    COMPRESSED_RESPONSES.inc(encoding=encoding, cache="miss" if key else "off")
+    return compressed
+
+
+class _CompressingSend:
+    """Holds the response start until the body tells whether to compress."""
+
+    def __init__(self, send: Send, encoding: Optional[str], cacheable: bool) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.start: Message = {}
+        self.streaming = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.streaming:
+            await self.send(message)
+            return
+        if message.get("more_body", False):
+            self.streaming = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=self.start["headers"])
+        content_type = headers.get("content-type", "")
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            headers.add_vary_header("Accept-Encoding")
+            if (
+                self.encoding is not None
+                and "content-encoding" not in headers
+                and len(body) >= settings.compression_min_size
+            ):
+                body = await compress_cached(body, self.encoding, self.cacheable)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": body})
+
+
+class CompressionMiddleware:
+    """Compresses text responses with gzip or Brotli."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        cacheable = scope["method"] == "GET"
+        await self.app(scope, receive, _CompressingSend(send, encoding, cacheable))
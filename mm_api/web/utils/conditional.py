@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple, TypeVar, Union
+
+from fastapi import Request, Response
+from starlette import status
+
+from mm_api.db.freshness import Freshness, freshness_of
+
+EntityT = TypeVar("EntityT")
+
+
+def _utc(moment: datetime) -> datetime:
+    # Timestamps are stored without a time zone, in UTC.
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def validators(freshness: Freshness) -> Dict[str, str]:
+    """
+    ETag and Last-Modified headers of a response.
+
+    :param freshness: freshness of the response's rows.
+    :return: headers, none for a response without rows.
+    """
+    if freshness.last_modified is None:
+        return {}
+    last_modified = _utc(freshness.last_modified)
+    micros = int(last_modified.timestamp() * 1_000_000)
+    return {
+        "ETag": f'W/"{freshness.count:x}-{micros:x}"',
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+    }
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+
+class Conditional:
+    """Conditional GET, answered with 304 Not Modified when possible."""
+
+    def __init__(self, request: Request, response: Response) -> None:
+        self.request = request
+        self.response = response
+        self.headers: Dict[str, str] = {}
+
+    @property
+    def requested(self) -> bool:
+        """
+        Whether the request has preconditions.
+
+        :return: True if it has `If-None-Match` or `If-Modified-Since`.
+        """
+        headers = self.request.headers
+        return "if-none-match" in headers or "if-modified-since" in headers
+
+    def check(self, freshness: Freshness) -> Optional[Response]:
+        """
+        Set the validators of a response and evaluate the preconditions.
+
+        `If-Modified-Since` is ignored when `If-None-Match` is sent.
+
+        :param freshness: freshness of the response's rows.
+        :return: 304 response if the client's copy is fresh, None otherwise.
+        """
+        self.headers = validators(freshness)
+        self.response.headers.update(self.headers)
+        if self.headers and self._fresh(freshness):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=self.headers,
+            )
+        return None
+
+    async def entity(
+        self,
+        freshness: Callable[[], Awaitable[Freshness]],
+        load: Callable[[], Awaitable[EntityT]],
+        include: Sequence[str] = (),
+    ) -> Union[EntityT, Response]:
+        """
+        Answer a GET of one entity.
+
+        Preconditions are first evaluated with `freshness`, so a fresh
+        copy is confirmed without loading the entity. Validators of a
+        loaded entity are computed from it.
+
+        :param freshness: computes the entity's freshness in the database.
+        :param load: loads the entity.
+        :param include: relationships loaded with the entity.
+        :return: entity, or 304 response.
+        """
+        if self.requested:
+            not_modified = self.check(await freshness())
+            if not_modified is not None:
+                return not_modified
+        entity = await load()
+        return self.check(freshness_of(entity, include)) or entity  # type: ignore
+
+    async def page(
+        self,
+        freshness: Callable[[], Awaitable[Freshness]],
+        load: Callable[[], Awaitable[Tuple[Freshness, bytes]]],
+    ) -> Response:
+        """
+        Answer a GET of a page serialized to JSON.
+
+        Preconditions are first evaluated with `freshness`, like in
+        `entity`. Validators of a loaded page are the freshness it was
+        loaded with, cached along with its JSON.
+
+        :param freshness: computes the page's freshness in the database.
+        :param load: loads the page's freshness and JSON.
+        :return: page, or 304 response.
+        """
+        if self.requested:
+            not_modified = self.check(await freshness())
+            if not_modified is not None:
+                return not_modified
+        loaded, body = await load()
+        return self.check(loaded) or Response(
+            body,
+            media_type="application/json",
+            headers=self.headers,
+        )
+
+    def _fresh(self, freshness: Freshness) -> bool:
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = _opaque(self.headers["ETag"])
+            tags = {_opaque(tag) for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags
+        try:
+            since = parsedate_to_datetime(self.request.headers["if-modified-since"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        last_modified = _utc(freshness.last_modified)  # type: ignore
+        return last_modified.replace(microsecond=0) <= _utc(since)
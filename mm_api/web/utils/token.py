@@ -1,29 +1,71 @@
+from typing import Optional
+
 import jwt
-from jwt import InvalidTokenError, algorithms
+from jwt import InvalidTokenError
+from loguru import logger
+from redis.asyncio import ConnectionPool
 
+from mm_api.services.jwks import key_store
+from mm_api.services.token_cache import (
+    TOKEN_CACHE_REQUESTS,
+    get_shared,
+    put_shared,
+    token_cache,
+    token_key,
+)
 from mm_api.settings import settings
 
 
 # Decode token using JWKS
-def decode_token(token: str) -> dict[str, str]:
-
-    public_key = algorithms.RSAAlgorithm.from_jwk(settings.jwks["keys"][0])  # type: ignore
-
-    print(public_key)
-
+async def decode_token(token: str) -> dict[str, str]:
     decoded_token = {}
     try:
-        # Decode the token
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = await key_store.get_key(kid)
+        if public_key is None:
+            raise InvalidTokenError(f"Unknown signing key {kid}")
         decoded_token = jwt.decode(
             token,
-            public_key,  # type: ignore
+            public_key,
             algorithms=["RS256"],  # Use the appropriate algorithm
+            leeway=settings.jwt_leeway,
         )
-
-        # Print the decoded token
     except jwt.ExpiredSignatureError:
-        print("Token has expired")
+        logger.info("Token has expired")
     except InvalidTokenError as e:
-        print(f"Invalid token: {e}")
+        logger.info("Invalid token: {}", e)
 
     return decoded_token
+
+
+async def verify_token(
+    token: str,
+    redis_pool: Optional[ConnectionPool] = None,
+) -> dict[str, str]:
+    """
+    Decode a token, reusing the claims of tokens verified before.
+
+    :param token: bearer token.
+    :param redis_pool: redis pool of the shared cache.
+    :return: claims, empty if the token is invalid.
+    """
+    key = token_key(token)
+    claims = token_cache.get(key)
+    if claims is not None:
+        TOKEN_CACHE_REQUESTS.inc(result="hit")
+        return claims
+    shared = settings.token_cache_shared and redis_pool is not None
+    if shared:
+        claims = await get_shared(redis_pool, key)  # type: ignore
+        if claims is not None:
+            TOKEN_CACHE_REQUESTS.inc(result="shared_hit")
+            token_cache.put(key, claims)
+            return claims
+
+    TOKEN_CACHE_REQUESTS.inc(result="miss")
+    claims = await decode_token(token)
+    if claims:
+        token_cache.put(key, claims)
+        if shared:
+            await put_shared(redis_pool, key, claims)  # type: ignore
+    return claims